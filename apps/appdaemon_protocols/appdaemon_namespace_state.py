@@ -0,0 +1,5 @@
+from typing import Protocol
+
+
+class AppdaemonNamespaceState(Protocol):
+    def get_state(self) -> object: ...
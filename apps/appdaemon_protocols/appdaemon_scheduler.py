@@ -0,0 +1,7 @@
+from collections.abc import Callable
+from typing import Any, Protocol
+
+
+class AppdaemonScheduler(Protocol):
+    def run_in(self, callback: Callable[..., None], delay: float, **kwargs) -> Any: ...  # noqa: ANN003, ANN401
+    def cancel_timer(self, handle: Any) -> Any: ...  # noqa: ANN401
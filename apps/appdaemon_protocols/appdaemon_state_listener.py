@@ -0,0 +1,6 @@
+from collections.abc import Callable
+from typing import Any, Protocol
+
+
+class AppdaemonStateListener(Protocol):
+    def listen_state(self, callback: Callable[..., None], entity_id: str, **kwargs) -> Any: ...  # noqa: ANN003, ANN401
@@ -0,0 +1,5 @@
+from typing import Any, Protocol
+
+
+class AppdaemonStateWriter(Protocol):
+    def set_state(self, entity_id: str, **kwargs) -> Any: ...  # noqa: ANN003, ANN401
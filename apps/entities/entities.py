@@ -30,6 +30,7 @@ INVERTER_STORAGE_MODE_ENTITY = "select.solis_control_storage_mode"
 SLOT1_DISCHARGE_ENABLED_ENTITY = "switch.solis_control_slot1_discharge"
 SLOT1_DISCHARGE_TIME_ENTITY = "text.solis_control_slot1_discharge_time"
 SLOT1_DISCHARGE_CURRENT_ENTITY = "number.solis_control_slot1_discharge_current"
+DISCHARGE_SLOTS = 6
 
 EXCESS_ENERGY_ENTITY = "input_boolean.solar_excess_energy_mode"
 BATTERY_FULL_CHARGE_ENTITY = "timer.solar_battery_full_charge"
@@ -46,6 +47,18 @@ PV_FORECAST_TODAY_ENTITY = "sensor.solcast_pv_forecast_forecast_today"
 PV_FORECAST_TOMORROW_ENTITY = "sensor.solcast_pv_forecast_forecast_tomorrow"
 
 
+def slot_discharge_enabled_entity(slot: int) -> str:
+    return f"switch.solis_control_slot{slot}_discharge"
+
+
+def slot_discharge_time_entity(slot: int) -> str:
+    return f"text.solis_control_slot{slot}_discharge_time"
+
+
+def slot_discharge_current_entity(slot: int) -> str:
+    return f"number.solis_control_slot{slot}_discharge_current"
+
+
 def is_heating_enabled(state: str) -> bool:
     return state.lower() == "heat"
 
@@ -25,6 +25,19 @@ class HvacStateFactory(Protocol):
 
 
 class DefaultHvacStateFactory:
+    ENTITY_IDS = (
+        ECO_MODE_ENTITY,
+        DHW_TEMPERATURE_ENTITY,
+        DHW_ENTITY,
+        DHW_DELTA_TEMP_ENTITY,
+        INDOOR_TEMPERATURE_ENTITY,
+        HEATING_ENTITY,
+        COOLING_ENTITY,
+        HEATING_CURVE_TARGET_HIGH_TEMP_ENTITY,
+        HEATING_CURVE_TARGET_LOW_TEMP_ENTITY,
+        TEMPERATURE_ADJUSTMENT_ENTITY,
+    )
+
     def __init__(self, appdaemon_logger: AppdaemonLogger, appdaemon_state: AppdaemonState) -> None:
         self.appdaemon_logger = appdaemon_logger
         self.appdaemon_state = appdaemon_state
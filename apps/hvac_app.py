@@ -1,6 +1,8 @@
 from datetime import time
+from pathlib import Path
 
 import appdaemon.plugins.hass.hassapi as hass
+from aiohttp import web
 from entities.entities import COOLING_ENTITY, ECO_MODE_ENTITY, HEATING_ENTITY, TEMPERATURE_ADJUSTMENT_ENTITY
 from hvac.cooling_estimator import CoolingEstimator
 from hvac.dhw_estimator import DhwEstimator
@@ -9,15 +11,32 @@ from hvac.hvac import Hvac
 from hvac.hvac_configuration import HvacConfiguration
 from hvac.hvac_state_factory import DefaultHvacStateFactory
 from units.celsius import Celsius
-from utils.appdaemon_utils import LoggingAppdaemonService, is_dry_run
+from utils.appdaemon_utils import LoggingAppdaemonService, is_dry_run, is_instrumented, recorder_path
+from utils.instrumentation import Instrumentation, not_instrumented
+from utils.lazy_logger import LazyLogger
+from utils.recorder import Recorder, RecordingAppdaemonService, RecordingStateFactory, not_recorded
+from utils.service_dispatcher import BatchingAppdaemonService
+from utils.state_store import SnapshotStateFactory, StateStore, fetch_states
+from utils.tick_profiler import TickProfiler
 
 
 class HvacApp(hass.Hass):
+    _METRICS_SENSOR_PREFIX = "sensor.hvac_stage"
+    _METRICS_PUBLISH_INTERVAL_SECONDS = 60
+    _PROFILE_DIRECTORY = "profiles"
+    _PROFILE_TOP_FUNCTIONS = 25
+
     def initialize(self) -> None:
-        appdaemon_logger = self
+        # level checked before AppDaemon inspects the call stack, suppressed debug messages cost almost nothing
+        appdaemon_logger = LazyLogger(self, self.logger.isEnabledFor)
         appdaemon_state = self
         appdaemon_service = LoggingAppdaemonService(self) if is_dry_run(self) else self
 
+        # without instrumentation the objects are used as they are, no overhead on any call
+        self.instrumentation = Instrumentation() if is_instrumented(self) else None
+        instrument = self.instrumentation.instrument if self.instrumentation is not None else not_instrumented
+        appdaemon_service = instrument(appdaemon_service, "service")
+
         configuration = HvacConfiguration(
             time_zone=str(self.get_timezone()),
             # domestic hot water temperature in normal mode
@@ -56,18 +75,58 @@ class HvacApp(hass.Hass):
             cooling_boost_time_end_eco_off=time.fromisoformat("22:00:00"),
         )
 
-        state_factory = DefaultHvacStateFactory(appdaemon_logger, appdaemon_state)
+        state_store = StateStore(appdaemon_state, self)
+        # a single read of the whole namespace instead of a blocking round-trip per entity
+        state_store.preload(fetch_states(self, DefaultHvacStateFactory.ENTITY_IDS))
+        state_factory = SnapshotStateFactory(
+            state_store,
+            instrument(
+                DefaultHvacStateFactory(appdaemon_logger, instrument(state_store, "state_store")), "state_factory"
+            ),
+        )
+        # subscribe the store before control triggers, so it sees state changes before the triggered callbacks
+        state_factory.create()
+
+        self.recorder: Recorder | None = None
+        record_outputs = not_recorded
+        if (path := recorder_path(self)) is not None:
+            self.log("Recording states, estimates and service calls to %s", path)
+            self.recorder = Recorder(path)
+            record_outputs = self.recorder.record_outputs
+            state_factory = RecordingStateFactory(state_factory, self.recorder, "hvac_state")
+            appdaemon_service = RecordingAppdaemonService(appdaemon_service, self.recorder)
+
+        # calls of a single control run are flushed together, without writes the heat pump already has
+        self.service_dispatcher = BatchingAppdaemonService(appdaemon_logger, state_store, appdaemon_service)
+        appdaemon_service = self.service_dispatcher
 
         self.hvac = Hvac(
             appdaemon_logger=appdaemon_logger,
             appdaemon_service=appdaemon_service,
             configuration=configuration,
             state_factory=state_factory,
-            dhw_estimator=DhwEstimator(appdaemon_logger, configuration),
-            heating_estimator=HeatingEstimator(appdaemon_logger, configuration),
-            cooling_estimator=CoolingEstimator(appdaemon_logger, configuration),
+            dhw_estimator=instrument(
+                record_outputs(DhwEstimator(appdaemon_logger, configuration), "dhw_estimator"), "dhw_estimator"
+            ),
+            heating_estimator=instrument(
+                record_outputs(HeatingEstimator(appdaemon_logger, configuration), "heating_estimator"),
+                "heating_estimator",
+            ),
+            cooling_estimator=instrument(
+                record_outputs(CoolingEstimator(appdaemon_logger, configuration), "cooling_estimator"),
+                "cooling_estimator",
+            ),
         )
 
+        if self.instrumentation is not None:
+            self.log("Publishing instrumentation as %s_* sensors and at /app/hvac_metrics", self._METRICS_SENSOR_PREFIX)
+            self.run_every(self.publish_instrumentation, "now", self._METRICS_PUBLISH_INTERVAL_SECONDS)
+            self.register_route(self.instrumentation_metrics, "hvac_metrics")
+
+        # the HVAC_DEBUG event with profile_ticks data profiles the next control runs
+        self.tick_profiler = TickProfiler(appdaemon_logger, Path(self.config_dir) / self._PROFILE_DIRECTORY)
+        self.listen_event(self.hvac_debug, "HVAC_DEBUG")
+
         self.log("Setting up HVAC control")
         self.run_every(self.control_scheduled, "00:00:00", 5 * 60)
 
@@ -83,10 +142,39 @@ class HvacApp(hass.Hass):
         )
 
         self.log("Initial HVAC control run")
-        self.hvac.control(self.get_now())
+        self._control()
+
+    def terminate(self) -> None:
+        if self.recorder is not None:
+            self.recorder.close()
+
+    def hvac_debug(self, event_type, data, **kwargs) -> None:  # noqa: ANN001, ANN003, ARG002
+        if (ticks := data.get("profile_ticks")) is not None:
+            top = data.get("profile_top", self._PROFILE_TOP_FUNCTIONS)
+            self.tick_profiler.start("hvac", int(ticks), int(top), self.get_now())
+
+        self.log(
+            "Service dispatcher: calls=%d, dispatched=%d, merged=%d, dropped=%d",
+            self.service_dispatcher.calls,
+            self.service_dispatcher.dispatched,
+            self.service_dispatcher.merged,
+            self.service_dispatcher.dropped,
+        )
+
+    def publish_instrumentation(self, **kwargs: object) -> None:  # noqa: ARG002
+        assert self.instrumentation is not None
+        self.instrumentation.publish_sensors(self, self._METRICS_SENSOR_PREFIX)
+
+    async def instrumentation_metrics(self, request, kwargs) -> web.Response:  # noqa: ANN001, ARG002
+        assert self.instrumentation is not None
+        return web.Response(text=self.instrumentation.render_text("hvac"), content_type="text/plain")
 
     def control_scheduled(self, **kwargs: dict) -> None:  # noqa: ARG002
-        self.hvac.control(self.get_now())
+        self._control()
 
     def control_triggered(self, entity, attribute, old, new, **kwargs) -> None:  # noqa: ANN001, ANN003, ARG002
-        self.hvac.control(self.get_now())
+        self._control()
+
+    def _control(self) -> None:
+        with self.service_dispatcher.batch():
+            self.tick_profiler.profile(lambda: self.hvac.control(self.get_now()))
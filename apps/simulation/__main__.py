@@ -0,0 +1,63 @@
+import argparse
+import time
+from pathlib import Path
+
+from simulation.engine import SimulationEngine
+from simulation.history import History
+from simulation.sweep import grid_search, parse_parameter, random_search, run_sweep
+from solar.solar_configuration import SolarConfiguration, create_configuration
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded history through the Solar controller")
+    parser.add_argument("history", type=Path, help="CSV or Parquet file with 15-minute history steps")
+    parser.add_argument("--time-zone", default="Europe/Warsaw")
+    parser.add_argument("--initial-battery-soc", type=float, default=None)
+    parser.add_argument(
+        "--sweep",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE,...",
+        help="Configuration field with candidate values, repeat to sweep several fields",
+    )
+    parser.add_argument("--random", type=int, default=None, help="Sample this many candidates instead of a grid")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.history.suffix == ".parquet":
+        history = History.from_parquet(args.history, args.time_zone)
+    else:
+        history = History.from_csv(args.history, args.time_zone)
+
+    configuration = create_configuration(args.time_zone)
+    if args.sweep:
+        _sweep(configuration, history, args)
+        return
+
+    engine = SimulationEngine(configuration, history, args.initial_battery_soc)
+
+    started = time.perf_counter()
+    report = engine.run()
+    elapsed = time.perf_counter() - started
+
+    print(report)
+    print(f"Simulated {report.steps} steps in {elapsed:.2f}s")
+
+
+def _sweep(configuration: SolarConfiguration, history: History, args: argparse.Namespace) -> None:
+    space = dict(parse_parameter(configuration, parameter) for parameter in args.sweep)
+    candidates = grid_search(space) if args.random is None else random_search(space, args.random, args.seed)
+
+    started = time.perf_counter()
+    results = run_sweep(configuration, history, candidates, args.workers)
+    elapsed = time.perf_counter() - started
+
+    for result in results[: args.top]:
+        print(result)
+    print(f"Simulated {len(results)} configurations in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
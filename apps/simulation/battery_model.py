@@ -0,0 +1,77 @@
+from dataclasses import dataclass
+from datetime import time
+
+from solar.storage_mode import StorageMode
+from utils.time_utils import is_time_in_range
+
+
+@dataclass(frozen=True, slots=True)
+class DischargeSlotSettings:
+    is_enabled: bool
+    start: time
+    end: time
+    current: float  # A
+
+
+@dataclass(frozen=True, slots=True)
+class InverterSettings:
+    battery_reserve_soc: float  # %
+    battery_max_charge_current: float  # A
+    battery_max_discharge_current: float  # A
+    storage_mode: StorageMode
+    discharge_slots: tuple[DischargeSlotSettings, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class GridFlow:
+    grid_import: float  # kWh
+    grid_export: float  # kWh
+
+
+# Simplified Solis hybrid inverter with a lossless battery, energies in kWh and plain floats for speed
+class BatteryModel:
+    def __init__(self, capacity: float, voltage: float, soc: float) -> None:
+        self.capacity = capacity
+        self.voltage = voltage
+        self.soc = soc
+
+    def step(
+        self, now: time, hours: float, production: float, consumption: float, settings: InverterSettings
+    ) -> GridFlow:
+        stored = self.soc / 100.0 * self.capacity
+        reserve = settings.battery_reserve_soc / 100.0 * self.capacity
+        max_charge = self._current_to_energy(settings.battery_max_charge_current, hours)
+        max_discharge = self._current_to_energy(settings.battery_max_discharge_current, hours)
+        net = production - consumption
+
+        slot_current = next(
+            (
+                slot.current
+                for slot in settings.discharge_slots
+                if slot.is_enabled and is_time_in_range(now, slot.start, slot.end)
+            ),
+            None,
+        )
+
+        if slot_current is not None:
+            # forced discharge to the grid down to the reserve SoC, the first matching slot wins as on the inverter
+            slot_discharge = self._current_to_energy(slot_current, hours)
+            battery_flow = -min(slot_discharge, max_discharge, max(stored - reserve, 0.0))
+        elif stored < reserve:
+            # inverter keeps the reserve SoC by charging from PV and the grid
+            battery_flow = min(max_charge, reserve - stored)
+        elif net > 0 and settings.storage_mode == StorageMode.SELF_USE:
+            battery_flow = min(net, max_charge, self.capacity - stored)
+        elif net < 0:
+            battery_flow = -min(-net, max_discharge, stored - reserve)
+        else:
+            # feed-in priority exports the whole surplus
+            battery_flow = 0.0
+
+        self.soc = min(max((stored + battery_flow) / self.capacity * 100.0, 0.0), 100.0)
+
+        grid_balance = net - battery_flow
+        return GridFlow(grid_import=max(-grid_balance, 0.0), grid_export=max(grid_balance, 0.0))
+
+    def _current_to_energy(self, current: float, hours: float) -> float:
+        return current * self.voltage / 1000.0 * hours
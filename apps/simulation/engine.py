@@ -0,0 +1,206 @@
+from datetime import date, time, timedelta
+
+from entities.entities import (
+    AWAY_MODE_ENTITY,
+    BATTERY_FULL_CHARGE_ENTITY,
+    BATTERY_MAX_CHARGE_CURRENT_ENTITY,
+    BATTERY_MAX_DISCHARGE_CURRENT_ENTITY,
+    BATTERY_RESERVE_SOC_ENTITY,
+    BATTERY_SOC_ENTITY,
+    DISCHARGE_SLOTS,
+    ECO_MODE_ENTITY,
+    EXCESS_ENERGY_ENTITY,
+    HEATING_ENTITY,
+    INDOOR_TEMPERATURE_ENTITY,
+    INVERTER_STORAGE_MODE_ENTITY,
+    OUTDOOR_TEMPERATURE_ENTITY,
+    PRICE_FORECAST_TODAY_ENTITY,
+    PRICE_FORECAST_TOMORROW_ENTITY,
+    PV_FORECAST_TODAY_ENTITY,
+    PV_FORECAST_TOMORROW_ENTITY,
+    WEATHER_FORECAST_ENTITY,
+    slot_discharge_current_entity,
+    slot_discharge_enabled_entity,
+    slot_discharge_time_entity,
+)
+from simulation.battery_model import BatteryModel, DischargeSlotSettings, InverterSettings
+from simulation.history import STEP, History, HistoryStep
+from simulation.report import SimulationReport
+from simulation.simulated_appdaemon import SimulatedLogger, SimulatedService, SimulatedState, SimulationClock
+from solar.battery_discharge_slot import BatteryDischargeSlot
+from solar.battery_discharge_slot_estimator import BatteryDischargeSlotEstimator
+from solar.battery_max_current_estimator import BatteryMaxCurrentEstimator
+from solar.battery_reserve_soc_estimator import BatteryReserveSocEstimator
+from solar.excess_energy_estimator import ExcessEnergyEstimator
+from solar.forecast_factory import CachingForecastFactory
+from solar.solar import Solar
+from solar.solar_configuration import SolarConfiguration
+from solar.solar_state_factory import DefaultSolarStateFactory
+from solar.storage_mode import StorageMode
+from solar.storage_mode_estimator import StorageModeEstimator
+from units.battery_current import BatteryCurrent
+from utils.safe_converters import safe_bool, safe_float
+from utils.state_store import SnapshotStateFactory
+
+
+# Replays recorded history through Solar, stepping a simulated clock in 15-minute steps
+class SimulationEngine:
+    _STEP_HOURS = STEP.total_seconds() / 3600
+    # RCE publishes day-ahead prices in the early afternoon
+    _PRICE_PUBLICATION_TIME = time(14, 0)
+
+    def __init__(
+        self,
+        configuration: SolarConfiguration,
+        history: History,
+        initial_battery_soc: float | None = None,
+        full_charge_timer_duration: timedelta = timedelta(days=7),
+    ) -> None:
+        self.configuration = configuration
+        self.history = history
+
+        self.clock = SimulationClock(history.steps[0].timestamp)
+        self.logger = SimulatedLogger()
+        self.state = SimulatedState()
+        self.service = SimulatedService(
+            self.state, self.clock, timer_durations={BATTERY_FULL_CHARGE_ENTITY: full_charge_timer_duration}
+        )
+
+        battery_soc = (
+            initial_battery_soc or history.initial_battery_soc() or configuration.battery_reserve_soc_min.value
+        )
+        self.battery = BatteryModel(
+            configuration.battery_capacity.value, configuration.battery_voltage.value, battery_soc
+        )
+
+        # forecast attributes are the same list objects for a whole day, so forecasts are parsed once per day
+        forecast_factory = CachingForecastFactory(self.logger, configuration)
+        state_factory = SnapshotStateFactory(self.state, DefaultSolarStateFactory(self.logger, self.state))
+
+        self.solar = Solar(
+            appdaemon_logger=self.logger,
+            appdaemon_service=self.service,
+            configuration=configuration,
+            state_factory=state_factory,
+            battery_max_current_estimator=BatteryMaxCurrentEstimator(self.logger, configuration),
+            battery_discharge_slot_estimator=BatteryDischargeSlotEstimator(
+                self.logger, configuration, forecast_factory
+            ),
+            battery_reserve_soc_estimator=BatteryReserveSocEstimator(self.logger, configuration, forecast_factory),
+            storage_mode_estimator=StorageModeEstimator(self.logger, configuration, forecast_factory),
+            excess_energy_estimator=ExcessEnergyEstimator(self.logger, configuration),
+        )
+
+        # same schedule as SolarApp, without the backup calls
+        self._daily_actions = {
+            time(5, 30): self.solar.schedule_battery_discharge_at_6_am,
+            time(9, 0): lambda _: self.solar.disable_battery_discharge(),
+            time(15, 30): self.solar.schedule_battery_discharge_at_4_pm,
+            time(22, 0): lambda _: self.solar.disable_battery_discharge(),
+        }
+
+    def run(self) -> SimulationReport:
+        report = SimulationReport()
+        self._initialize_state()
+
+        current_day = None
+        tomorrow_prices_published = False
+        for step in self.history.steps:
+            now = step.timestamp
+            self.clock.advance_to(now)
+
+            if (day := now.date()) != current_day:
+                current_day = day
+                tomorrow_prices_published = False
+                self._publish_daily_forecasts(day)
+            if not tomorrow_prices_published and now.time() >= self._PRICE_PUBLICATION_TIME:
+                tomorrow_prices_published = True
+                self._publish_tomorrow_prices(day)
+
+            self._update_step_state(step)
+            self.service.expire_timers()
+
+            if (daily_action := self._daily_actions.get(now.time())) is not None:
+                daily_action(now)
+
+            self.solar.control_scheduled(now)
+            # SolarApp triggers these only between sunrise and sunset, PV forecast approximates daylight
+            if step.pv_estimate > 0:
+                self.solar.control_storage_mode(now)
+                self.solar.control_excess_energy(now)
+
+            old_battery_soc = self.battery.soc
+            grid_flow = self.battery.step(
+                now.time(), self._STEP_HOURS, step.production, step.consumption, self._inverter_settings()
+            )
+            self.solar.reset_battery_full_charge_timer_if_full(old_battery_soc, self.battery.soc)
+
+            report.add_step(
+                grid_flow.grid_import, grid_flow.grid_export, step.production - step.consumption, step.price / 1000.0
+            )
+
+        report.final_battery_soc = self.battery.soc
+        report.decisions = self.service.decisions
+        return report
+
+    def _initialize_state(self) -> None:
+        configuration = self.configuration
+        initial_states: dict[str, object] = {
+            BATTERY_FULL_CHARGE_ENTITY: "idle",
+            BATTERY_RESERVE_SOC_ENTITY: configuration.battery_reserve_soc_min.value,
+            BATTERY_MAX_CHARGE_CURRENT_ENTITY: configuration.battery_maximum_current.value,
+            BATTERY_MAX_DISCHARGE_CURRENT_ENTITY: configuration.battery_maximum_current.value,
+            INDOOR_TEMPERATURE_ENTITY: configuration.temp_in.value,
+            AWAY_MODE_ENTITY: "off",
+            ECO_MODE_ENTITY: "off",
+            INVERTER_STORAGE_MODE_ENTITY: StorageMode.SELF_USE.value,
+            HEATING_ENTITY: "off",
+            EXCESS_ENERGY_ENTITY: "off",
+        }
+        for slot in range(1, DISCHARGE_SLOTS + 1):
+            initial_states[slot_discharge_enabled_entity(slot)] = "off"
+            initial_states[slot_discharge_time_entity(slot)] = "00:00-00:00"
+            initial_states[slot_discharge_current_entity(slot)] = 0.0
+        for entity_id, state in initial_states.items():
+            self.state.set_state(entity_id, state)
+
+        self.state.set_attribute(HEATING_ENTITY, "temperature", configuration.temp_in.value)
+
+    def _publish_daily_forecasts(self, day: date) -> None:
+        tomorrow = day + timedelta(days=1)
+        self.state.set_attribute(PV_FORECAST_TODAY_ENTITY, "detailedHourly", self.history.pv_forecast(day))
+        self.state.set_attribute(PV_FORECAST_TOMORROW_ENTITY, "detailedHourly", self.history.pv_forecast(tomorrow))
+        self.state.set_attribute(WEATHER_FORECAST_ENTITY, "forecast", self.history.weather_forecast(day))
+        self.state.set_attribute(PRICE_FORECAST_TODAY_ENTITY, "prices", self.history.price_forecast(day))
+        self.state.set_attribute(PRICE_FORECAST_TOMORROW_ENTITY, "prices", [])
+
+    def _publish_tomorrow_prices(self, day: date) -> None:
+        self.state.set_attribute(
+            PRICE_FORECAST_TOMORROW_ENTITY, "prices", self.history.price_forecast(day + timedelta(days=1))
+        )
+
+    def _update_step_state(self, step: HistoryStep) -> None:
+        self.state.set_state(BATTERY_SOC_ENTITY, round(self.battery.soc, 1))
+        self.state.set_state(OUTDOOR_TEMPERATURE_ENTITY, step.temperature)
+        self.state.set_state(PRICE_FORECAST_TODAY_ENTITY, step.price)
+
+    def _inverter_settings(self) -> InverterSettings:
+        return InverterSettings(
+            battery_reserve_soc=safe_float(self.state.get_state(BATTERY_RESERVE_SOC_ENTITY)) or 0.0,
+            battery_max_charge_current=safe_float(self.state.get_state(BATTERY_MAX_CHARGE_CURRENT_ENTITY)) or 0.0,
+            battery_max_discharge_current=safe_float(self.state.get_state(BATTERY_MAX_DISCHARGE_CURRENT_ENTITY)) or 0.0,
+            storage_mode=StorageMode(self.state.get_state(INVERTER_STORAGE_MODE_ENTITY)),
+            discharge_slots=tuple(self._discharge_slot_settings(slot) for slot in range(1, DISCHARGE_SLOTS + 1)),
+        )
+
+    def _discharge_slot_settings(self, slot: int) -> DischargeSlotSettings:
+        discharge_current = safe_float(self.state.get_state(slot_discharge_current_entity(slot))) or 0.0
+        discharge_slot = BatteryDischargeSlot.from_time_str(
+            str(self.state.get_state(slot_discharge_time_entity(slot))), BatteryCurrent(discharge_current)
+        )
+        return DischargeSlotSettings(
+            is_enabled=safe_bool(self.state.get_state(slot_discharge_enabled_entity(slot))) or False,
+            start=discharge_slot.start_time,
+            end=discharge_slot.end_time,
+            current=discharge_current,
+        )
@@ -0,0 +1,127 @@
+import csv
+import importlib
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+STEP = timedelta(minutes=15)
+
+_COLUMNS = (
+    "timestamp",
+    "battery_soc",
+    "pv_estimate",
+    "production",
+    "consumption",
+    "price",
+    "temperature",
+    "humidity",
+)
+_PRICE_DTIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+_NO_FORECAST: list[dict] = []
+
+
+@dataclass(frozen=True, slots=True)
+class HistoryStep:
+    timestamp: datetime
+    battery_soc: float | None  # recorded battery SoC in %, only the first one is used as the initial SoC
+    pv_estimate: float  # Solcast estimate for the hour in kWh
+    production: float  # actual PV production during the step in kWh
+    consumption: float  # actual house consumption during the step in kWh
+    price: float  # RCE price in PLN/MWh
+    temperature: float  # outdoor temperature in Celsius
+    humidity: float  # outdoor humidity in %
+
+
+# Recorded 15-minute history, with Home Assistant like forecast attributes prepared once per day
+class History:
+    @classmethod
+    def from_csv(cls, path: Path, time_zone: str) -> "History":
+        with path.open(newline="") as csv_file:
+            return cls.from_rows(csv.DictReader(csv_file), time_zone)
+
+    @classmethod
+    def from_parquet(cls, path: Path, time_zone: str) -> "History":
+        try:
+            parquet = importlib.import_module("pyarrow.parquet")
+        except ImportError as e:
+            raise ImportError("Reading Parquet history requires pyarrow") from e
+
+        return cls.from_rows(parquet.read_table(path, columns=list(_COLUMNS)).to_pylist(), time_zone)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Mapping[str, object]], time_zone: str) -> "History":
+        zone_info = ZoneInfo(time_zone)
+        steps = [
+            HistoryStep(
+                timestamp=_to_datetime(row["timestamp"]).astimezone(zone_info),
+                battery_soc=None if row["battery_soc"] in (None, "") else float(str(row["battery_soc"])),
+                pv_estimate=float(str(row["pv_estimate"])),
+                production=float(str(row["production"])),
+                consumption=float(str(row["consumption"])),
+                price=float(str(row["price"])),
+                temperature=float(str(row["temperature"])),
+                humidity=float(str(row["humidity"])),
+            )
+            for row in rows
+        ]
+        return cls(steps)
+
+    def __init__(self, steps: list[HistoryStep]) -> None:
+        if not steps:
+            raise ValueError("History must contain at least one step")
+
+        for previous, current in zip(steps, steps[1:], strict=False):
+            # compare POSIX timestamps, wall clock differences of the same zone ignore DST changes
+            if current.timestamp.timestamp() - previous.timestamp.timestamp() != STEP.total_seconds():
+                raise ValueError(
+                    f"History must have {STEP} steps without gaps, got {previous.timestamp} -> {current.timestamp}"
+                )
+
+        self.steps = steps
+
+        self._pv_forecasts: dict[date, list[dict]] = {}
+        self._price_forecasts: dict[date, list[dict]] = {}
+        self._weather_forecasts: dict[date, list[dict]] = {}
+
+        for step in steps:
+            day = step.timestamp.date()
+            if step.timestamp.minute == 0:
+                self._pv_forecasts.setdefault(day, []).append(
+                    {"period_start": step.timestamp.isoformat(), "pv_estimate": step.pv_estimate}
+                )
+                self._weather_forecasts.setdefault(day, []).append(
+                    {"datetime": step.timestamp.isoformat(), "temperature": step.temperature, "humidity": step.humidity}
+                )
+            # RCE publishes prices for 15-minute periods identified by the local end time
+            period_end = (step.timestamp + STEP).replace(tzinfo=None)
+            self._price_forecasts.setdefault(day, []).append(
+                {"dtime": period_end.strftime(_PRICE_DTIME_FORMAT), "rce_pln": step.price}
+            )
+
+        # weather forecast covers today and tomorrow, concatenated once to keep the same list for the whole day
+        self._weather_forecasts = {
+            day: forecast + self._weather_forecasts.get(day + timedelta(days=1), [])
+            for day, forecast in self._weather_forecasts.items()
+        }
+
+    def initial_battery_soc(self) -> float | None:
+        return self.steps[0].battery_soc
+
+    # forecast lists are shared between calls, consumers must not modify them
+    def pv_forecast(self, day: date) -> list[dict]:
+        return self._pv_forecasts.get(day, _NO_FORECAST)
+
+    def price_forecast(self, day: date) -> list[dict]:
+        return self._price_forecasts.get(day, _NO_FORECAST)
+
+    def weather_forecast(self, day: date) -> list[dict]:
+        return self._weather_forecasts.get(day, _NO_FORECAST)
+
+
+def _to_datetime(value: object) -> datetime:
+    timestamp = value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+    if timestamp.tzinfo is None:
+        raise ValueError(f"History timestamp must be timezone-aware, got {value}")
+    return timestamp
@@ -0,0 +1,46 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from units.money import Money
+
+
+@dataclass
+class SimulationReport:
+    steps: int = 0
+    grid_import: float = 0.0  # kWh
+    grid_export: float = 0.0  # kWh
+    balance: float = 0.0  # PLN, export revenue minus import cost at RCE prices
+    baseline_balance: float = 0.0  # PLN, the same house without a battery
+    final_battery_soc: float = 0.0  # %
+    decisions: Counter[str] = field(default_factory=Counter)
+
+    def add_step(self, grid_import: float, grid_export: float, baseline_net: float, price_per_kwh: float) -> None:
+        self.steps += 1
+        self.grid_import += grid_import
+        self.grid_export += grid_export
+        self.balance += (grid_export - grid_import) * price_per_kwh
+        self.baseline_balance += baseline_net * price_per_kwh
+
+    def revenue(self) -> Money:
+        return _pln(self.balance)
+
+    def savings(self) -> Money:
+        return _pln(self.balance - self.baseline_balance)
+
+    def __str__(self) -> str:
+        lines = [
+            f"Steps: {self.steps}",
+            f"Grid import: {self.grid_import:.2f}kWh",
+            f"Grid export: {self.grid_export:.2f}kWh",
+            f"Revenue: {self.revenue()}",
+            f"Savings vs. no battery: {self.savings()}",
+            f"Final battery SoC: {self.final_battery_soc:.2f}%",
+            "Decisions:",
+        ]
+        lines.extend(f"  {decision}: {count}" for decision, count in sorted(self.decisions.items()))
+        return "\n".join(lines)
+
+
+def _pln(value: float) -> Money:
+    return Money.pln(Decimal(str(round(value, 2))))
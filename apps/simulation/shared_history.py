@@ -0,0 +1,96 @@
+import math
+from array import array
+from dataclasses import fields
+from datetime import datetime
+from multiprocessing import shared_memory
+from types import TracebackType
+from typing import Self
+from zoneinfo import ZoneInfo
+
+from simulation.history import History, HistoryStep
+
+_COLUMN_COUNT = len(fields(HistoryStep))
+_ITEM_SIZE = array("d").itemsize
+
+
+# History packed into shared memory as float64 columns, so process pool workers rebuild it without pickling.
+# Timestamps are stored as POSIX seconds, a missing battery SoC as NaN.
+class SharedHistory:
+    def __init__(self, history: History) -> None:
+        steps = history.steps
+        self.length = len(steps)
+        self._memory = shared_memory.SharedMemory(create=True, size=self.length * _COLUMN_COUNT * _ITEM_SIZE)
+        self.name = self._memory.name
+
+        columns = [
+            array("d", (step.timestamp.timestamp() for step in steps)),
+            array("d", (math.nan if step.battery_soc is None else step.battery_soc for step in steps)),
+            array("d", (step.pv_estimate for step in steps)),
+            array("d", (step.production for step in steps)),
+            array("d", (step.consumption for step in steps)),
+            array("d", (step.price for step in steps)),
+            array("d", (step.temperature for step in steps)),
+            array("d", (step.humidity for step in steps)),
+        ]
+
+        buffer = self._memory.buf
+        assert buffer is not None
+        column_size = self.length * _ITEM_SIZE
+        for index, column in enumerate(columns):
+            buffer[index * column_size : (index + 1) * column_size] = memoryview(column).cast("B")
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._memory.close()
+        self._memory.unlink()
+
+
+def attach_history(name: str, length: int, time_zone: str) -> History:
+    """Rebuild history from shared memory published by SharedHistory.
+
+    Args:
+        name: Name of the shared memory block.
+        length: Number of history steps.
+        time_zone: Time zone of the rebuilt timestamps.
+
+    Returns:
+        History equal to the published one.
+    """
+    memory = shared_memory.SharedMemory(name=name)
+    try:
+        buffer = memory.buf
+        assert buffer is not None
+        values = array("d")
+        with buffer[: length * _COLUMN_COUNT * _ITEM_SIZE] as view:
+            values.frombytes(view)
+    finally:
+        memory.close()
+
+    zone_info = ZoneInfo(time_zone)
+    columns = [values[index * length : (index + 1) * length] for index in range(_COLUMN_COUNT)]
+    steps = [
+        HistoryStep(
+            timestamp=datetime.fromtimestamp(timestamp, zone_info),
+            battery_soc=None if math.isnan(battery_soc) else battery_soc,
+            pv_estimate=pv_estimate,
+            production=production,
+            consumption=consumption,
+            price=price,
+            temperature=temperature,
+            humidity=humidity,
+        )
+        for timestamp, battery_soc, pv_estimate, production, consumption, price, temperature, humidity in zip(
+            *columns, strict=True
+        )
+    ]
+    return History(steps)
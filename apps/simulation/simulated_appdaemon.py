@@ -0,0 +1,93 @@
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+
+
+class SimulationClock:
+    def __init__(self, now: datetime) -> None:
+        self.now = now
+
+    def advance_to(self, now: datetime) -> None:
+        # POSIX timestamps, comparing wall clocks of the same zone goes back when DST ends
+        if now.timestamp() < self.now.timestamp():
+            raise ValueError(f"Simulation clock can't go back from {self.now} to {now}")
+        self.now = now
+
+
+# Drops regular logs, replaying a year would otherwise produce millions of lines
+class SimulatedLogger:
+    def __init__(self, min_level: int = logging.WARNING) -> None:
+        self.min_level = min_level
+        self.messages: list[str] = []
+
+    def log(self, msg: str, *args, level: str | int = logging.INFO) -> None:  # noqa: ANN002
+        numeric_level = level if isinstance(level, int) else logging.getLevelNamesMapping().get(level, logging.INFO)
+        if numeric_level >= self.min_level:
+            self.messages.append(msg % args if args else msg)
+
+
+# In-memory entity states, updated in place to avoid allocations on every simulation step
+class SimulatedState:
+    def __init__(self) -> None:
+        self.version = 0
+        self._states: dict[str, object] = {}
+        self._attributes: dict[str, dict[str, object]] = {}
+
+    def get_state(self, entity_id: str, attribute: str | None = None) -> object:
+        if attribute is None:
+            return self._states.get(entity_id)
+        return self._attributes.get(entity_id, {}).get(attribute)
+
+    def set_state(self, entity_id: str, state: object) -> None:
+        if self._states.get(entity_id) != state:
+            self._states[entity_id] = state
+            self.version += 1
+
+    def set_attribute(self, entity_id: str, attribute: str, value: object) -> None:
+        attributes = self._attributes.setdefault(entity_id, {})
+        if attributes.get(attribute) is not value:
+            attributes[attribute] = value
+            self.version += 1
+
+
+class SimulatedService:
+    def __init__(
+        self, state: SimulatedState, clock: SimulationClock, timer_durations: dict[str, timedelta] | None = None
+    ) -> None:
+        self.state = state
+        self.clock = clock
+        self.timer_durations = timer_durations or {}
+        self.decisions: Counter[str] = Counter()
+        self._timer_ends: dict[str, datetime] = {}
+
+    def call_service(self, service: str, **data) -> object:  # noqa: ANN003
+        entity_id = str(data["entity_id"])
+        self.decisions[f"{service} {entity_id}"] += 1
+
+        match service:
+            case "number/set_value" | "text/set_value":
+                self.state.set_state(entity_id, data["value"])
+            case "select/select_option":
+                self.state.set_state(entity_id, data["option"])
+            case "switch/turn_on" | "input_boolean/turn_on":
+                self.state.set_state(entity_id, "on")
+            case "switch/turn_off" | "input_boolean/turn_off":
+                self.state.set_state(entity_id, "off")
+            case "timer/start":
+                self.state.set_state(entity_id, "active")
+                self._timer_ends[entity_id] = self.clock.now + self.timer_durations.get(entity_id, timedelta(0))
+            case "timer/cancel":
+                self.state.set_state(entity_id, "idle")
+                self._timer_ends.pop(entity_id, None)
+            case _:
+                raise ValueError(f"Unsupported service in simulation: {service}")
+
+        if (callback := data.get("callback")) is not None:
+            callback({"success": True})
+        return None
+
+    def expire_timers(self) -> None:
+        for entity_id, timer_end in list(self._timer_ends.items()):
+            if timer_end <= self.clock.now:
+                self.state.set_state(entity_id, "idle")
+                del self._timer_ends[entity_id]
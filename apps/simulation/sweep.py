@@ -0,0 +1,174 @@
+import itertools
+import random
+from collections.abc import Iterable, Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields, replace
+from datetime import time
+from decimal import Decimal
+
+from simulation.engine import SimulationEngine
+from simulation.history import History
+from simulation.shared_history import SharedHistory, attach_history
+from solar.solar_configuration import SolarConfiguration
+from units.battery_current import BatteryCurrent
+from units.battery_soc import BatterySoc
+from units.battery_voltage import BatteryVoltage
+from units.celsius import Celsius
+from units.energy_kwh import EnergyKwh
+from units.energy_price import EnergyPrice
+from units.money import Money
+
+type Parameters = dict[str, object]
+
+
+@dataclass(frozen=True)
+class SweepResult:
+    parameters: Parameters
+    revenue: Money
+    savings: Money
+
+    def __str__(self) -> str:
+        parameters = ", ".join(f"{name}={value}" for name, value in self.parameters.items())
+        return f"Revenue: {self.revenue}, savings: {self.savings}, parameters: {parameters}"
+
+
+# Set once per worker process by the pool initializer, tasks carry only the parameters
+_worker_configuration: SolarConfiguration | None = None
+_worker_history: History | None = None
+
+
+def grid_search(space: Mapping[str, Sequence[object]]) -> list[Parameters]:
+    """Create every combination of the parameter values.
+
+    Args:
+        space: Candidate values for each SolarConfiguration field.
+
+    Returns:
+        List of parameter sets, one per combination.
+    """
+    names = list(space)
+    return [dict(zip(names, values, strict=True)) for values in itertools.product(*space.values())]
+
+
+def random_search(space: Mapping[str, Sequence[object]], count: int, seed: int | None = None) -> list[Parameters]:
+    """Sample parameter sets from the parameter values.
+
+    Args:
+        space: Candidate values for each SolarConfiguration field.
+        count: Number of parameter sets to sample.
+        seed: Seed for reproducible sampling.
+
+    Returns:
+        List of sampled parameter sets, possibly with duplicates.
+    """
+    rng = random.Random(seed)
+    return [{name: rng.choice(values) for name, values in space.items()} for _ in range(count)]
+
+
+def parse_parameter(configuration: SolarConfiguration, text: str) -> tuple[str, list[object]]:
+    """Parse "name=value1,value2" into candidate values typed like the configuration field.
+
+    Prices are in the unit of the configured value, for example PLN/MWh.
+
+    Args:
+        configuration: Base configuration used to resolve field types.
+        text: Field name and comma separated values.
+
+    Returns:
+        Field name and list of candidate values.
+
+    Raises:
+        ValueError: If the field is unknown or a value can't be parsed.
+    """
+    name, separator, values = text.partition("=")
+    if not separator or not values:
+        raise ValueError(f"Parameter must have form name=value1,value2, got {text}")
+
+    _validate_names(configuration, [name])
+    current = getattr(configuration, name)
+    return name, [_parse_value(current, value.strip()) for value in values.split(",")]
+
+
+def run_sweep(
+    configuration: SolarConfiguration,
+    history: History,
+    candidates: Iterable[Parameters],
+    max_workers: int | None = None,
+) -> list[SweepResult]:
+    """Simulate every parameter set on a process pool and rank them by revenue.
+
+    History is published once in shared memory, every worker rebuilds it once in the pool initializer.
+
+    Args:
+        configuration: Base configuration, parameter sets replace its fields.
+        history: Recorded history to replay.
+        candidates: Parameter sets to simulate.
+        max_workers: Number of worker processes, defaults to the number of CPUs.
+
+    Returns:
+        Results sorted by revenue, the best first.
+
+    Raises:
+        ValueError: If a parameter set refers to an unknown field.
+    """
+    candidates = list(candidates)
+    for parameters in candidates:
+        _validate_names(configuration, parameters)
+
+    with (
+        SharedHistory(history) as shared_history,
+        ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_initialize_worker,
+            initargs=(configuration, shared_history.name, shared_history.length),
+        ) as executor,
+    ):
+        results = list(executor.map(_simulate, candidates))
+
+    return sorted(results, key=lambda result: result.revenue.value, reverse=True)
+
+
+def _initialize_worker(configuration: SolarConfiguration, history_name: str, history_length: int) -> None:
+    global _worker_configuration, _worker_history
+    _worker_configuration = configuration
+    _worker_history = attach_history(history_name, history_length, configuration.time_zone)
+
+
+def _simulate(parameters: Parameters) -> SweepResult:
+    if _worker_configuration is None or _worker_history is None:
+        raise RuntimeError("Sweep worker isn't initialized")
+
+    configuration = replace(_worker_configuration, **parameters)
+    report = SimulationEngine(configuration, _worker_history).run()
+    return SweepResult(parameters=parameters, revenue=report.revenue(), savings=report.savings())
+
+
+def _validate_names(configuration: SolarConfiguration, names: Iterable[str]) -> None:
+    field_names = {field.name for field in fields(configuration)}
+    unknown = [name for name in names if name not in field_names or name == "time_zone"]
+    if unknown:
+        raise ValueError(f"Unknown configuration parameters: {', '.join(unknown)}")
+
+
+def _parse_value(current: object, text: str) -> object:
+    match current:
+        case EnergyPrice():
+            return EnergyPrice(money=Money(value=Decimal(text), currency=current.money.currency), unit=current.unit)
+        case time():
+            return time.fromisoformat(text)
+        case int():
+            return int(text)
+        case float():
+            return float(text)
+        case EnergyKwh():
+            return EnergyKwh(float(text))
+        case BatteryVoltage():
+            return BatteryVoltage(float(text))
+        case BatteryCurrent():
+            return BatteryCurrent(float(text))
+        case BatterySoc():
+            return BatterySoc(float(text))
+        case Celsius():
+            return Celsius(float(text))
+        case _:
+            raise ValueError(f"Unsupported parameter type {type(current).__name__}")
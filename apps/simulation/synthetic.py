@@ -0,0 +1,47 @@
+import math
+from datetime import UTC, datetime
+from zoneinfo import ZoneInfo
+
+from simulation.history import STEP, HistoryStep
+
+_STEPS_PER_DAY = 96
+_EVENING_PEAK_START_HOUR = 17
+_EVENING_PEAK_END_HOUR = 21
+
+
+def synthetic_history_steps(start: datetime, days: int, time_zone: str) -> list[HistoryStep]:
+    """Create a deterministic history of sunny days with cheap midday and expensive evening prices.
+
+    Args:
+        start: Timezone-aware start of the first step.
+        days: Number of days to create.
+        time_zone: Time zone of the created timestamps.
+
+    Returns:
+        List of 15-minute history steps.
+    """
+    zone_info = ZoneInfo(time_zone)
+    # step in UTC, adding to a local time would skip or repeat wall clock hours on DST changes
+    utc_start = start.astimezone(UTC)
+    steps = []
+
+    for index in range(days * _STEPS_PER_DAY):
+        timestamp = (utc_start + index * STEP).astimezone(zone_info)
+        hour = timestamp.hour + timestamp.minute / 60
+        sun = max(0.0, math.sin((hour - 5) / 16 * math.pi))
+        evening_peak = 800.0 if _EVENING_PEAK_START_HOUR <= hour < _EVENING_PEAK_END_HOUR else 0.0
+
+        steps.append(
+            HistoryStep(
+                timestamp=timestamp,
+                battery_soc=50.0 if index == 0 else None,
+                pv_estimate=round(8.0 * sun, 3),
+                production=round(2.0 * sun, 3),
+                consumption=0.25,
+                price=round(450.0 - 350.0 * sun + evening_peak, 2),
+                temperature=round(12.0 + 8.0 * sun, 1),
+                humidity=60.0,
+            )
+        )
+
+    return steps
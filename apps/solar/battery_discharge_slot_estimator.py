@@ -12,10 +12,13 @@ from units.energy_price import EnergyPrice
 from units.hourly_energy import HourlyConsumptionEnergy, HourlyProductionEnergy
 from utils.battery_estimators import estimate_battery_energy_to_full, estimate_battery_surplus_energy
 from utils.energy_aggregators import maximum_cumulative_deficit, total_surplus
-from utils.revenue_estimators import find_max_revenue_period
+from utils.lazy_logger import Lazy
+from utils.revenue_estimators import find_max_revenue_period, find_max_revenue_periods
 
 
 class BatteryDischargeSlotEstimator:
+    _PRICE_PERIOD_MINUTES = 15
+
     def __init__(
         self,
         appdaemon_logger: AppdaemonLogger,
@@ -26,7 +29,7 @@ class BatteryDischargeSlotEstimator:
         self.configuration = configuration
         self.forecast_factory = forecast_factory
 
-    def estimate_battery_discharge_at_4_pm(self, state: SolarState, now: datetime) -> BatteryDischargeSlot | None:
+    def estimate_battery_discharge_at_4_pm(self, state: SolarState, now: datetime) -> list[BatteryDischargeSlot]:
         today_4_pm = now.replace(hour=16, minute=0, second=0, microsecond=0)
         today_10_pm = now.replace(hour=22, minute=0, second=0, microsecond=0)
         high_tariff_hours = 6
@@ -47,7 +50,7 @@ class BatteryDischargeSlotEstimator:
         daytime_productions = production_forecast.hourly(tomorrow_7_am, daytime_hours)
         midday_average_price = price_forecast.average_price(tomorrow_10_30_am, midday_hours)
 
-        return self._estimate_battery_discharge_slot(
+        return self._estimate_battery_discharge_slots(
             state,
             self.configuration.battery_discharge_evening_margin,
             evening_consumptions,
@@ -60,7 +63,7 @@ class BatteryDischargeSlotEstimator:
             today_10_pm,
         )
 
-    def estimate_battery_discharge_at_6_am(self, state: SolarState, now: datetime) -> BatteryDischargeSlot | None:
+    def estimate_battery_discharge_at_6_am(self, state: SolarState, now: datetime) -> list[BatteryDischargeSlot]:
         today_6_am = now.replace(hour=6, minute=0, second=0, microsecond=0)
         today_9_am = now.replace(hour=9, minute=0, second=0, microsecond=0)
 
@@ -82,7 +85,7 @@ class BatteryDischargeSlotEstimator:
         daytime_productions = production_forecast.hourly(today_7_am, daytime_hours)
         midday_average_price = price_forecast.average_price(today_10_30_am, midday_hours)
 
-        return self._estimate_battery_discharge_slot(
+        return self._estimate_battery_discharge_slots(
             state,
             self.configuration.battery_discharge_morning_margin,
             morning_consumptions,
@@ -95,7 +98,7 @@ class BatteryDischargeSlotEstimator:
             today_9_am,
         )
 
-    def _estimate_battery_discharge_slot(
+    def _estimate_battery_discharge_slots(
         self,
         state: SolarState,
         margin: EnergyPrice,
@@ -107,7 +110,7 @@ class BatteryDischargeSlotEstimator:
         price_forecast: PriceForecast,
         discharge_window_start: datetime,
         discharge_window_end: datetime,
-    ) -> BatteryDischargeSlot | None:
+    ) -> list[BatteryDischargeSlot]:
         high_tariff_reserve = maximum_cumulative_deficit(high_tariff_consumptions, high_tariff_productions)
         self.appdaemon_logger.log("High tariff reserve: %s", high_tariff_reserve, level=logging.DEBUG)
 
@@ -127,7 +130,7 @@ class BatteryDischargeSlotEstimator:
                 self.configuration.battery_export_threshold_energy,
                 level=logging.DEBUG,
             )
-            return None
+            return []
 
         daytime_surplus = total_surplus(daytime_consumptions, daytime_productions)
         self.appdaemon_logger.log("Daytime surplus: %s", daytime_surplus, level=logging.DEBUG)
@@ -145,9 +148,9 @@ class BatteryDischargeSlotEstimator:
                 energy_to_battery_replenish,
                 level=logging.DEBUG,
             )
-            return None
+            return []
 
-        hourly_prices = price_forecast.hourly(discharge_window_start, discharge_window_end)
+        fifteen_minute_prices = price_forecast.fifteen_minute(discharge_window_start, discharge_window_end)
 
         price_threshold = midday_average_price.non_negative() + margin if midday_average_price is not None else margin
 
@@ -156,28 +159,48 @@ class BatteryDischargeSlotEstimator:
         )
         hours = high_tariff_surplus / battery_discharge_energy_1h
 
-        revenue_period = find_max_revenue_period(
-            hourly_prices,
-            price_threshold,
-            int(hours * 60),
-            battery_discharge_energy_1h,
-        )
+        max_duration_minutes = int(hours * 60)
+        if self.configuration.battery_discharge_max_slots == 1:
+            revenue_period = find_max_revenue_period(
+                fifteen_minute_prices,
+                price_threshold,
+                max_duration_minutes,
+                battery_discharge_energy_1h,
+                self._PRICE_PERIOD_MINUTES,
+            )
+            revenue_plan = None
+            if revenue_period is not None:
+                revenue, start, end = revenue_period
+                revenue_plan = (revenue, [(start, end)])
+        else:
+            # the surplus is shared by up to one window per inverter slot, e.g. two evening price peaks
+            revenue_plan = find_max_revenue_periods(
+                fifteen_minute_prices,
+                price_threshold,
+                max_duration_minutes,
+                battery_discharge_energy_1h,
+                self.configuration.battery_discharge_max_slots,
+                self._PRICE_PERIOD_MINUTES,
+            )
 
-        match revenue_period:
-            case (revenue, start, end):
-                discharge_slot = BatteryDischargeSlot(
-                    start_time=start.time(),
-                    end_time=end.time(),
-                    current=self.configuration.battery_maximum_current,
-                )
+        match revenue_plan:
+            case (revenue, windows):
+                discharge_slots = [
+                    BatteryDischargeSlot(
+                        start_time=start.time(),
+                        end_time=end.time(),
+                        current=self.configuration.battery_maximum_current,
+                    )
+                    for start, end in windows
+                ]
                 self.appdaemon_logger.log(
-                    "Price threshold: %s, revenue: %s, battery discharge slot: %s",
+                    "Price threshold: %s, revenue: %s, battery discharge slots: %s",
                     price_threshold,
                     revenue,
-                    discharge_slot,
+                    Lazy(lambda: ", ".join(str(discharge_slot) for discharge_slot in discharge_slots)),
                 )
 
-                return discharge_slot
+                return discharge_slots
             case None:
                 self.appdaemon_logger.log("Skip, no suitable revenue for price threshold %s", price_threshold)
-                return None
+                return []
@@ -1,4 +1,12 @@
-from typing import Protocol
+import logging
+import sqlite3
+import time
+import zlib
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Protocol, cast
+from zoneinfo import ZoneInfo
 
 from appdaemon_protocols.appdaemon_logger import AppdaemonLogger
 from solar.consumption_forecast import (
@@ -12,6 +20,10 @@ from solar.production_forecast import ProductionForecast, ProductionForecastComp
 from solar.solar_configuration import SolarConfiguration
 from solar.solar_state import SolarState
 from solar.weather_forecast import WeatherForecast
+from utils.lru_cache import LruCache
+from utils.record_parser import ParseStats
+from utils.recorder import Recorder
+from utils.sqlite_snapshot_store import Snapshot, SqliteSnapshotStore
 
 
 class ForecastFactory(Protocol):
@@ -22,13 +34,16 @@ class ForecastFactory(Protocol):
 
 
 class DefaultForecastFactory:
+    # controls look at most a day ahead, weather integrations provide hourly forecasts for several days
+    _WEATHER_FORECAST_HORIZON = timedelta(hours=48)
+
     def __init__(self, appdaemon_logger: AppdaemonLogger, configuration: SolarConfiguration) -> None:
         self.appdaemon_logger = appdaemon_logger
         self.configuration = configuration
 
     def create_production_forecast(self, state: SolarState) -> ProductionForecast:
-        today = ProductionForecastDefault.create(state.pv_forecast_today)
-        tomorrow = ProductionForecastDefault.create(state.pv_forecast_tomorrow)
+        today = self._create_production_forecast(state.pv_forecast_today)
+        tomorrow = self._create_production_forecast(state.pv_forecast_tomorrow)
 
         return ProductionForecastComposite(today, tomorrow)
 
@@ -59,7 +74,227 @@ class DefaultForecastFactory:
 
     def create_price_forecast(self, state: SolarState) -> PriceForecast:
         raw_forecast = (state.price_forecast_today or []) + (state.price_forecast_tomorrow or [])
-        return PriceForecast.create_from_rce_15_mins(raw_forecast, self.configuration.time_zone)
+        stats = ParseStats()
+        price_forecast = PriceForecast.create_from_rce_15_mins(raw_forecast, self.configuration.time_zone, stats)
+        self._log_rejected("RCE", stats)
+        return price_forecast
 
     def create_weather_forecast(self, state: SolarState) -> WeatherForecast:
-        return WeatherForecast.create(state.weather_forecast)
+        stats = ParseStats()
+        weather_forecast = WeatherForecast.create(state.weather_forecast, stats, self._WEATHER_FORECAST_HORIZON)
+        self._log_rejected("weather", stats)
+        return weather_forecast
+
+    def _create_production_forecast(self, raw_forecast: list | None) -> ProductionForecastDefault:
+        stats = ParseStats()
+        production_forecast = ProductionForecastDefault.create(raw_forecast, stats)
+        self._log_rejected("Solcast", stats)
+        return production_forecast
+
+    def _log_rejected(self, source: str, stats: ParseStats) -> None:
+        if stats.rejected_total() > 0:
+            self.appdaemon_logger.log("Rejected %s forecast records, %s", source, stats, level=logging.WARNING)
+
+
+# Memoizes parsed forecasts by content of the raw attribute lists, parsing happens once per data change.
+class CachingForecastFactory(DefaultForecastFactory):
+    _CACHE_SIZE = 4
+
+    def __init__(self, appdaemon_logger: AppdaemonLogger, configuration: SolarConfiguration) -> None:
+        super().__init__(appdaemon_logger, configuration)
+        self.production_cache = LruCache[int, ProductionForecastDefault](self._CACHE_SIZE)
+        self.price_cache = LruCache[int, PriceForecast](self._CACHE_SIZE)
+        self.weather_cache = LruCache[int, WeatherForecast](self._CACHE_SIZE)
+
+    def create_price_forecast(self, state: SolarState) -> PriceForecast:
+        key = hash((self._fingerprint(state.price_forecast_today), self._fingerprint(state.price_forecast_tomorrow)))
+        return self.price_cache.get_or_create(
+            key, lambda: super(CachingForecastFactory, self).create_price_forecast(state)
+        )
+
+    def create_weather_forecast(self, state: SolarState) -> WeatherForecast:
+        return self.weather_cache.get_or_create(
+            self._fingerprint(state.weather_forecast),
+            lambda: super(CachingForecastFactory, self).create_weather_forecast(state),
+        )
+
+    def _create_production_forecast(self, raw_forecast: list | None) -> ProductionForecastDefault:
+        return self.production_cache.get_or_create(
+            self._fingerprint(raw_forecast),
+            lambda: super(CachingForecastFactory, self)._create_production_forecast(raw_forecast),
+        )
+
+    @staticmethod
+    def _fingerprint(raw_forecast: list | None) -> int:
+        # Home Assistant returns a fresh copy of attributes on every read, so the key is a hash of the content.
+        # It's never memoized by list identity, a list changed in place or a reused id would get a stale forecast.
+        return hash(repr(raw_forecast))
+
+
+class _Period(Protocol):
+    @property
+    def start(self) -> datetime: ...
+
+
+class _ForecastRecord(Protocol):
+    @property
+    def period(self) -> _Period: ...
+
+
+class _ForecastWithPeriods(Protocol):
+    @property
+    def periods(self) -> Sequence[_ForecastRecord]: ...
+
+
+# Falls back to the last persisted forecasts while Home Assistant attributes are missing, e.g. right after a restart.
+# A snapshot is timed by its newest forecast period and restored until that period is older than the max age.
+class PersistentForecastFactory(CachingForecastFactory):
+    def __init__(
+        self,
+        appdaemon_logger: AppdaemonLogger,
+        configuration: SolarConfiguration,
+        snapshot_store: SqliteSnapshotStore,
+        max_age: timedelta,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        super().__init__(appdaemon_logger, configuration)
+        self.snapshot_store = snapshot_store
+        self.max_age = max_age
+        self.clock = clock
+        self._saved: dict[str, object] = {}
+        self._restored: dict[str, tuple[object, float]] = {}
+
+    def create_production_forecast(self, state: SolarState) -> ProductionForecast:
+        today = self._persisted(
+            "production_today",
+            state.pv_forecast_today,
+            lambda: self._create_production_forecast(state.pv_forecast_today),
+            ProductionForecastDefault,
+        )
+        tomorrow = self._persisted(
+            "production_tomorrow",
+            state.pv_forecast_tomorrow,
+            lambda: self._create_production_forecast(state.pv_forecast_tomorrow),
+            ProductionForecastDefault,
+        )
+
+        return ProductionForecastComposite(today, tomorrow)
+
+    def create_price_forecast(self, state: SolarState) -> PriceForecast:
+        return self._persisted(
+            "price",
+            # the forecast is parsed from both days, either of them is fresh data
+            state.price_forecast_today or state.price_forecast_tomorrow,
+            lambda: super(PersistentForecastFactory, self).create_price_forecast(state),
+            PriceForecast,
+        )
+
+    def create_weather_forecast(self, state: SolarState) -> WeatherForecast:
+        return self._persisted(
+            "weather",
+            state.weather_forecast,
+            lambda: super(PersistentForecastFactory, self).create_weather_forecast(state),
+            WeatherForecast,
+        )
+
+    def _persisted[F: _ForecastWithPeriods](
+        self, name: str, raw_forecast: list | None, create: Callable[[], F], restore: Callable[[list], F]
+    ) -> F:
+        if raw_forecast:
+            forecast = create()
+            # cached forecasts are the same object until the data changes, so the snapshot is written once per change
+            if self._saved.get(name) is not forecast and forecast.periods:
+                self._save(name, list(forecast.periods))
+                self._saved[name] = forecast
+                self._restored.pop(name, None)
+            return forecast
+
+        now = self.clock()
+        if name not in self._restored:
+            snapshot = self._load(name, now)
+            if snapshot is None or not isinstance(snapshot.value, list):
+                return create()
+            self._restored[name] = (restore(snapshot.value), snapshot.timestamp)
+            self.appdaemon_logger.log(
+                "Restored %s forecast snapshot with periods until %s",
+                name,
+                datetime.fromtimestamp(snapshot.timestamp, ZoneInfo(self.configuration.time_zone)).isoformat(),
+            )
+
+        restored, timestamp = self._restored[name]
+        if now - timestamp > self.max_age.total_seconds():
+            del self._restored[name]
+            return create()
+        return cast("F", restored)
+
+    def _save(self, name: str, periods: list[_ForecastRecord]) -> None:
+        timestamp = max(record.period.start for record in periods).timestamp()
+        try:
+            self.snapshot_store.save(name, periods, timestamp)
+        except sqlite3.Error as e:
+            self.appdaemon_logger.log("Can't save %s forecast snapshot: %s", name, e, level=logging.WARNING)
+
+    def _load(self, name: str, now: float) -> Snapshot | None:
+        try:
+            return self.snapshot_store.load(name, now, self.max_age.total_seconds())
+        except sqlite3.Error as e:
+            self.appdaemon_logger.log("Can't load %s forecast snapshot: %s", name, e, level=logging.WARNING)
+            return None
+
+
+@dataclass(frozen=True, slots=True)
+class ForecastDigest:
+    name: str
+    periods: int
+    first_period_start: datetime | None
+    last_period_start: datetime | None
+    checksum: int  # CRC32 of the periods, stable across restarts unlike hash()
+
+
+def forecast_digest(name: str, forecast: _ForecastWithPeriods) -> ForecastDigest:
+    periods = forecast.periods
+    return ForecastDigest(
+        name=name,
+        periods=len(periods),
+        first_period_start=periods[0].period.start if periods else None,
+        last_period_start=periods[-1].period.start if periods else None,
+        checksum=zlib.crc32(repr(periods).encode()),
+    )
+
+
+# Records a digest of every newly parsed forecast, not the periods, a forecast is parsed again only when it changes.
+# Consumption forecasts are derived from the state and the weather forecast, they aren't recorded.
+class RecordingForecastFactory:
+    KIND = "forecast"
+
+    def __init__(self, forecast_factory: ForecastFactory, recorder: Recorder) -> None:
+        self.forecast_factory = forecast_factory
+        self.recorder = recorder
+        self._last: dict[str, object] = {}
+
+    def create_production_forecast(self, state: SolarState) -> ProductionForecast:
+        forecast = self.forecast_factory.create_production_forecast(state)
+        if isinstance(forecast, ProductionForecastComposite):
+            for name, component in zip(("production_today", "production_tomorrow"), forecast.components, strict=False):
+                if isinstance(component, ProductionForecastDefault):
+                    self._record(name, component)
+        return forecast
+
+    def create_consumption_forecast(self, state: SolarState) -> ConsumptionForecast:
+        return self.forecast_factory.create_consumption_forecast(state)
+
+    def create_price_forecast(self, state: SolarState) -> PriceForecast:
+        forecast = self.forecast_factory.create_price_forecast(state)
+        self._record("price", forecast)
+        return forecast
+
+    def create_weather_forecast(self, state: SolarState) -> WeatherForecast:
+        forecast = self.forecast_factory.create_weather_forecast(state)
+        self._record("weather", forecast)
+        return forecast
+
+    def _record(self, name: str, forecast: _ForecastWithPeriods) -> None:
+        # cached forecasts are the same object until the data changes
+        if self._last.get(name) is not forecast:
+            self.recorder.record(self.KIND, forecast_digest(name, forecast))
+            self._last[name] = forecast
@@ -8,53 +8,52 @@ from units.fifteen_minute_price import FifteenMinutePrice
 from units.hourly_period import HourlyPeriod
 from units.hourly_price import HourlyPrice
 from units.money import Money
+from units.price_vector import PriceVector
+from utils.record_parser import ParseStats, RecordSchema, parse_records
+from utils.time_series import TimeSeries
 from utils.time_utils import truncate_to_hour
 
+_RCE_DTIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
 
 class PriceForecast:
     @classmethod
-    def create_from_rce_15_mins(cls, raw_forecast: list | None, time_zone: str) -> "PriceForecast":
-        periods = []
-
-        if raw_forecast is not None:
-            for item in raw_forecast:
-                if not isinstance(item, dict):
-                    continue
-                if not all(key in item for key in ["dtime", "rce_pln"]):
-                    continue
-
-                try:
-                    periods.append(
-                        FifteenMinutePrice(
-                            period=FifteenMinutePeriod.parse_custom_from_end_date(
-                                item["dtime"], format="%Y-%m-%d %H:%M:%S", time_zone=time_zone
-                            ),
-                            price=EnergyPrice.per_mwh(Money.pln(Decimal(str(item["rce_pln"])))),
-                        )
-                    )
-                except (ValueError, TypeError, KeyError):
-                    continue
-
-        return cls(periods)
+    def create_from_rce_15_mins(
+        cls, raw_forecast: list | None, time_zone: str, stats: ParseStats | None = None
+    ) -> "PriceForecast":
+        schema = RecordSchema(
+            name="RCE",
+            required_keys=("dtime", "rce_pln"),
+            build=lambda item: FifteenMinutePrice(
+                period=FifteenMinutePeriod.parse_custom_from_end_date(
+                    item["dtime"], format=_RCE_DTIME_FORMAT, time_zone=time_zone
+                ),
+                price=EnergyPrice.per_mwh(Money.pln(Decimal(str(item["rce_pln"])))),
+            ),
+        )
+        return cls(list(parse_records(raw_forecast, schema, stats)))
 
     def __init__(self, periods: list[FifteenMinutePrice]) -> None:
         self.periods = periods
-        self.hourly_periods = [
-            HourlyPrice(
-                period=HourlyPeriod(start=hour),
-                price=sum(prices[1:], start=prices[0]) / Decimal(len(prices)),
+        self.price_vector = PriceVector.from_prices(p.price for p in periods)
+        self.hourly_periods: list[HourlyPrice] = []
+
+        start_idx = 0
+        for hour, group in groupby(periods, key=lambda p: truncate_to_hour(p.period.start)):
+            end_idx = start_idx + sum(1 for _ in group)
+            non_negative_sum = sum(max(price, 0) for price in self.price_vector.values[start_idx:end_idx])
+            self.hourly_periods.append(
+                HourlyPrice(
+                    period=HourlyPeriod(start=hour),
+                    price=self.price_vector.to_energy_price(non_negative_sum, count=end_idx - start_idx),
+                )
             )
-            for hour, group in groupby(periods, key=lambda p: truncate_to_hour(p.period.start))
-            if (prices := [p.price.non_negative() for p in group])
-        ]
+            start_idx = end_idx
+        self._fifteen_minute_series = TimeSeries(self.periods, key=lambda p: p.period.start)
+        self._hourly_series = TimeSeries(self.hourly_periods, key=lambda p: p.period.start)
 
     def find_min_hour(self, period_start: datetime, period_hours: int) -> HourlyPrice | None:
-        period_end = period_start + timedelta(hours=period_hours)
-        hourly_prices = [
-            hourly_period
-            for hourly_period in self.hourly_periods
-            if period_start <= hourly_period.period.start < period_end
-        ]
+        hourly_prices = self._hourly_series.range(period_start, period_start + timedelta(hours=period_hours))
         if not hourly_prices:
             return None
 
@@ -62,19 +61,14 @@ class PriceForecast:
 
     def average_price(self, period_start: datetime, period_hours: int) -> EnergyPrice | None:
         period_end = period_start + timedelta(hours=period_hours)
-        hourly_prices = [
-            hourly_period.price
-            for hourly_period in self.hourly_periods
-            if period_start <= hourly_period.period.start < period_end
-        ]
+        hourly_prices = [hourly_period.price for hourly_period in self._hourly_series.range(period_start, period_end)]
         if not hourly_prices:
             return None
 
         return sum(hourly_prices[1:], start=hourly_prices[0]) / Decimal(len(hourly_prices))
 
+    def fifteen_minute(self, period_start: datetime, period_end: datetime) -> list[FifteenMinutePrice]:
+        return self._fifteen_minute_series.range(period_start, period_end)
+
     def hourly(self, period_start: datetime, period_end: datetime) -> list[HourlyPrice]:
-        return [
-            hourly_period
-            for hourly_period in self.hourly_periods
-            if period_start <= hourly_period.period.start < period_end
-        ]
+        return self._hourly_series.range(period_start, period_end)
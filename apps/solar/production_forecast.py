@@ -4,6 +4,17 @@ from typing import Protocol
 from units.energy_kwh import ENERGY_KWH_ZERO, EnergyKwh
 from units.hourly_energy import HourlyProductionEnergy
 from units.hourly_period import HourlyPeriod
+from utils.record_parser import ParseStats, RecordSchema, parse_records
+from utils.time_series import TimeSeries
+
+SOLCAST_SCHEMA = RecordSchema(
+    name="Solcast",
+    required_keys=("period_start", "pv_estimate"),
+    build=lambda item: HourlyProductionEnergy(
+        period=HourlyPeriod.parse(item["period_start"]),
+        energy=EnergyKwh(item["pv_estimate"]),
+    ),
+)
 
 
 class ProductionForecast(Protocol):
@@ -31,33 +42,15 @@ class ProductionForecastComposite:
 # Solar production forecast based on Solcast integration
 class ProductionForecastDefault:
     @classmethod
-    def create(cls, raw_forecast: list) -> "ProductionForecastDefault":
-        periods = []
-
-        for item in raw_forecast:
-            if not isinstance(item, dict):
-                continue
-            if not all(key in item for key in ["period_start", "pv_estimate"]):
-                continue
-
-            try:
-                periods.append(
-                    HourlyProductionEnergy(
-                        period=HourlyPeriod.parse(item["period_start"]),
-                        energy=EnergyKwh(item["pv_estimate"]),
-                    )
-                )
-            except (ValueError, TypeError, KeyError):
-                continue
-
-        return cls(periods)
+    def create(cls, raw_forecast: list | None, stats: ParseStats | None = None) -> "ProductionForecastDefault":
+        return cls(list(parse_records(raw_forecast, SOLCAST_SCHEMA, stats)))
 
     def __init__(self, periods: list[HourlyProductionEnergy]) -> None:
         self.periods = periods
+        self._series = TimeSeries(periods, key=lambda p: p.period.start)
 
     def hourly(self, period_start: datetime, period_hours: int) -> list[HourlyProductionEnergy]:
-        period_end = period_start + timedelta(hours=period_hours)
-        return [period for period in self.periods if period_start <= period.period.start < period_end]
+        return self._series.range(period_start, period_start + timedelta(hours=period_hours))
 
     def total(self, period_start: datetime, period_hours: int) -> EnergyKwh:
         total_energy = ENERGY_KWH_ZERO
@@ -1,4 +1,5 @@
 import logging
+import time
 from datetime import datetime
 
 from appdaemon_protocols.appdaemon_logger import AppdaemonLogger
@@ -8,12 +9,17 @@ from entities.entities import (
     BATTERY_MAX_CHARGE_CURRENT_ENTITY,
     BATTERY_MAX_DISCHARGE_CURRENT_ENTITY,
     BATTERY_RESERVE_SOC_ENTITY,
+    DISCHARGE_SLOTS,
     EXCESS_ENERGY_ENTITY,
     INVERTER_STORAGE_MODE_ENTITY,
     SLOT1_DISCHARGE_CURRENT_ENTITY,
     SLOT1_DISCHARGE_ENABLED_ENTITY,
     SLOT1_DISCHARGE_TIME_ENTITY,
+    slot_discharge_current_entity,
+    slot_discharge_enabled_entity,
+    slot_discharge_time_entity,
 )
+from solar.battery_discharge_slot import BatteryDischargeSlot
 from solar.battery_discharge_slot_estimator import BatteryDischargeSlotEstimator
 from solar.battery_max_current_estimator import BatteryMaxCurrentEstimator
 from solar.battery_reserve_soc_estimator import BatteryReserveSocEstimator
@@ -42,6 +48,12 @@ class Solar:
         storage_mode_estimator: StorageModeEstimator,
         excess_energy_estimator: ExcessEnergyEstimator,
     ) -> None:
+        if not 1 <= configuration.battery_discharge_max_slots <= DISCHARGE_SLOTS:
+            raise ValueError(
+                f"battery_discharge_max_slots must be between 1 and {DISCHARGE_SLOTS}, "
+                f"got {configuration.battery_discharge_max_slots}"
+            )
+
         self.appdaemon_logger = appdaemon_logger
         self.appdaemon_service = appdaemon_service
         self.configuration = configuration
@@ -58,6 +70,26 @@ class Solar:
         else:
             self.appdaemon_logger.log("Current state: %s", state)
 
+    def control_scheduled(self, now: datetime) -> None:
+        self.appdaemon_logger.log("Control scheduled battery settings")
+
+        if (state := self.state_factory.create()) is None:
+            self.appdaemon_logger.log("Unknown state, cannot control scheduled battery settings", level=logging.WARNING)
+            return
+
+        # all stages see the same snapshot, so the actions of a single tick are consistent with each other
+        stages = [
+            ("battery reserve SoC", lambda: self._control_battery_reserve_soc(state, now)),
+            ("battery max charge current", lambda: self._control_battery_max_charge_current(state, now)),
+            ("battery max discharge current", lambda: self._control_battery_max_discharge_current(state)),
+        ]
+        for stage_name, stage in stages:
+            stage_start = time.perf_counter()
+            stage()
+            self.appdaemon_logger.log(
+                "Stage %s took %.1f ms", stage_name, (time.perf_counter() - stage_start) * 1000, level=logging.DEBUG
+            )
+
     def control_battery_reserve_soc(self, now: datetime) -> None:
         self.appdaemon_logger.log("Control battery reserve SoC")
 
@@ -65,13 +97,7 @@ class Solar:
             self.appdaemon_logger.log("Unknown state, cannot control battery reserve SoC", level=logging.WARNING)
             return
 
-        battery_reserve_soc = self.battery_reserve_soc_estimator.estimate_battery_reserve_soc(state, now)
-
-        if battery_reserve_soc is not None:
-            self.appdaemon_logger.log(
-                "Change battery reserve SoC from %s to %s", state.battery_reserve_soc, battery_reserve_soc
-            )
-            self._set_battery_reserve_soc(battery_reserve_soc)
+        self._control_battery_reserve_soc(state, now)
 
     def control_battery_max_charge_current(self, now: datetime) -> None:
         self.appdaemon_logger.log("Control battery max charge current")
@@ -80,15 +106,7 @@ class Solar:
             self.appdaemon_logger.log("Unknown state, cannot control battery max charge current", level=logging.WARNING)
             return
 
-        battery_max_charge_current = self.battery_max_current_estimator.estimate_battery_max_charge_current(state, now)
-
-        if battery_max_charge_current is not None:
-            self.appdaemon_logger.log(
-                "Change battery max charge current from %s to %s",
-                state.battery_max_charge_current,
-                battery_max_charge_current,
-            )
-            self._set_battery_max_charge_current(battery_max_charge_current)
+        self._control_battery_max_charge_current(state, now)
 
     def control_battery_max_discharge_current(self) -> None:
         self.appdaemon_logger.log("Control battery max discharge current")
@@ -99,15 +117,7 @@ class Solar:
             )
             return
 
-        battery_max_discharge_current = self.battery_max_current_estimator.estimate_battery_max_discharge_current(state)
-
-        if battery_max_discharge_current is not None:
-            self.appdaemon_logger.log(
-                "Change battery max discharge current from %s to %s",
-                state.battery_max_discharge_current,
-                battery_max_discharge_current,
-            )
-            self._set_battery_max_discharge_current(battery_max_discharge_current)
+        self._control_battery_max_discharge_current(state)
 
     def control_storage_mode(self, now: datetime) -> None:
         self.appdaemon_logger.log("Control storage mode")
@@ -146,21 +156,10 @@ class Solar:
             self.appdaemon_logger.log("Unknown state, cannot schedule battery discharge", level=logging.WARNING)
             return
 
-        estimated_battery_discharge_slot = self.battery_discharge_slot_estimator.estimate_battery_discharge_at_4_pm(
+        estimated_battery_discharge_slots = self.battery_discharge_slot_estimator.estimate_battery_discharge_at_4_pm(
             state, now
         )
-
-        if estimated_battery_discharge_slot is not None:
-            self.appdaemon_logger.log("Enable battery discharge slot: %s", estimated_battery_discharge_slot)
-            self._set_slot1_discharge(
-                state,
-                estimated_battery_discharge_slot.time_str(),
-                estimated_battery_discharge_slot.current,
-            )
-            self._enable_slot1_discharge(state)
-        else:
-            self.appdaemon_logger.log("Disable battery discharge")
-            self._disable_slot1_discharge(state)
+        self._schedule_battery_discharge(state, estimated_battery_discharge_slots)
 
     def schedule_battery_discharge_at_6_am(self, now: datetime) -> None:
         self.appdaemon_logger.log("Schedule battery discharge at 6 AM")
@@ -169,21 +168,10 @@ class Solar:
             self.appdaemon_logger.log("Unknown state, cannot schedule battery discharge", level=logging.WARNING)
             return
 
-        estimated_battery_discharge_slot = self.battery_discharge_slot_estimator.estimate_battery_discharge_at_6_am(
+        estimated_battery_discharge_slots = self.battery_discharge_slot_estimator.estimate_battery_discharge_at_6_am(
             state, now
         )
-
-        if estimated_battery_discharge_slot is not None:
-            self.appdaemon_logger.log("Enable battery discharge slot: %s", estimated_battery_discharge_slot)
-            self._set_slot1_discharge(
-                state,
-                estimated_battery_discharge_slot.time_str(),
-                estimated_battery_discharge_slot.current,
-            )
-            self._enable_slot1_discharge(state)
-        else:
-            self.appdaemon_logger.log("Disable battery discharge")
-            self._disable_slot1_discharge(state)
+        self._schedule_battery_discharge(state, estimated_battery_discharge_slots)
 
     def disable_battery_discharge(self) -> None:
         self.appdaemon_logger.log("Disable battery discharge")
@@ -194,6 +182,8 @@ class Solar:
 
         self.appdaemon_logger.log("Disable battery discharge")
         self._disable_slot1_discharge(state)
+        for slot in self._extra_discharge_slots():
+            self._disable_slot_discharge(slot)
 
     def reset_battery_full_charge_timer_if_full(
         self, old_battery_soc_state: object, new_battery_soc_state: object
@@ -210,6 +200,60 @@ class Solar:
             self.appdaemon_logger.log("Reset battery full-charge timer")
             self._restart_battery_full_charge_timer()
 
+    def _schedule_battery_discharge(self, state: SolarState, discharge_slots: list[BatteryDischargeSlot]) -> None:
+        if discharge_slots:
+            self.appdaemon_logger.log(
+                "Enable battery discharge slots: %s",
+                ", ".join(str(discharge_slot) for discharge_slot in discharge_slots),
+            )
+            first_discharge_slot = discharge_slots[0]
+            self._set_slot1_discharge(state, first_discharge_slot.time_str(), first_discharge_slot.current)
+            self._enable_slot1_discharge(state)
+        else:
+            self.appdaemon_logger.log("Disable battery discharge")
+            self._disable_slot1_discharge(state)
+
+        # slots 2+ aren't part of the state, the service dispatcher drops writes the inverter already has
+        for slot in self._extra_discharge_slots():
+            if slot <= len(discharge_slots):
+                self._set_slot_discharge(slot, discharge_slots[slot - 1])
+            else:
+                self._disable_slot_discharge(slot)
+
+    def _extra_discharge_slots(self) -> range:
+        return range(2, self.configuration.battery_discharge_max_slots + 1)
+
+    def _control_battery_reserve_soc(self, state: SolarState, now: datetime) -> None:
+        battery_reserve_soc = self.battery_reserve_soc_estimator.estimate_battery_reserve_soc(state, now)
+
+        if battery_reserve_soc is not None:
+            self.appdaemon_logger.log(
+                "Change battery reserve SoC from %s to %s", state.battery_reserve_soc, battery_reserve_soc
+            )
+            self._set_battery_reserve_soc(battery_reserve_soc)
+
+    def _control_battery_max_charge_current(self, state: SolarState, now: datetime) -> None:
+        battery_max_charge_current = self.battery_max_current_estimator.estimate_battery_max_charge_current(state, now)
+
+        if battery_max_charge_current is not None:
+            self.appdaemon_logger.log(
+                "Change battery max charge current from %s to %s",
+                state.battery_max_charge_current,
+                battery_max_charge_current,
+            )
+            self._set_battery_max_charge_current(battery_max_charge_current)
+
+    def _control_battery_max_discharge_current(self, state: SolarState) -> None:
+        battery_max_discharge_current = self.battery_max_current_estimator.estimate_battery_max_discharge_current(state)
+
+        if battery_max_discharge_current is not None:
+            self.appdaemon_logger.log(
+                "Change battery max discharge current from %s to %s",
+                state.battery_max_discharge_current,
+                battery_max_discharge_current,
+            )
+            self._set_battery_max_discharge_current(battery_max_discharge_current)
+
     def _set_battery_reserve_soc(self, battery_reserve_soc: BatterySoc) -> None:
         self.appdaemon_service.call_service(
             "number/set_value",
@@ -289,6 +333,32 @@ class Solar:
         else:
             self.appdaemon_logger.log("Slot 1 battery discharge is already disabled")
 
+    def _set_slot_discharge(self, slot: int, discharge_slot: BatteryDischargeSlot) -> None:
+        self.appdaemon_service.call_service(
+            "text/set_value",
+            callback=LoggingAppdaemonCallback(self.appdaemon_logger),
+            entity_id=slot_discharge_time_entity(slot),
+            value=discharge_slot.time_str(),
+        )
+        self.appdaemon_service.call_service(
+            "number/set_value",
+            callback=LoggingAppdaemonCallback(self.appdaemon_logger),
+            entity_id=slot_discharge_current_entity(slot),
+            value=discharge_slot.current.value,
+        )
+        self.appdaemon_service.call_service(
+            "switch/turn_on",
+            callback=LoggingAppdaemonCallback(self.appdaemon_logger),
+            entity_id=slot_discharge_enabled_entity(slot),
+        )
+
+    def _disable_slot_discharge(self, slot: int) -> None:
+        self.appdaemon_service.call_service(
+            "switch/turn_off",
+            callback=LoggingAppdaemonCallback(self.appdaemon_logger),
+            entity_id=slot_discharge_enabled_entity(slot),
+        )
+
     def _restart_battery_full_charge_timer(self) -> None:
         # no callbacks to keep order of operations
         self.appdaemon_service.call_service(
@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 from datetime import time
+from decimal import Decimal
 
 from units.battery_current import BatteryCurrent
 from units.battery_soc import BatterySoc
@@ -7,6 +8,7 @@ from units.battery_voltage import BatteryVoltage
 from units.celsius import Celsius
 from units.energy_kwh import EnergyKwh
 from units.energy_price import EnergyPrice
+from units.money import Money
 
 
 @dataclass(frozen=True)
@@ -40,9 +42,69 @@ class SolarConfiguration:
     battery_discharge_evening_margin: EnergyPrice
     battery_discharge_morning_margin: EnergyPrice
     battery_export_threshold_energy: EnergyKwh
+    battery_discharge_max_slots: int
 
     night_low_tariff_time_start: time
     night_low_tariff_time_end: time
 
     day_low_tariff_time_start: time
     day_low_tariff_time_end: time
+
+
+def create_configuration(time_zone: str) -> SolarConfiguration:
+    return SolarConfiguration(
+        time_zone=time_zone,
+        # nominal battery capacity
+        battery_capacity=EnergyKwh(20.0),
+        # nominal battery voltage
+        battery_voltage=BatteryVoltage(52.0),
+        # maximum battery discharge/charge current
+        battery_maximum_current=BatteryCurrent(160.0),
+        # night charge current during low tariff periods
+        battery_night_charge_current=BatteryCurrent(40.0),
+        # minimum reserve SOC
+        battery_reserve_soc_min=BatterySoc(20.0),
+        # margin above minimum reserve SOC
+        battery_reserve_soc_margin=BatterySoc(5.0),
+        # upper limit when charging from the grid
+        battery_reserve_soc_max=BatterySoc(90.0),
+        # indoor temperature setpoint to estimate heating needs
+        temp_in=Celsius(20.0),
+        # heating boost window start time in eco mode
+        heating_boost_start_eco_on=time.fromisoformat("22:05:00"),
+        # heating boost window end time in eco mode
+        heating_boost_end_eco_on=time.fromisoformat("15:55:00"),
+        # coefficient of heat-pump performance at 7 degrees Celsius
+        heating_cop_at_7c=4.0,
+        # coefficient representing building heat loss rate in kW/°C
+        heating_h=0.18,
+        # outdoor temperature if weather forecast isn't available
+        temp_out_fallback=Celsius(2.0),
+        # outdoor humidity if weather forecast isn't available
+        humidity_out_fallback=80.0,
+        # regular consumption when in away mode
+        regular_consumption_away=EnergyKwh(0.35),
+        # consumption during daytime
+        regular_consumption_day=EnergyKwh(0.6),
+        # consumption during evening
+        regular_consumption_evening=EnergyKwh(1.0),
+        # threshold for exporting PV energy, net price
+        pv_export_threshold_price=EnergyPrice.per_mwh(Money.pln(Decimal(150))),
+        # evening margin added to midday avg price for battery discharge threshold
+        battery_discharge_evening_margin=EnergyPrice.per_mwh(Money.pln(Decimal(750))),
+        # morning margin added to midday avg price for battery discharge threshold
+        battery_discharge_morning_margin=EnergyPrice.per_mwh(Money.pln(Decimal(450))),
+        # skip battery export below this threshold
+        battery_export_threshold_energy=EnergyKwh(1.0),
+        # inverter discharge slots used for price peaks within a discharge window, up to 6,
+        # evaluate more slots on the recorded history with "--sweep battery_discharge_max_slots=1,2"
+        battery_discharge_max_slots=1,
+        # start time of night low tariff period (with margin)
+        night_low_tariff_time_start=time.fromisoformat("22:05:00"),
+        # end time of night low tariff period (with margin)
+        night_low_tariff_time_end=time.fromisoformat("06:55:00"),
+        # start time of day low tariff period (with margin)
+        day_low_tariff_time_start=time.fromisoformat("13:05:00"),
+        # end time of day low tariff period (with margin)
+        day_low_tariff_time_end=time.fromisoformat("15:55:00"),
+    )
@@ -41,6 +41,29 @@ class SolarStateFactory(Protocol):
 
 
 class DefaultSolarStateFactory:
+    ENTITY_IDS = (
+        BATTERY_SOC_ENTITY,
+        BATTERY_FULL_CHARGE_ENTITY,
+        BATTERY_RESERVE_SOC_ENTITY,
+        BATTERY_MAX_CHARGE_CURRENT_ENTITY,
+        BATTERY_MAX_DISCHARGE_CURRENT_ENTITY,
+        INDOOR_TEMPERATURE_ENTITY,
+        OUTDOOR_TEMPERATURE_ENTITY,
+        AWAY_MODE_ENTITY,
+        ECO_MODE_ENTITY,
+        INVERTER_STORAGE_MODE_ENTITY,
+        SLOT1_DISCHARGE_ENABLED_ENTITY,
+        SLOT1_DISCHARGE_TIME_ENTITY,
+        SLOT1_DISCHARGE_CURRENT_ENTITY,
+        HEATING_ENTITY,
+        PRICE_FORECAST_TODAY_ENTITY,
+        EXCESS_ENERGY_ENTITY,
+        PV_FORECAST_TODAY_ENTITY,
+        PV_FORECAST_TOMORROW_ENTITY,
+        WEATHER_FORECAST_ENTITY,
+        PRICE_FORECAST_TOMORROW_ENTITY,
+    )
+
     def __init__(
         self,
         appdaemon_logger: AppdaemonLogger,
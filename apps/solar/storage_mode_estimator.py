@@ -8,6 +8,7 @@ from solar.solar_state import SolarState
 from solar.storage_mode import StorageMode
 from utils.battery_estimators import estimate_battery_energy_gap_to_full
 from utils.energy_aggregators import total_surplus
+from utils.lazy_logger import Lazy
 from utils.time_utils import truncate_to_hour
 
 
@@ -28,8 +29,7 @@ class StorageModeEstimator:
 
     def estimate_storage_mode(self, state: SolarState, now: datetime) -> StorageMode | None:
         if now.hour >= self._FEED_IN_PRIORITY_END_HOUR:
-            reason = "past feed-in priority end hour"
-            return self._return_if_changed(state, StorageMode.SELF_USE, reason)
+            return self._return_if_changed(state, StorageMode.SELF_USE, "past feed-in priority end hour", hour=now.hour)
 
         required_battery_reserve_soc = (
             self.configuration.battery_reserve_soc_min + self.configuration.battery_reserve_soc_margin
@@ -37,8 +37,13 @@ class StorageModeEstimator:
         current_battery_soc = state.battery_soc
 
         if current_battery_soc < required_battery_reserve_soc:
-            reason = f"battery SoC {current_battery_soc} < {required_battery_reserve_soc}"
-            return self._return_if_changed(state, StorageMode.SELF_USE, reason)
+            return self._return_if_changed(
+                state,
+                StorageMode.SELF_USE,
+                "battery SoC below reserve",
+                battery_soc=current_battery_soc,
+                required_battery_soc=required_battery_reserve_soc,
+            )
 
         today_8_am = now.replace(hour=8, minute=0, second=0, microsecond=0)
         day_hours = 8
@@ -46,14 +51,18 @@ class StorageModeEstimator:
         price_forecast = self.forecast_factory.create_price_forecast(state)
         min_price = price_forecast.find_min_hour(today_8_am, day_hours)
         if min_price is None:
-            reason = "minimum price not found in the forecast"
-            return self._return_if_changed(state, StorageMode.SELF_USE, reason)
+            return self._return_if_changed(state, StorageMode.SELF_USE, "minimum price not found in the forecast")
 
         price_threshold = max(min_price.price.non_negative(), self.configuration.pv_export_threshold_price)
         current_price = state.hourly_price.non_negative()
         if current_price < price_threshold:
-            reason = f"price {current_price} < {price_threshold}"
-            return self._return_if_changed(state, StorageMode.SELF_USE, reason)
+            return self._return_if_changed(
+                state,
+                StorageMode.SELF_USE,
+                "price below threshold",
+                current_price=current_price,
+                threshold_price=price_threshold,
+            )
 
         current_hour = truncate_to_hour(now)
         remaining_hours = self._BATTERY_FULL_BY_HOUR - now.hour
@@ -72,19 +81,34 @@ class StorageModeEstimator:
 
         required_surplus = battery_gap_to_full * self._SURPLUS_SAFETY_FACTOR
         if remaining_surplus < required_surplus:
-            reason = f"remaining surplus: {remaining_surplus} < required: {required_surplus}"
-            return self._return_if_changed(state, StorageMode.SELF_USE, reason)
-
-        reason = (
-            f"current price: {current_price}, threshold price: {price_threshold}, "
-            + f"battery gap to full: {battery_gap_to_full}, remaining surplus: {remaining_surplus}"
+            return self._return_if_changed(
+                state,
+                StorageMode.SELF_USE,
+                "remaining surplus below required",
+                remaining_surplus=remaining_surplus,
+                required_surplus=required_surplus,
+            )
+
+        return self._return_if_changed(
+            state,
+            StorageMode.FEED_IN_PRIORITY,
+            "surplus fills the battery",
+            current_price=current_price,
+            threshold_price=price_threshold,
+            battery_gap_to_full=battery_gap_to_full,
+            remaining_surplus=remaining_surplus,
         )
-        return self._return_if_changed(state, StorageMode.FEED_IN_PRIORITY, reason)
 
-    def _return_if_changed(self, state: SolarState, storage_mode: StorageMode, reason: str) -> StorageMode | None:
+    def _return_if_changed(
+        self, state: SolarState, storage_mode: StorageMode, reason: str, **fields: object
+    ) -> StorageMode | None:
+        # fields are joined only with debug logging enabled, the estimator runs on every SoC and price change
+        details = Lazy(lambda: " | " + " ".join(f"{name}={value}" for name, value in fields.items()) if fields else "")
         if storage_mode != state.inverter_storage_mode:
-            self.appdaemon_logger.log("Use %s, %s", storage_mode, reason, level=logging.DEBUG)
+            self.appdaemon_logger.log("Use %s, %s%s", storage_mode, reason, details, level=logging.DEBUG)
             return storage_mode
         else:
-            self.appdaemon_logger.log("Skip, storage mode unchanged: %s, %s", storage_mode, reason, level=logging.DEBUG)
+            self.appdaemon_logger.log(
+                "Skip, storage mode unchanged: %s, %s%s", storage_mode, reason, details, level=logging.DEBUG
+            )
             return None
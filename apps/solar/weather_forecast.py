@@ -1,39 +1,47 @@
-from datetime import datetime
+from collections.abc import Callable
+from datetime import datetime, timedelta
 
 from units.celsius import Celsius
 from units.hourly_period import HourlyPeriod
 from units.hourly_weather import HourlyWeather
+from utils.record_parser import ParseStats, RecordSchema, parse_records
+from utils.time_series import TimeSeries
+
+WEATHER_SCHEMA = RecordSchema(
+    name="weather",
+    required_keys=("datetime", "temperature", "humidity"),
+    build=lambda item: HourlyWeather(
+        period=HourlyPeriod.parse(item["datetime"]),
+        temperature=Celsius(float(item["temperature"])),
+        humidity=float(item["humidity"]),
+    ),
+)
 
 
 class WeatherForecast:
     @classmethod
-    def create(cls, raw_forecast: list | None) -> "WeatherForecast":
-        periods = []
-
-        if raw_forecast is not None:
-            for item in raw_forecast:
-                if not isinstance(item, dict):
-                    continue
-                if not all(key in item for key in ["datetime", "temperature", "humidity"]):
-                    continue
-                try:
-                    periods.append(
-                        HourlyWeather(
-                            period=HourlyPeriod.parse(item["datetime"]),
-                            temperature=Celsius(float(item["temperature"])),
-                            humidity=float(item["humidity"]),
-                        )
-                    )
-                except (ValueError, TypeError, KeyError):
-                    continue
-
-        return cls(periods)
+    def create(
+        cls, raw_forecast: list | None, stats: ParseStats | None = None, horizon: timedelta | None = None
+    ) -> "WeatherForecast":
+        stop = None if horizon is None else _beyond_horizon(horizon)
+        return cls(list(parse_records(raw_forecast, WEATHER_SCHEMA, stats, stop)))
 
     def __init__(self, periods: list[HourlyWeather]) -> None:
         self.periods = periods
+        self._series = TimeSeries(periods, key=lambda p: p.period.start)
 
     def find_by_datetime(self, dt: datetime) -> HourlyWeather | None:
-        for period in self.periods:
-            if period.period.start == dt:
-                return period
-        return None
+        return self._series.find(dt)
+
+
+def _beyond_horizon(horizon: timedelta) -> Callable[[HourlyWeather], bool]:
+    # relative to the first record, so the parsed forecast depends on the content only and can be cached by it
+    end: datetime | None = None
+
+    def stop(weather: HourlyWeather) -> bool:
+        nonlocal end
+        if end is None:
+            end = weather.period.start + horizon
+        return weather.period.start >= end
+
+    return stop
@@ -1,117 +1,193 @@
-from datetime import time
-from decimal import Decimal
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from pathlib import Path
 
 import appdaemon.plugins.hass.hassapi as hass
-from entities.entities import BATTERY_SOC_ENTITY, PRICE_FORECAST_TODAY_ENTITY
+from aiohttp import web
+from entities.entities import (
+    BATTERY_MAX_CHARGE_CURRENT_ENTITY,
+    BATTERY_MAX_DISCHARGE_CURRENT_ENTITY,
+    BATTERY_RESERVE_SOC_ENTITY,
+    BATTERY_SOC_ENTITY,
+    DISCHARGE_SLOTS,
+    INVERTER_STORAGE_MODE_ENTITY,
+    PRICE_FORECAST_TODAY_ENTITY,
+    slot_discharge_current_entity,
+    slot_discharge_enabled_entity,
+    slot_discharge_time_entity,
+)
 from solar.battery_discharge_slot_estimator import BatteryDischargeSlotEstimator
 from solar.battery_max_current_estimator import BatteryMaxCurrentEstimator
 from solar.battery_reserve_soc_estimator import BatteryReserveSocEstimator
 from solar.excess_energy_estimator import ExcessEnergyEstimator
-from solar.forecast_factory import DefaultForecastFactory
+from solar.forecast_factory import PersistentForecastFactory, RecordingForecastFactory
 from solar.solar import Solar
-from solar.solar_configuration import SolarConfiguration
+from solar.solar_configuration import create_configuration
 from solar.solar_state_factory import DefaultSolarStateFactory
 from solar.storage_mode_estimator import StorageModeEstimator
-from units.battery_current import BatteryCurrent
-from units.battery_soc import BatterySoc
-from units.battery_voltage import BatteryVoltage
-from units.celsius import Celsius
-from units.energy_kwh import EnergyKwh
-from units.energy_price import EnergyPrice
-from units.money import Money
-from utils.appdaemon_utils import LoggingAppdaemonService, is_dry_run
+from utils.appdaemon_utils import LoggingAppdaemonService, is_dry_run, is_instrumented, recorder_path
+from utils.command_queue import CommandQueue
+from utils.debouncer import Debouncer
+from utils.instrumentation import Instrumentation, not_instrumented
+from utils.lazy_logger import LazyLogger
+from utils.recorder import Recorder, RecordingAppdaemonService, RecordingStateFactory, not_recorded
+from utils.service_dispatcher import BatchingAppdaemonService
+from utils.sqlite_snapshot_store import SqliteSnapshotStore
+from utils.state_store import SnapshotStateFactory, StateStore, fetch_states
+from utils.tick_profiler import TickProfiler
 
 
 class SolarApp(hass.Hass):
     _PRODUCTION_START_CONSTRAINT = "sunrise +00:30:00"
     _PRODUCTION_END_CONSTRAINT = "sunset -00:30:00"
+    _TRIGGER_QUIET_PERIOD_SECONDS = 30
+    _TRIGGER_MAX_LATENCY_SECONDS = 120
+    _FORECAST_SNAPSHOT_PATH = Path(__file__).with_name("solar_forecast_snapshots.db")
+    _FORECAST_SNAPSHOT_MAX_AGE = timedelta(hours=12)
+    _METRICS_SENSOR_PREFIX = "sensor.solar_stage"
+    _METRICS_PUBLISH_INTERVAL_SECONDS = 60
+    _PROFILE_DIRECTORY = "profiles"
+    _PROFILE_TOP_FUNCTIONS = 25
+    _INVERTER_WRITE_SPACING_SECONDS = 1.0
+    _INVERTER_ENTITY_WRITE_SPACING_SECONDS = 5.0
+    # reserve SoC protects the battery, slot settings only matter at the next discharge window
+    _INVERTER_WRITE_PRIORITIES = {
+        BATTERY_RESERVE_SOC_ENTITY: 0,
+        BATTERY_MAX_CHARGE_CURRENT_ENTITY: 1,
+        BATTERY_MAX_DISCHARGE_CURRENT_ENTITY: 1,
+        INVERTER_STORAGE_MODE_ENTITY: 2,
+        **{
+            entity_id: 3
+            for slot in range(1, DISCHARGE_SLOTS + 1)
+            for entity_id in (
+                slot_discharge_time_entity(slot),
+                slot_discharge_current_entity(slot),
+                slot_discharge_enabled_entity(slot),
+            )
+        },
+    }
 
     def initialize(self) -> None:
-        appdaemon_logger = self
+        # level checked before AppDaemon inspects the call stack, suppressed debug messages cost almost nothing
+        appdaemon_logger = LazyLogger(self, self.logger.isEnabledFor)
         appdaemon_state = self
         appdaemon_service = LoggingAppdaemonService(self) if is_dry_run(self) else self
 
-        configuration = SolarConfiguration(
-            time_zone=str(self.get_timezone()),
-            # nominal battery capacity
-            battery_capacity=EnergyKwh(20.0),
-            # nominal battery voltage
-            battery_voltage=BatteryVoltage(52.0),
-            # maximum battery discharge/charge current
-            battery_maximum_current=BatteryCurrent(160.0),
-            # night charge current during low tariff periods
-            battery_night_charge_current=BatteryCurrent(40.0),
-            # minimum reserve SOC
-            battery_reserve_soc_min=BatterySoc(20.0),
-            # margin above minimum reserve SOC
-            battery_reserve_soc_margin=BatterySoc(5.0),
-            # upper limit when charging from the grid
-            battery_reserve_soc_max=BatterySoc(90.0),
-            # indoor temperature setpoint to estimate heating needs
-            temp_in=Celsius(20.0),
-            # heating boost window start time in eco mode
-            heating_boost_start_eco_on=time.fromisoformat("22:05:00"),
-            # heating boost window end time in eco mode
-            heating_boost_end_eco_on=time.fromisoformat("15:55:00"),
-            # coefficient of heat-pump performance at 7 degrees Celsius
-            heating_cop_at_7c=4.0,
-            # coefficient representing building heat loss rate in kW/°C
-            heating_h=0.18,
-            # outdoor temperature if weather forecast isn't available
-            temp_out_fallback=Celsius(2.0),
-            # outdoor humidity if weather forecast isn't available
-            humidity_out_fallback=80.0,
-            # regular consumption when in away mode
-            regular_consumption_away=EnergyKwh(0.35),
-            # consumption during daytime
-            regular_consumption_day=EnergyKwh(0.6),
-            # consumption during evening
-            regular_consumption_evening=EnergyKwh(1.0),
-            # threshold for exporting PV energy, net price
-            pv_export_threshold_price=EnergyPrice.per_mwh(Money.pln(Decimal(150))),
-            # evening margin added to midday avg price for battery discharge threshold
-            battery_discharge_evening_margin=EnergyPrice.per_mwh(Money.pln(Decimal(750))),
-            # morning margin added to midday avg price for battery discharge threshold
-            battery_discharge_morning_margin=EnergyPrice.per_mwh(Money.pln(Decimal(450))),
-            # skip battery export below this threshold
-            battery_export_threshold_energy=EnergyKwh(1.0),
-            # start time of night low tariff period (with margin)
-            night_low_tariff_time_start=time.fromisoformat("22:05:00"),
-            # end time of night low tariff period (with margin)
-            night_low_tariff_time_end=time.fromisoformat("06:55:00"),
-            # start time of day low tariff period (with margin)
-            day_low_tariff_time_start=time.fromisoformat("13:05:00"),
-            # end time of day low tariff period (with margin)
-            day_low_tariff_time_end=time.fromisoformat("15:55:00"),
-        )
+        # without instrumentation the objects are used as they are, no overhead on any call
+        self.instrumentation = Instrumentation() if is_instrumented(self) else None
+        instrument = self.instrumentation.instrument if self.instrumentation is not None else not_instrumented
+        appdaemon_service = instrument(appdaemon_service, "service")
+
+        configuration = create_configuration(time_zone=str(self.get_timezone()))
 
-        state_factory = DefaultSolarStateFactory(appdaemon_logger, appdaemon_state)
-        forecast_factory = DefaultForecastFactory(appdaemon_logger, configuration)
+        state_store = StateStore(appdaemon_state, self)
+        # a single read of the whole namespace instead of a blocking round-trip per entity
+        state_store.preload(fetch_states(self, DefaultSolarStateFactory.ENTITY_IDS))
+        state_factory = SnapshotStateFactory(
+            state_store,
+            instrument(
+                DefaultSolarStateFactory(appdaemon_logger, instrument(state_store, "state_store")), "state_factory"
+            ),
+        )
+        # subscribe the store before control triggers, so it sees state changes before the triggered callbacks
+        state_factory.create()
+
+        self.recorder: Recorder | None = None
+        record_outputs = not_recorded
+        if (path := recorder_path(self)) is not None:
+            self.log("Recording states, forecasts, estimates and service calls to %s", path)
+            self.recorder = Recorder(path)
+            record_outputs = self.recorder.record_outputs
+            state_factory = RecordingStateFactory(state_factory, self.recorder, "solar_state")
+            appdaemon_service = RecordingAppdaemonService(appdaemon_service, self.recorder)
+
+        # calls of a single control run are flushed together, without writes the inverter already has
+        self.service_dispatcher = BatchingAppdaemonService(appdaemon_logger, state_store, appdaemon_service)
+        # inverter writes are spaced out and prioritised, bursts make the Modbus integration time out
+        self.command_queue = CommandQueue(
+            appdaemon_logger,
+            self,
+            self.service_dispatcher,
+            self._INVERTER_WRITE_PRIORITIES,
+            self._INVERTER_WRITE_SPACING_SECONDS,
+            self._INVERTER_ENTITY_WRITE_SPACING_SECONDS,
+        )
+        appdaemon_service = instrument(self.command_queue, "command_queue")
+
+        # last parsed forecasts are used on restart until Home Assistant provides fresh attributes
+        self.forecast_factory = PersistentForecastFactory(
+            appdaemon_logger,
+            configuration,
+            SqliteSnapshotStore(self._FORECAST_SNAPSHOT_PATH),
+            self._FORECAST_SNAPSHOT_MAX_AGE,
+        )
+        forecast_factory = instrument(self.forecast_factory, "forecast_factory")
+        if self.recorder is not None:
+            forecast_factory = RecordingForecastFactory(forecast_factory, self.recorder)
 
         self.solar = Solar(
             appdaemon_logger=appdaemon_logger,
             appdaemon_service=appdaemon_service,
             configuration=configuration,
             state_factory=state_factory,
-            battery_max_current_estimator=BatteryMaxCurrentEstimator(appdaemon_logger, configuration),
-            battery_discharge_slot_estimator=BatteryDischargeSlotEstimator(
-                appdaemon_logger, configuration, forecast_factory
+            battery_max_current_estimator=instrument(
+                record_outputs(
+                    BatteryMaxCurrentEstimator(appdaemon_logger, configuration), "battery_max_current_estimator"
+                ),
+                "battery_max_current_estimator",
+            ),
+            battery_discharge_slot_estimator=instrument(
+                record_outputs(
+                    BatteryDischargeSlotEstimator(appdaemon_logger, configuration, forecast_factory),
+                    "battery_discharge_slot_estimator",
+                ),
+                "battery_discharge_slot_estimator",
+            ),
+            battery_reserve_soc_estimator=instrument(
+                record_outputs(
+                    BatteryReserveSocEstimator(appdaemon_logger, configuration, forecast_factory),
+                    "battery_reserve_soc_estimator",
+                ),
+                "battery_reserve_soc_estimator",
+            ),
+            storage_mode_estimator=instrument(
+                record_outputs(
+                    StorageModeEstimator(appdaemon_logger, configuration, forecast_factory), "storage_mode_estimator"
+                ),
+                "storage_mode_estimator",
+            ),
+            excess_energy_estimator=instrument(
+                record_outputs(ExcessEnergyEstimator(appdaemon_logger, configuration), "excess_energy_estimator"),
+                "excess_energy_estimator",
             ),
-            battery_reserve_soc_estimator=BatteryReserveSocEstimator(appdaemon_logger, configuration, forecast_factory),
-            storage_mode_estimator=StorageModeEstimator(appdaemon_logger, configuration, forecast_factory),
-            excess_energy_estimator=ExcessEnergyEstimator(appdaemon_logger, configuration),
         )
 
-        self.listen_event(self.solar_debug, "SOLAR_DEBUG")
+        if self.instrumentation is not None:
+            self.log(
+                "Publishing instrumentation as %s_* sensors and at /app/solar_metrics", self._METRICS_SENSOR_PREFIX
+            )
+            self.run_every(self.publish_instrumentation, "now", self._METRICS_PUBLISH_INTERVAL_SECONDS)
+            self.register_route(self.instrumentation_metrics, "solar_metrics")
 
-        self.log("Setting up battery reserve SoC control")
-        self.run_every(self.control_battery_reserve_soc, "00:00:00", 5 * 60)
+        # the SOLAR_DEBUG event with profile_ticks data profiles the next control runs
+        self.tick_profiler = TickProfiler(appdaemon_logger, Path(self.config_dir) / self._PROFILE_DIRECTORY)
+        self.listen_event(self.solar_debug, "SOLAR_DEBUG")
 
-        self.log("Setting up battery max charge current control")
-        self.run_every(self.control_battery_max_charge_current, "00:00:00", 5 * 60)
+        self.log("Setting up battery reserve SoC, max charge and max discharge current control")
+        self.run_every(self.control_scheduled, "00:00:00", 5 * 60)
 
-        self.log("Setting up battery max discharge current control")
-        self.run_every(self.control_battery_max_discharge_current, "00:00:00", 5 * 60)
+        self.storage_mode_debouncer = Debouncer(
+            self,
+            lambda: self._batched(self.solar.control_storage_mode, self.get_now()),
+            self._TRIGGER_QUIET_PERIOD_SECONDS,
+            self._TRIGGER_MAX_LATENCY_SECONDS,
+        )
+        self.excess_energy_debouncer = Debouncer(
+            self,
+            lambda: self._batched(self.solar.control_excess_energy, self.get_now()),
+            self._TRIGGER_QUIET_PERIOD_SECONDS,
+            self._TRIGGER_MAX_LATENCY_SECONDS,
+        )
 
         self.log("Setting up storage mode control triggers")
         self.listen_state(
@@ -157,47 +233,86 @@ class SolarApp(hass.Hass):
         self.run_daily(self.disable_battery_discharge, "22:00:00")
         self.run_daily(self.disable_battery_discharge, "22:30:00")  # backup call
 
-        self.log("Initial battery reserve SoC control run")
-        self.solar.control_battery_reserve_soc(self.get_now())
-
-        self.log("Initial battery max charge current control run")
-        self.solar.control_battery_max_charge_current(self.get_now())
-
-        self.log("Initial battery max discharge current control run")
-        self.solar.control_battery_max_discharge_current()
+        self.log("Initial battery reserve SoC, max charge and max discharge current control run")
+        self._batched(self.solar.control_scheduled, self.get_now())
 
         self.log("Initial storage mode control run")
-        self.solar.control_storage_mode(self.get_now())
+        self._batched(self.solar.control_storage_mode, self.get_now())
 
         self.log("Initial excess energy mode control run")
-        self.solar.control_excess_energy(self.get_now())
+        self._batched(self.solar.control_excess_energy, self.get_now())
+
+    def terminate(self) -> None:
+        if self.recorder is not None:
+            self.recorder.close()
 
     def solar_debug(self, event_type, data, **kwargs) -> None:  # noqa: ANN001, ANN003, ARG002
+        if (ticks := data.get("profile_ticks")) is not None:
+            top = data.get("profile_top", self._PROFILE_TOP_FUNCTIONS)
+            self.tick_profiler.start("solar", int(ticks), int(top), self.get_now())
+
         self.solar.log_state()
+        for name, debouncer in [
+            ("storage mode", self.storage_mode_debouncer),
+            ("excess energy", self.excess_energy_debouncer),
+        ]:
+            self.log(
+                "Debouncer %s: triggers=%d, absorbed=%d, evaluations=%d",
+                name,
+                debouncer.triggers,
+                debouncer.absorbed,
+                debouncer.evaluations,
+            )
+        self.log(
+            "Service dispatcher: calls=%d, dispatched=%d, merged=%d, dropped=%d",
+            self.service_dispatcher.calls,
+            self.service_dispatcher.dispatched,
+            self.service_dispatcher.merged,
+            self.service_dispatcher.dropped,
+        )
+        self.log(
+            "Command queue: enqueued=%d, superseded=%d, throttled=%d, dispatched=%d, retries=%d, failures=%d, "
+            "latency avg=%.1f s max=%.1f s",
+            self.command_queue.enqueued,
+            self.command_queue.superseded,
+            self.command_queue.throttled,
+            self.command_queue.dispatched,
+            self.command_queue.retries,
+            self.command_queue.failures,
+            self.command_queue.average_latency_seconds(),
+            self.command_queue.max_latency_seconds,
+        )
 
-    def control_battery_reserve_soc(self, **kwargs: object) -> None:  # noqa: ARG002
-        self.solar.control_battery_reserve_soc(self.get_now())
+    def publish_instrumentation(self, **kwargs: object) -> None:  # noqa: ARG002
+        assert self.instrumentation is not None
+        self.instrumentation.publish_sensors(self, self._METRICS_SENSOR_PREFIX)
 
-    def control_battery_max_charge_current(self, **kwargs: object) -> None:  # noqa: ARG002
-        self.solar.control_battery_max_charge_current(self.get_now())
+    async def instrumentation_metrics(self, request, kwargs) -> web.Response:  # noqa: ANN001, ARG002
+        assert self.instrumentation is not None
+        return web.Response(text=self.instrumentation.render_text("solar"), content_type="text/plain")
 
-    def control_battery_max_discharge_current(self, **kwargs: object) -> None:  # noqa: ARG002
-        self.solar.control_battery_max_discharge_current()
+    def control_scheduled(self, **kwargs: object) -> None:  # noqa: ARG002
+        self._batched(self.solar.control_scheduled, self.get_now())
 
     def control_excess_energy(self, entity, attribute, old, new, **kwargs) -> None:  # noqa: ANN001, ANN003, ARG002
-        self.solar.control_excess_energy(self.get_now())
+        self.excess_energy_debouncer.trigger()
 
     def control_storage_mode(self, entity, attribute, old, new, **kwargs) -> None:  # noqa: ANN001, ANN003, ARG002
-        self.solar.control_storage_mode(self.get_now())
+        self.storage_mode_debouncer.trigger()
 
     def schedule_battery_discharge_at_6_am(self, **kwargs: object) -> None:  # noqa: ARG002
-        self.solar.schedule_battery_discharge_at_6_am(self.get_now())
+        self._batched(self.solar.schedule_battery_discharge_at_6_am, self.get_now())
 
     def schedule_battery_discharge_at_4_pm(self, **kwargs: object) -> None:  # noqa: ARG002
-        self.solar.schedule_battery_discharge_at_4_pm(self.get_now())
+        self._batched(self.solar.schedule_battery_discharge_at_4_pm, self.get_now())
 
     def disable_battery_discharge(self, **kwargs: object) -> None:  # noqa: ARG002
-        self.solar.disable_battery_discharge()
+        with self.service_dispatcher.batch():
+            self.solar.disable_battery_discharge()
 
     def reset_battery_full_charge_timer(self, entity, attribute, old, new, **kwargs) -> None:  # noqa: ANN001, ANN003, ARG002
         self.solar.reset_battery_full_charge_timer_if_full(old, new)
+
+    def _batched(self, control: Callable[[datetime], None], now: datetime) -> None:
+        with self.service_dispatcher.batch():
+            self.tick_profiler.profile(lambda: control(now))
@@ -3,7 +3,7 @@ from math import floor
 from typing import ClassVar
 
 
-@dataclass(frozen=True, order=True)
+@dataclass(frozen=True, order=True, slots=True)
 class BatteryCurrent:
     _ZERO_VALUE: ClassVar[float] = 0.0
 
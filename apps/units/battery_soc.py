@@ -3,7 +3,7 @@ from math import floor
 from typing import ClassVar
 
 
-@dataclass(frozen=True, order=True)
+@dataclass(frozen=True, order=True, slots=True)
 class BatterySoc:
     _MIN_VALUE: ClassVar[float] = 0.0
     _MAX_VALUE: ClassVar[float] = 100.0
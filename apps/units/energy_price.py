@@ -5,7 +5,7 @@ from typing import ClassVar
 from units.money import Money
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class EnergyPrice:
     _UNIT_KWH: ClassVar[str] = "kWh"
     _UNIT_MWH: ClassVar[str] = "MWh"
@@ -2,8 +2,13 @@ from dataclasses import dataclass
 from datetime import datetime, time, timedelta
 from zoneinfo import ZoneInfo
 
+from utils.lru_cache import LruCache
 
-@dataclass(frozen=True)
+# Today and tomorrow 15-minute prices are re-parsed on every refresh
+_PARSE_CACHE_SIZE = 512
+
+
+@dataclass(frozen=True, slots=True)
 class FifteenMinutePeriod:
     start: datetime
 
@@ -29,12 +34,24 @@ class FifteenMinutePeriod:
 
     @classmethod
     def parse(cls, date_string: str) -> "FifteenMinutePeriod":
-        return cls(start=datetime.fromisoformat(date_string))
+        # periods are immutable, equal strings share a single interned instance
+        return FIFTEEN_MINUTE_PERIOD_PARSE_CACHE.get_or_create(
+            (date_string, None, None), lambda: cls(start=datetime.fromisoformat(date_string))
+        )
 
     @classmethod
     def parse_custom_from_end_date(cls, date_string: str, format: str, time_zone: str | None) -> "FifteenMinutePeriod":
+        return FIFTEEN_MINUTE_PERIOD_PARSE_CACHE.get_or_create(
+            (date_string, format, time_zone), lambda: cls._parse_custom_from_end_date(date_string, format, time_zone)
+        )
+
+    @classmethod
+    def _parse_custom_from_end_date(cls, date_string: str, format: str, time_zone: str | None) -> "FifteenMinutePeriod":
         end = datetime.strptime(date_string, format)
         start = end - timedelta(minutes=15)
         if time_zone is not None:
             start = start.replace(tzinfo=ZoneInfo(time_zone))
         return cls(start=start)
+
+
+FIFTEEN_MINUTE_PERIOD_PARSE_CACHE = LruCache[tuple[str, str | None, str | None], FifteenMinutePeriod](_PARSE_CACHE_SIZE)
@@ -4,7 +4,7 @@ from units.energy_price import EnergyPrice
 from units.fifteen_minute_period import FifteenMinutePeriod
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class FifteenMinutePrice:
     period: FifteenMinutePeriod
     price: EnergyPrice
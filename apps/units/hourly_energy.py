@@ -5,6 +5,8 @@ from units.hourly_period import HourlyPeriod
 
 
 class HourlyEnergyStrMixin:
+    __slots__ = ()
+
     period: HourlyPeriod
     energy: EnergyKwh
 
@@ -12,13 +14,13 @@ class HourlyEnergyStrMixin:
         return f"{self.period} {self.energy}"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class HourlyConsumptionEnergy(HourlyEnergyStrMixin):
     period: HourlyPeriod
     energy: EnergyKwh
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class HourlyProductionEnergy(HourlyEnergyStrMixin):
     period: HourlyPeriod
     energy: EnergyKwh
@@ -1,8 +1,13 @@
 from dataclasses import dataclass
 from datetime import datetime, time, timedelta
 
+from utils.lru_cache import LruCache
 
-@dataclass(frozen=True)
+# Forecasts re-parse the same timestamps on every refresh, a few days of hours is enough
+_PARSE_CACHE_SIZE = 256
+
+
+@dataclass(frozen=True, slots=True)
 class HourlyPeriod:
     start: datetime
 
@@ -24,4 +29,10 @@ class HourlyPeriod:
 
     @classmethod
     def parse(cls, date_string: str) -> "HourlyPeriod":
-        return cls(start=datetime.fromisoformat(date_string))
+        # periods are immutable, equal strings share a single interned instance
+        return HOURLY_PERIOD_PARSE_CACHE.get_or_create(
+            date_string, lambda: cls(start=datetime.fromisoformat(date_string))
+        )
+
+
+HOURLY_PERIOD_PARSE_CACHE = LruCache[str, HourlyPeriod](_PARSE_CACHE_SIZE)
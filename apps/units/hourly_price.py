@@ -4,7 +4,7 @@ from units.energy_price import EnergyPrice
 from units.hourly_period import HourlyPeriod
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class HourlyPrice:
     period: HourlyPeriod
     price: EnergyPrice
@@ -4,7 +4,7 @@ from units.celsius import Celsius
 from units.hourly_period import HourlyPeriod
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class HourlyWeather:
     period: HourlyPeriod
     temperature: Celsius
@@ -3,7 +3,7 @@ from decimal import Decimal
 from typing import ClassVar
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Money:
     _CURRENCY_EUR: ClassVar[str] = "EUR"
     _CURRENCY_PLN: ClassVar[str] = "PLN"
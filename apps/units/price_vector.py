@@ -0,0 +1,65 @@
+from array import array
+from collections.abc import Iterable
+from decimal import ROUND_HALF_EVEN, Decimal
+from typing import ClassVar
+
+from units.energy_price import EnergyPrice
+from units.money import Money
+
+
+# Series of energy prices as fixed point integers in billionths of currency per kWh.
+# Currency and unit are validated once per series, integer arithmetic keeps sums and ties exact.
+class PriceVector:
+    _KWH_EXPONENT: ClassVar[int] = 9
+    _MWH_EXPONENT: ClassVar[int] = 6
+
+    @classmethod
+    def from_prices(cls, prices: Iterable[EnergyPrice]) -> "PriceVector":
+        values = array("q")
+        currency = None
+        unit = None
+
+        for price in prices:
+            if currency is None:
+                currency = price.money.currency
+                unit = price.unit
+            elif price.money.currency != currency or price.unit != unit:
+                raise ValueError(f"Price vector must have a single currency and unit, got {price}")
+            values.append(cls._to_fixed_point(price))
+
+        return cls(values, currency, unit)
+
+    def __init__(self, values: array, currency: str | None, unit: str | None) -> None:
+        self.values = values
+        self.currency = currency
+        self.unit = unit
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def fixed_point(self, price: EnergyPrice) -> int:
+        if self.currency is not None and price.money.currency != self.currency:
+            raise ValueError(f"Price must be in {self.currency}, got {price}")
+        return self._to_fixed_point(price)
+
+    def to_money(self, value: int) -> Money:
+        return Money(value=Decimal(value).scaleb(-self._KWH_EXPONENT), currency=self._required_currency())
+
+    def to_energy_price(self, value: int, count: int = 1) -> EnergyPrice:
+        # back in the unit of the series, a count > 1 averages a sum of values without rounding intermediates
+        currency = self._required_currency()
+        exponent = self._MWH_EXPONENT if self.unit == EnergyPrice._UNIT_MWH else self._KWH_EXPONENT
+        amount = Decimal(value).scaleb(-exponent)
+        if count != 1:
+            amount = amount / Decimal(count)
+        return EnergyPrice(money=Money(value=amount, currency=currency), unit=str(self.unit))
+
+    def _required_currency(self) -> str:
+        if self.currency is None:
+            raise ValueError("Empty price vector has no currency")
+        return self.currency
+
+    @classmethod
+    def _to_fixed_point(cls, price: EnergyPrice) -> int:
+        exponent = cls._MWH_EXPONENT if price.unit == EnergyPrice._UNIT_MWH else cls._KWH_EXPONENT
+        return int(price.money.value.scaleb(exponent).to_integral_value(rounding=ROUND_HALF_EVEN))
@@ -1,13 +1,27 @@
 import logging
+from pathlib import Path
+from typing import TYPE_CHECKING
 
-import appdaemon.plugins.hass.hassapi as hass
 from appdaemon_protocols.appdaemon_logger import AppdaemonLogger
 
+# the controllers and the offline simulation import this module, AppDaemon is needed only by the apps
+if TYPE_CHECKING:
+    import appdaemon.plugins.hass.hassapi as hass
 
-def is_dry_run(hass: hass.Hass) -> bool:
+
+def is_dry_run(hass: "hass.Hass") -> bool:
     return hass.config.get("dry_run", False)
 
 
+def recorder_path(hass: "hass.Hass") -> Path | None:
+    path = hass.args.get("recorder_path")
+    return Path(path) if path else None
+
+
+def is_instrumented(hass: "hass.Hass") -> bool:
+    return hass.args.get("instrumentation", False)
+
+
 class LoggingAppdaemonCallback:
     def __init__(self, appdaemon_logger: AppdaemonLogger) -> None:
         self.appdaemon_logger = appdaemon_logger
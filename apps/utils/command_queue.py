@@ -0,0 +1,189 @@
+import logging
+import threading
+import time
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from itertools import count
+
+from appdaemon_protocols.appdaemon_logger import AppdaemonLogger
+from appdaemon_protocols.appdaemon_scheduler import AppdaemonScheduler
+from appdaemon_protocols.appdaemon_service import AppdaemonService
+
+
+@dataclass(slots=True)
+class _Command:
+    entity_id: str
+    service: str
+    data: dict
+    priority: int
+    sequence: int
+    enqueued_at: float
+    not_before: float
+    attempts: int = 0
+
+
+class CommandQueue:
+    """Rate limited, prioritised queue of service calls to slow, e.g. Modbus-backed, entities.
+
+    Only entities with a priority are queued, lower value goes first and commands of the same priority keep their
+    order. A newer write to a queued entity replaces the queued one. Failed calls with a callback are retried with
+    exponential backoff, other services are dispatched immediately.
+
+    AppDaemon runs service call callbacks on its event loop, where ``run_in`` returns a task instead of a timer
+    handle. Failed results are handed over to the app thread by a zero delay timer and retried there.
+    """
+
+    def __init__(
+        self,
+        appdaemon_logger: AppdaemonLogger,
+        appdaemon_scheduler: AppdaemonScheduler,
+        appdaemon_service: AppdaemonService,
+        priorities: Mapping[str, int],
+        min_spacing_seconds: float,
+        min_entity_spacing_seconds: float,
+        max_retries: int = 3,
+        retry_backoff_seconds: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if min_spacing_seconds < 0 or min_entity_spacing_seconds < 0:
+            raise ValueError(
+                f"spacing must not be negative, got {min_spacing_seconds} and {min_entity_spacing_seconds}"
+            )
+
+        self.appdaemon_logger = appdaemon_logger
+        self.appdaemon_scheduler = appdaemon_scheduler
+        self.appdaemon_service = appdaemon_service
+        self.priorities = priorities
+        self.min_spacing_seconds = min_spacing_seconds
+        self.min_entity_spacing_seconds = min_entity_spacing_seconds
+        self.max_retries = max_retries
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.clock = clock
+
+        self.enqueued = 0
+        self.superseded = 0
+        self.throttled = 0
+        self.dispatched = 0
+        self.retries = 0
+        self.failures = 0
+        self.total_latency_seconds = 0.0
+        self.max_latency_seconds = 0.0
+
+        self._pending: dict[str, _Command] = {}
+        self._sequence = count()
+        self._last_dispatch: float | None = None
+        self._last_entity_dispatch: dict[str, float] = {}
+        self._timer_handle = None
+        self._failed: list[tuple[_Command, Callable[[dict], None], dict]] = []
+        # callbacks and timers run on other threads than the controls enqueueing the commands
+        self._lock = threading.RLock()
+
+    def call_service(self, service: str, **data) -> object:  # noqa: ANN003
+        entity_id = data.get("entity_id")
+        if not isinstance(entity_id, str) or (priority := self.priorities.get(entity_id)) is None:
+            return self.appdaemon_service.call_service(service, **data)
+
+        with self._lock:
+            now = self.clock()
+            self.enqueued += 1
+            if (queued := self._pending.get(entity_id)) is not None:
+                self.superseded += 1
+                queued.service = service
+                queued.data = data
+                queued.not_before = now
+                queued.attempts = 0
+            else:
+                self._pending[entity_id] = _Command(
+                    entity_id, service, data, priority, next(self._sequence), enqueued_at=now, not_before=now
+                )
+
+            self._pump()
+            if entity_id in self._pending:
+                self.throttled += 1
+        return None
+
+    def average_latency_seconds(self) -> float:
+        return self.total_latency_seconds / self.dispatched if self.dispatched else 0.0
+
+    def _pump(self) -> None:
+        if self._timer_handle is not None:
+            self.appdaemon_scheduler.cancel_timer(self._timer_handle)
+            self._timer_handle = None
+
+        while self._pending:
+            command = min(self._pending.values(), key=lambda pending: (pending.priority, pending.sequence))
+            now = self.clock()
+            ready_at = self._ready_at(command)
+            if ready_at > now:
+                self._timer_handle = self.appdaemon_scheduler.run_in(self._on_timer, ready_at - now)
+                return
+
+            del self._pending[command.entity_id]
+            self._dispatch(command, now)
+
+    def _on_timer(self, **kwargs: object) -> None:  # noqa: ARG002
+        with self._lock:
+            self._timer_handle = None
+            self._pump()
+
+    def _ready_at(self, command: _Command) -> float:
+        ready_at = command.not_before
+        if self._last_dispatch is not None:
+            ready_at = max(ready_at, self._last_dispatch + self.min_spacing_seconds)
+        if (last_entity_dispatch := self._last_entity_dispatch.get(command.entity_id)) is not None:
+            ready_at = max(ready_at, last_entity_dispatch + self.min_entity_spacing_seconds)
+        return ready_at
+
+    def _dispatch(self, command: _Command, now: float) -> None:
+        self._last_dispatch = now
+        self._last_entity_dispatch[command.entity_id] = now
+        command.attempts += 1
+        self.dispatched += 1
+
+        latency = now - command.enqueued_at
+        self.total_latency_seconds += latency
+        self.max_latency_seconds = max(self.max_latency_seconds, latency)
+
+        data = command.data
+        if (callback := data.get("callback")) is not None:
+            data = {**data, "callback": lambda result: self._on_result(command, callback, result)}
+        self.appdaemon_service.call_service(command.service, **data)
+
+    def _on_result(self, command: _Command, callback: Callable[[dict], None], result: dict) -> None:
+        if result.get("success") is True:
+            callback(result)
+            return
+
+        with self._lock:
+            self._failed.append((command, callback, result))
+        # the returned task or handle isn't kept, the timer fires once and nothing cancels it
+        self.appdaemon_scheduler.run_in(self._on_failed, 0)
+
+    def _on_failed(self, **kwargs: object) -> None:  # noqa: ARG002
+        with self._lock:
+            failed, self._failed = self._failed, []
+            for command, callback, result in failed:
+                self._retry_or_fail(command, callback, result)
+            self._pump()
+
+    def _retry_or_fail(self, command: _Command, callback: Callable[[dict], None], result: dict) -> None:
+        if command.entity_id in self._pending:
+            # a newer write to the entity is already queued, no point in retrying the old one
+            callback(result)
+        elif command.attempts <= self.max_retries:
+            self.retries += 1
+            backoff = self.retry_backoff_seconds * 2 ** (command.attempts - 1)
+            self.appdaemon_logger.log(
+                "Retry %s for %s in %.0f s, attempt %d failed: %s",
+                command.service,
+                command.entity_id,
+                backoff,
+                command.attempts,
+                result,
+                level=logging.WARNING,
+            )
+            command.not_before = self.clock() + backoff
+            self._pending[command.entity_id] = command
+        else:
+            self.failures += 1
+            callback(result)
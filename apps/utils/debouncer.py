@@ -0,0 +1,62 @@
+import time
+from collections.abc import Callable
+
+from appdaemon_protocols.appdaemon_scheduler import AppdaemonScheduler
+
+
+class Debouncer:
+    """Collapses bursts of triggers into a single evaluation.
+
+    The evaluation runs once no trigger arrived for the quiet period, but never later than the max latency after
+    the first trigger of the burst, so a constantly changing entity still gets evaluated regularly.
+    """
+
+    def __init__(
+        self,
+        appdaemon_scheduler: AppdaemonScheduler,
+        callback: Callable[[], None],
+        quiet_period_seconds: float,
+        max_latency_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if quiet_period_seconds < 0:
+            raise ValueError(f"quiet_period_seconds must not be negative, got {quiet_period_seconds}")
+        if max_latency_seconds < quiet_period_seconds:
+            raise ValueError(
+                f"max_latency_seconds must be at least quiet_period_seconds, got {max_latency_seconds}"
+                f" < {quiet_period_seconds}"
+            )
+
+        self.appdaemon_scheduler = appdaemon_scheduler
+        self.callback = callback
+        self.quiet_period_seconds = quiet_period_seconds
+        self.max_latency_seconds = max_latency_seconds
+        self.clock = clock
+
+        self.triggers = 0
+        self.absorbed = 0
+        self.evaluations = 0
+
+        self._timer_handle = None
+        self._burst_start = None
+
+    def trigger(self) -> None:
+        self.triggers += 1
+        now = self.clock()
+
+        if self._timer_handle is not None:
+            self.absorbed += 1
+            self.appdaemon_scheduler.cancel_timer(self._timer_handle)
+
+        if self._burst_start is None:
+            self._burst_start = now
+
+        remaining_latency = self._burst_start + self.max_latency_seconds - now
+        delay = max(0.0, min(self.quiet_period_seconds, remaining_latency))
+        self._timer_handle = self.appdaemon_scheduler.run_in(self._evaluate, delay)
+
+    def _evaluate(self, **kwargs: object) -> None:  # noqa: ARG002
+        self._timer_handle = None
+        self._burst_start = None
+        self.evaluations += 1
+        self.callback()
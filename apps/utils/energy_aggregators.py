@@ -1,5 +1,10 @@
 from units.energy_kwh import ENERGY_KWH_ZERO, EnergyKwh
 from units.hourly_energy import HourlyConsumptionEnergy, HourlyProductionEnergy
+from utils import energy_columns
+from utils.energy_columns import EnergyColumns
+
+# from about a day of hours on each side the columns are faster, building them included
+_COLUMNAR_MIN_PERIODS = 48
 
 
 def total_surplus(consumptions: list[HourlyConsumptionEnergy], productions: list[HourlyProductionEnergy]) -> EnergyKwh:
@@ -17,6 +22,11 @@ def total_surplus(consumptions: list[HourlyConsumptionEnergy], productions: list
 def maximum_cumulative_deficit(
     consumptions: list[HourlyConsumptionEnergy], productions: list[HourlyProductionEnergy]
 ) -> EnergyKwh:
+    if len(consumptions) + len(productions) >= _COLUMNAR_MIN_PERIODS:
+        return energy_columns.maximum_cumulative_deficit(
+            EnergyColumns.from_hourly(consumptions), EnergyColumns.from_hourly(productions)
+        )
+
     net_energy_dict = {}
 
     for consumption in consumptions:
@@ -0,0 +1,135 @@
+import importlib
+import math
+from array import array
+from collections.abc import Sequence
+from datetime import datetime, tzinfo
+from types import ModuleType
+from typing import Any
+
+from units.energy_kwh import ENERGY_KWH_ZERO, EnergyKwh
+from units.hourly_energy import HourlyConsumptionEnergy, HourlyProductionEnergy
+from units.hourly_period import HourlyPeriod
+
+
+def _load_numpy() -> ModuleType | None:
+    try:
+        return importlib.import_module("numpy")
+    except ImportError:
+        return None
+
+
+# NumPy is optional, columns fall back to array('d') and plain Python loops without it
+_numpy = _load_numpy()
+
+
+class EnergyColumns:
+    """Hourly energy series stored as parallel columns of epoch seconds and kWh values.
+
+    Long horizons don't allocate a dataclass per hour, and the kernels below run vectorised when NumPy is installed.
+    """
+
+    def __init__(self, timestamps: Any, values: Any, time_zone: tzinfo | None) -> None:  # noqa: ANN401
+        if len(timestamps) != len(values):
+            raise ValueError(f"Columns must have the same length, got {len(timestamps)} and {len(values)}")
+
+        self.timestamps = timestamps
+        self.values = values
+        self.time_zone = time_zone
+
+    @classmethod
+    def from_hourly(
+        cls, periods: Sequence[HourlyConsumptionEnergy] | Sequence[HourlyProductionEnergy]
+    ) -> "EnergyColumns":
+        time_zone = periods[0].period.start.tzinfo if periods else None
+        return cls(
+            _column([period.period.start.timestamp() for period in periods]),
+            _column([period.energy.value for period in periods]),
+            time_zone,
+        )
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def to_consumption(self) -> list[HourlyConsumptionEnergy]:
+        return [
+            HourlyConsumptionEnergy(period=period, energy=energy) for period, energy in self._periods_and_energies()
+        ]
+
+    def to_production(self) -> list[HourlyProductionEnergy]:
+        return [HourlyProductionEnergy(period=period, energy=energy) for period, energy in self._periods_and_energies()]
+
+    def _periods_and_energies(self) -> list[tuple[HourlyPeriod, EnergyKwh]]:
+        return [
+            (HourlyPeriod(datetime.fromtimestamp(float(timestamp), self.time_zone)), EnergyKwh(float(value)))
+            for timestamp, value in zip(self.timestamps, self.values, strict=True)
+        ]
+
+
+def total_surplus(consumptions: EnergyColumns, productions: EnergyColumns) -> EnergyKwh:
+    if _numpy is not None:
+        surplus = float(productions.values.sum()) - float(consumptions.values.sum())
+    else:
+        surplus = math.fsum(productions.values) - math.fsum(consumptions.values)
+    return max(EnergyKwh(surplus), ENERGY_KWH_ZERO)
+
+
+def maximum_cumulative_deficit(consumptions: EnergyColumns, productions: EnergyColumns) -> EnergyKwh:
+    if _numpy is not None:
+        timestamps = _numpy.concatenate((consumptions.timestamps, productions.timestamps))
+        net_values = _numpy.concatenate((-consumptions.values, productions.values))
+        if len(timestamps) == 0:
+            return ENERGY_KWH_ZERO
+
+        # unique timestamps come out sorted, bincount sums net energy of the same hour
+        _, hour_index = _numpy.unique(timestamps, return_inverse=True)
+        min_cumulative_balance = float(_numpy.cumsum(_numpy.bincount(hour_index, weights=net_values)).min())
+    else:
+        net_energy: dict[float, float] = {}
+        for timestamp, value in zip(consumptions.timestamps, consumptions.values, strict=True):
+            net_energy[timestamp] = net_energy.get(timestamp, 0.0) - value
+        for timestamp, value in zip(productions.timestamps, productions.values, strict=True):
+            net_energy[timestamp] = net_energy.get(timestamp, 0.0) + value
+
+        cumulative_balance = 0.0
+        min_cumulative_balance = 0.0
+        for timestamp in sorted(net_energy):
+            cumulative_balance += net_energy[timestamp]
+            min_cumulative_balance = min(min_cumulative_balance, cumulative_balance)
+
+    return max(EnergyKwh(-min_cumulative_balance), ENERGY_KWH_ZERO)
+
+
+def windowed_mean(columns: EnergyColumns, window_hours: int) -> EnergyColumns:
+    """Mean energy of every window of consecutive hours, timestamped with the window start.
+
+    Args:
+        columns: Sorted hourly energy series with no gaps.
+        window_hours: Number of hours in a window.
+
+    Returns:
+        Series with one value per window, empty if the series is shorter than the window.
+    """
+    if window_hours < 1:
+        raise ValueError(f"window_hours must be at least 1, got {window_hours}")
+
+    window_count = max(len(columns) - window_hours + 1, 0)
+
+    if _numpy is not None:
+        cumulative = _numpy.concatenate(([0.0], _numpy.cumsum(columns.values)))
+        means = (cumulative[window_hours:] - cumulative[:-window_hours]) / window_hours
+        return EnergyColumns(columns.timestamps[:window_count], means[:window_count], columns.time_zone)
+
+    means = array("d")
+    window_sum = sum(columns.values[:window_hours])
+    for index in range(window_count):
+        if index > 0:
+            window_sum += columns.values[index + window_hours - 1] - columns.values[index - 1]
+        means.append(window_sum / window_hours)
+
+    return EnergyColumns(columns.timestamps[:window_count], means, columns.time_zone)
+
+
+def _column(values: list[float]) -> Any:  # noqa: ANN401
+    if _numpy is not None:
+        return _numpy.asarray(values, dtype=_numpy.float64)
+    return array("d", values)
@@ -0,0 +1,199 @@
+import re
+import sys
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Generator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import cast
+
+from appdaemon_protocols.appdaemon_state_writer import AppdaemonStateWriter
+
+# upper bounds of the latency buckets in milliseconds, the last bucket is unbounded
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 1000.0)
+
+
+class Histogram:
+    """Histogram with fixed bucket bounds, cheap enough to observe every call."""
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS_MS) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile as the upper bound of the bucket it falls into.
+
+        Args:
+            q: Quantile between 0 and 1.
+
+        Returns:
+            Upper bound of the bucket, the maximum for the unbounded bucket, 0 without observations.
+        """
+        rank = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if count and cumulative >= rank:
+                return self.bounds[index] if index < len(self.bounds) else self.max
+        return 0.0
+
+
+@dataclass
+class StageMetrics:
+    latency_ms: Histogram = field(default_factory=Histogram)
+    errors: int = 0
+    # net number of memory blocks allocated by the stage, negative if it freed more than it allocated
+    allocated_blocks: int = 0
+
+
+class Instrumentation:
+    """Wall time histograms, call and error counts and allocated memory blocks per stage."""
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        self.clock = clock
+        self.stages: dict[str, StageMetrics] = {}
+
+    def stage(self, stage: str) -> StageMetrics:
+        if (metrics := self.stages.get(stage)) is None:
+            metrics = self.stages[stage] = StageMetrics()
+        return metrics
+
+    @contextmanager
+    def measure(self, stage: str) -> Generator[None]:
+        metrics = self.stage(stage)
+        allocated_blocks = sys.getallocatedblocks()
+        start = self.clock()
+        try:
+            yield
+        except Exception:
+            metrics.errors += 1
+            raise
+        finally:
+            metrics.latency_ms.observe((self.clock() - start) * 1000)
+            metrics.allocated_blocks += sys.getallocatedblocks() - allocated_blocks
+
+    def instrument[T](self, target: T, stage_prefix: str) -> T:
+        """Wrap an object, every call of its public methods is measured as ``<stage_prefix>.<method>``.
+
+        Args:
+            target: Object to wrap, e.g. a state factory, an estimator or a service.
+            stage_prefix: Prefix of the stage names.
+
+        Returns:
+            Proxy with the same public interface as the target.
+        """
+        return cast("T", _InstrumentedProxy(target, self, stage_prefix))
+
+    def render_text(self, app: str) -> str:
+        """Render the metrics in the Prometheus text exposition format.
+
+        Args:
+            app: Value of the app label.
+
+        Returns:
+            Metrics of all stages, sorted by stage name.
+        """
+        # the copy is atomic, rendering runs on the event loop while stages are measured on worker threads
+        stages = sorted(dict(self.stages).items())
+
+        lines = ["# TYPE appdaemon_stage_latency_ms histogram"]
+        for stage, metrics in stages:
+            histogram = metrics.latency_ms
+            labels = f'app="{app}",stage="{stage}"'
+            cumulative = 0
+            for bound, count in zip((*histogram.bounds, "+Inf"), histogram.counts, strict=True):
+                cumulative += count
+                lines.append(f'appdaemon_stage_latency_ms_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"appdaemon_stage_latency_ms_sum{{{labels}}} {histogram.sum:.6f}")
+            lines.append(f"appdaemon_stage_latency_ms_count{{{labels}}} {histogram.count}")
+
+        lines.append("# TYPE appdaemon_stage_errors_total counter")
+        lines.extend(
+            f'appdaemon_stage_errors_total{{app="{app}",stage="{stage}"}} {metrics.errors}' for stage, metrics in stages
+        )
+
+        lines.append("# TYPE appdaemon_stage_allocated_blocks gauge")
+        lines.extend(
+            f'appdaemon_stage_allocated_blocks{{app="{app}",stage="{stage}"}} {metrics.allocated_blocks}'
+            for stage, metrics in stages
+        )
+
+        return "\n".join(lines) + "\n"
+
+    def publish_sensors(self, appdaemon_state_writer: AppdaemonStateWriter, entity_prefix: str) -> None:
+        """Publish a sensor per stage with the mean latency as state and the other metrics as attributes.
+
+        Args:
+            appdaemon_state_writer: State API used to create or update the sensors.
+            entity_prefix: Prefix of the entity ids, e.g. ``sensor.solar_stage``.
+        """
+        # copy first, a stage measured for the first time on a worker thread adds an entry
+        for stage, metrics in dict(self.stages).items():
+            histogram = metrics.latency_ms
+            appdaemon_state_writer.set_state(
+                f"{entity_prefix}_{_entity_slug(stage)}",
+                state=round(histogram.mean(), 3),
+                attributes={
+                    "friendly_name": stage,
+                    "unit_of_measurement": "ms",
+                    "calls": histogram.count,
+                    "errors": metrics.errors,
+                    "p50_ms": histogram.quantile(0.5),
+                    "p95_ms": histogram.quantile(0.95),
+                    "max_ms": round(histogram.max, 3),
+                    "allocated_blocks": metrics.allocated_blocks,
+                },
+            )
+
+
+def not_instrumented[T](target: T, stage_prefix: str) -> T:  # noqa: ARG001
+    return target
+
+
+def _entity_slug(stage: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", stage.lower()).strip("_")
+
+
+class _InstrumentedProxy:
+    def __init__(self, target: object, instrumentation: Instrumentation, stage_prefix: str) -> None:
+        self._target = target
+        self._instrumentation = instrumentation
+        self._stage_prefix = stage_prefix
+
+    def __getattr__(self, name: str) -> object:
+        attribute = getattr(self._target, name)
+        if name.startswith("_") or not callable(attribute):
+            return attribute
+
+        metrics = self._instrumentation.stage(f"{self._stage_prefix}.{name}")
+        clock = self._instrumentation.clock
+        latency_ms = metrics.latency_ms
+
+        # same as Instrumentation.measure, inlined because a generator based context manager costs a few microseconds
+        def measured(*args, **kwargs) -> object:  # noqa: ANN002, ANN003
+            allocated_blocks = sys.getallocatedblocks()
+            start = clock()
+            try:
+                return attribute(*args, **kwargs)
+            except Exception:
+                metrics.errors += 1
+                raise
+            finally:
+                latency_ms.observe((clock() - start) * 1000)
+                metrics.allocated_blocks += sys.getallocatedblocks() - allocated_blocks
+
+        # bound methods don't change, later lookups find the wrapper without going through __getattr__
+        setattr(self, name, measured)
+        return measured
@@ -0,0 +1,39 @@
+import logging
+from collections.abc import Callable
+
+from appdaemon_protocols.appdaemon_logger import AppdaemonLogger
+
+
+class Lazy:
+    """Log argument evaluated only when the message is formatted, e.g. ``Lazy(lambda: expensive(state))``."""
+
+    __slots__ = ("_supplier",)
+
+    def __init__(self, supplier: Callable[[], object]) -> None:
+        self._supplier = supplier
+
+    def __str__(self) -> str:
+        return str(self._supplier())
+
+    def __repr__(self) -> str:
+        return repr(self._supplier())
+
+
+class LazyLogger:
+    """Logger facade checking the level before anything is passed to the wrapped logger.
+
+    AppDaemon inspects the call stack on every ``log`` call, even for a suppressed level, so the check saves more
+    than the formatting. Costly arguments are passed as ``Lazy`` and evaluated only for enabled levels.
+    """
+
+    def __init__(self, appdaemon_logger: AppdaemonLogger, is_enabled_for: Callable[[int], bool]) -> None:
+        self.appdaemon_logger = appdaemon_logger
+        self.is_enabled_for = is_enabled_for
+
+    def log(self, msg: str, *args, level: str | int = logging.INFO) -> None:  # noqa: ANN002
+        if self.is_enabled_for(_numeric_level(level)):
+            self.appdaemon_logger.log(msg, *args, level=level)
+
+
+def _numeric_level(level: str | int) -> int:
+    return level if isinstance(level, int) else logging.getLevelNamesMapping().get(level, logging.INFO)
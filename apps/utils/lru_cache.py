@@ -0,0 +1,43 @@
+from collections import OrderedDict
+from collections.abc import Callable
+
+
+class LruCache[K, V]:
+    """Bounded mapping that evicts the least recently used entry when full."""
+
+    def __init__(self, max_size: int) -> None:
+        if max_size < 1:
+            raise ValueError(f"max_size must be at least 1, got {max_size}")
+
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[K, V] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._entries
+
+    def get_or_create(self, key: K, factory: Callable[[], V]) -> V:
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        self.misses += 1
+        value = factory()
+        self._entries[key] = value
+
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+        return value
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
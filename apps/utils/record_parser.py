@@ -0,0 +1,78 @@
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class RecordSchema[T]:
+    """Schema of a raw Home Assistant attribute record, checked before the record is built."""
+
+    name: str
+    required_keys: tuple[str, ...]
+    build: Callable[[dict], T]
+
+
+@dataclass
+class ParseStats:
+    """Counts of accepted records and of rejected records by reason."""
+
+    accepted: int = 0
+    rejected: Counter[str] = field(default_factory=Counter)
+
+    def rejected_total(self) -> int:
+        return self.rejected.total()
+
+    def __str__(self) -> str:
+        reasons = ", ".join(f"{reason}: {count}" for reason, count in sorted(self.rejected.items()))
+        return f"accepted: {self.accepted}, rejected: {self.rejected_total()} ({reasons})"
+
+
+def parse_records[T](
+    raw_records: Iterable[object] | None,
+    schema: RecordSchema[T],
+    stats: ParseStats | None = None,
+    stop: Callable[[T], bool] | None = None,
+) -> Iterator[T]:
+    """Lazily parse raw attribute records into typed records.
+
+    Records that aren't dicts, miss a required key or fail to build are skipped and counted by reason.
+
+    Args:
+        raw_records: Raw records from a Home Assistant attribute, None is treated as no records.
+        schema: Schema with required keys and the typed record builder.
+        stats: Optional statistics updated while parsing.
+        stop: Optional predicate, parsing stops at the first record it matches, e.g. beyond a horizon.
+
+    Yields:
+        Typed records in the order of the raw records.
+    """
+    if raw_records is None:
+        return
+
+    if stats is None:
+        stats = ParseStats()
+
+    required_keys = schema.required_keys
+    build = schema.build
+
+    for item in raw_records:
+        if not isinstance(item, dict):
+            stats.rejected["not a dict"] += 1
+            continue
+
+        missing_key = next((key for key in required_keys if key not in item), None)
+        if missing_key is not None:
+            stats.rejected[f"missing {missing_key}"] += 1
+            continue
+
+        try:
+            record = build(item)
+        except (ValueError, TypeError, KeyError):
+            stats.rejected["invalid value"] += 1
+            continue
+
+        if stop is not None and stop(record):
+            return
+
+        stats.accepted += 1
+        yield record
@@ -0,0 +1,213 @@
+import pickle
+import queue
+import struct
+import threading
+import time
+import zlib
+from array import array
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import cast
+
+from appdaemon_protocols.appdaemon_service import AppdaemonService
+from utils.state_store import StateFactory
+
+_CHUNK_HEADER = struct.Struct("<I")
+_COMPRESSION_LEVEL = 6
+
+
+@dataclass(frozen=True, slots=True)
+class Record:
+    timestamp: float  # POSIX timestamp
+    kind: str
+    payload: object
+
+
+class Recorder:
+    """Append-only log of records, written in compressed columnar chunks by a background thread.
+
+    Callbacks only append to an in-memory chunk. Full chunks, or chunks older than the flush interval, are handed
+    over to the writer thread which pickles, compresses and appends them to the file. The writer also hands over an
+    aged chunk itself, so the last records of an idle app are written within two flush intervals.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        chunk_size: int = 256,
+        flush_interval_seconds: float = 300.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+
+        self.path = path
+        self.chunk_size = chunk_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.clock = clock
+
+        self.records = 0
+        self.chunks_written = 0
+        self.bytes_written = 0
+        self.write_errors = 0
+
+        self._lock = threading.Lock()
+        self._timestamps = array("d")
+        self._kinds: list[str] = []
+        self._payloads: list[object] = []
+        self._chunk_started = clock()
+
+        self._chunks: queue.Queue[tuple[bytes, list[str], list[object]] | None] = queue.Queue()
+        self._writer = threading.Thread(target=self._write_chunks, name=f"recorder-{path.name}", daemon=True)
+        self._writer.start()
+
+    def record(self, kind: str, payload: object) -> None:
+        now = self.clock()
+        with self._lock:
+            self._timestamps.append(now)
+            self._kinds.append(kind)
+            self._payloads.append(payload)
+            self.records += 1
+
+            if len(self._kinds) >= self.chunk_size or now - self._chunk_started >= self.flush_interval_seconds:
+                self._hand_over(now)
+
+    def record_outputs[T](self, target: T, kind: str) -> T:
+        """Wrap an object, e.g. an estimator, to record what its public methods return.
+
+        Args:
+            target: Wrapped object.
+            kind: Record kind, the payload is the method name and its result.
+
+        Returns:
+            Proxy with the interface of the target.
+        """
+        return cast("T", _RecordingProxy(target, self, kind))
+
+    def flush(self) -> None:
+        with self._lock:
+            self._hand_over(self.clock())
+
+    def close(self) -> None:
+        self.flush()
+        self._chunks.put(None)
+        self._writer.join()
+
+    def _hand_over(self, now: float) -> None:
+        if self._kinds:
+            self._chunks.put((self._timestamps.tobytes(), self._kinds, self._payloads))
+            self._timestamps = array("d")
+            self._kinds = []
+            self._payloads = []
+        self._chunk_started = now
+
+    def _hand_over_aged(self) -> None:
+        with self._lock:
+            now = self.clock()
+            if now - self._chunk_started >= self.flush_interval_seconds:
+                self._hand_over(now)
+
+    def _write_chunks(self) -> None:
+        while True:
+            try:
+                chunk = self._chunks.get(timeout=self.flush_interval_seconds)
+            except queue.Empty:
+                self._hand_over_aged()
+                continue
+            if chunk is None:
+                return
+
+            try:
+                # identical payload objects within a chunk, e.g. unchanged forecasts, are pickled once
+                blob = zlib.compress(pickle.dumps(chunk, protocol=pickle.HIGHEST_PROTOCOL), _COMPRESSION_LEVEL)
+                with self.path.open("ab") as file:
+                    file.write(_CHUNK_HEADER.pack(len(blob)))
+                    file.write(blob)
+                self.chunks_written += 1
+                self.bytes_written += _CHUNK_HEADER.size + len(blob)
+            except (OSError, pickle.PicklingError, TypeError, AttributeError):
+                self.write_errors += 1
+
+
+def not_recorded[T](target: T, kind: str) -> T:  # noqa: ARG001
+    return target
+
+
+class _RecordingProxy:
+    def __init__(self, target: object, recorder: Recorder, kind: str) -> None:
+        self._target = target
+        self._recorder = recorder
+        self._kind = kind
+
+    def __getattr__(self, name: str) -> object:
+        attribute = getattr(self._target, name)
+        if name.startswith("_") or not callable(attribute):
+            return attribute
+
+        recorder = self._recorder
+        kind = self._kind
+
+        def recorded(*args, **kwargs) -> object:  # noqa: ANN002, ANN003
+            result = attribute(*args, **kwargs)
+            recorder.record(kind, (name, result))
+            return result
+
+        # bound methods don't change, later lookups find the wrapper without going through __getattr__
+        setattr(self, name, recorded)
+        return recorded
+
+
+def read_records(path: Path) -> Iterator[Record]:
+    """Lazily read records written by Recorder, one chunk in memory at a time.
+
+    Args:
+        path: Recorder file.
+
+    Yields:
+        Records in the order they were recorded. A truncated last chunk, e.g. after a crash, is skipped.
+    """
+    with path.open("rb") as file:
+        while len(header := file.read(_CHUNK_HEADER.size)) == _CHUNK_HEADER.size:
+            (length,) = _CHUNK_HEADER.unpack(header)
+            blob = file.read(length)
+            if len(blob) < length:
+                return
+
+            timestamps_bytes, kinds, payloads = pickle.loads(zlib.decompress(blob))
+            timestamps = array("d")
+            timestamps.frombytes(timestamps_bytes)
+            for timestamp, kind, payload in zip(timestamps, kinds, payloads, strict=True):
+                yield Record(timestamp=timestamp, kind=kind, payload=payload)
+
+
+class RecordingStateFactory[T]:
+    """Records every new state snapshot, an unchanged snapshot is the same object and isn't recorded again."""
+
+    def __init__(self, state_factory: StateFactory[T], recorder: Recorder, kind: str) -> None:
+        self.state_factory = state_factory
+        self.recorder = recorder
+        self.kind = kind
+        self._last_state: T | None = None
+
+    def create(self) -> T | None:
+        state = self.state_factory.create()
+        if state is not None and state is not self._last_state:
+            self.recorder.record(self.kind, state)
+            self._last_state = state
+        return state
+
+
+class RecordingAppdaemonService:
+    """Records service calls, the decisions of the controllers, before passing them on."""
+
+    KIND = "service_call"
+
+    def __init__(self, appdaemon_service: AppdaemonService, recorder: Recorder) -> None:
+        self.appdaemon_service = appdaemon_service
+        self.recorder = recorder
+
+    def call_service(self, service: str, **data) -> object:  # noqa: ANN003
+        # callbacks are bound methods of the apps, not worth recording
+        self.recorder.record(self.KIND, (service, {key: value for key, value in data.items() if key != "callback"}))
+        return self.appdaemon_service.call_service(service, **data)
@@ -1,104 +1,322 @@
+from collections.abc import Sequence
 from datetime import datetime, timedelta
 from decimal import Decimal
+from enum import Enum, auto
+from heapq import merge
 
 from units.energy_kwh import EnergyKwh
 from units.energy_price import EnergyPrice
+from units.fifteen_minute_price import FifteenMinutePrice
 from units.hourly_price import HourlyPrice
 from units.money import Money
+from units.price_vector import PriceVector
+
+_MINUTES_PER_HOUR = 60
 
 
 def find_max_revenue_period(
-    hourly_prices: list[HourlyPrice],
+    prices: Sequence[HourlyPrice] | Sequence[FifteenMinutePrice],
     min_price_threshold: EnergyPrice,
     max_duration_minutes: int,
     discharge_energy_1h: EnergyKwh,
+    period_duration_minutes: int = 60,
 ) -> tuple[Money, datetime, datetime] | None:
     """
     Find the continuous time period with the largest revenue from battery discharge.
 
-    This algorithm evaluates all possible starting minutes to find the optimal window with maximum revenue.
-    This ensures we don't miss optimal solutions that start mid-hour.
+    Periods meeting the price threshold form runs of consecutive periods. Within a run, the revenue of a window
+    starting at minute s is C(min(s + d, run_end)) - C(s), where C is the cumulative price over minutes and d is
+    the maximum duration. This function is piecewise linear in s and changes slope only when the window start or
+    the window end crosses a period boundary. The optimum is therefore always one of the breakpoints: a period
+    boundary, a period boundary shifted back by the maximum duration, or the last start minute of the run.
 
     Revenue is calculated as: price_per_kwh * discharge_energy_per_minute * minutes, where
     discharge_energy_per_minute is derived from the battery's maximum discharge energy in one hour.
+    If several windows yield the same revenue, the latest one wins.
 
     Args:
-        hourly_prices: Sorted list of hourly prices with no gaps.
-        min_price_threshold: Minimum hourly price threshold that must apply to each individual period in the window.
+        prices: Sorted list of fixed length period prices (e.g. hourly or 15-minute) with no gaps.
+        min_price_threshold: Minimum price threshold that must apply to each individual period in the window.
         max_duration_minutes: Maximum allowed duration for the period in minutes. Can be any value (e.g. 28, 105, 180).
         discharge_energy_1h: Maximum energy the battery can discharge in one hour (kWh).
+        period_duration_minutes: Duration of every price period in minutes, 60 for hourly and 15 for 15-minute prices.
 
     Returns:
         Tuple of (revenue, start_time, end_time) if a valid period exists,
         None otherwise.
 
-    Time Complexity: O(n * d) where n is number of periods and d is max_duration_minutes
+    Time Complexity: O(n) where n is number of periods, independent of max_duration_minutes
     """
     if max_duration_minutes < 1:
         raise ValueError(f"max_duration_minutes must be at least 1, got {max_duration_minutes}")
 
-    if not hourly_prices:
-        return None
+    if period_duration_minutes < 1:
+        raise ValueError(f"period_duration_minutes must be at least 1, got {period_duration_minutes}")
 
-    if not any(hourly_price.price >= min_price_threshold for hourly_price in hourly_prices):
+    if not prices:
         return None
 
-    period_duration_minutes = 60
+    # Validates currency and unit once, the loops below run on exact fixed point integers
+    price_vector = PriceVector.from_prices(period_price.price for period_price in prices)
+    threshold = price_vector.fixed_point(min_price_threshold)
 
-    max_revenue = None
+    best_price_minutes = None
     best_start_time = None
     best_end_time = None
 
-    # Use variable-length sliding window algorithm, optimized two-pointer sliding window approach is not applicable here
-    for start_hour_idx, start_hour in enumerate(hourly_prices):
-        # Skip if period doesn't meet price threshold
-        if start_hour.price < min_price_threshold:
-            continue
+    for run_start_idx, run_end_idx in _find_threshold_runs(price_vector, threshold):
+        run_prices = price_vector.values[run_start_idx:run_end_idx]
+        cumulative_prices = _cumulative_price_minutes(run_prices, period_duration_minutes)
+        run_minutes = len(run_prices) * period_duration_minutes
+        run_start = prices[run_start_idx].period.start
+
+        for start_minute in _breakpoints(run_minutes, period_duration_minutes, max_duration_minutes):
+            end_minute = min(start_minute + max_duration_minutes, run_minutes)
+
+            price_minutes = _price_minutes_at(
+                end_minute, run_prices, cumulative_prices, period_duration_minutes
+            ) - _price_minutes_at(start_minute, run_prices, cumulative_prices, period_duration_minutes)
 
-        # Try starting at each minute within this period
-        for start_offset_minutes in range(period_duration_minutes):
-            start_time = start_hour.period.start + timedelta(minutes=start_offset_minutes)
+            if best_price_minutes is None or price_minutes >= best_price_minutes:
+                best_price_minutes = price_minutes
+                best_start_time = run_start + timedelta(minutes=start_minute)
+                best_end_time = run_start + timedelta(minutes=end_minute)
 
-            # Calculate revenue for a window of max_duration_minutes from this start
-            revenue = start_hour.price.normalize_to_price_per_kwh().money.zeroed()
-            minutes_covered = 0
+    if best_price_minutes is None or best_start_time is None or best_end_time is None:
+        return None
 
-            # Iterate through periods that this window spans
-            current_period_idx = start_hour_idx
-            minutes_into_current_period = start_offset_minutes
+    # Price-minutes are exact, multiply by discharge energy only once to keep ties between windows exact
+    discharge_kwh_per_minute = Decimal(discharge_energy_1h.value) / Decimal(_MINUTES_PER_HOUR)
+    best_price_minutes_per_kwh = price_vector.to_money(best_price_minutes)
+    max_revenue = Money(
+        value=best_price_minutes_per_kwh.value * discharge_kwh_per_minute, currency=best_price_minutes_per_kwh.currency
+    )
 
-            while minutes_covered < max_duration_minutes and current_period_idx < len(hourly_prices):
-                current_hourly_price = hourly_prices[current_period_idx]
+    return (max_revenue, best_start_time, best_end_time)
 
-                # Check threshold - stop if this period doesn't meet it
-                if current_hourly_price.price < min_price_threshold:
-                    break
 
-                # Calculate how many minutes to take from this period
-                minutes_available_in_period = period_duration_minutes - minutes_into_current_period
-                minutes_needed = max_duration_minutes - minutes_covered
-                minutes_to_take = min(minutes_available_in_period, minutes_needed)
+def find_max_revenue_periods(
+    prices: Sequence[HourlyPrice] | Sequence[FifteenMinutePrice],
+    min_price_threshold: EnergyPrice,
+    max_duration_minutes: int,
+    discharge_energy_1h: EnergyKwh,
+    max_periods: int,
+    period_duration_minutes: int = 60,
+) -> tuple[Money, list[tuple[datetime, datetime]]] | None:
+    """
+    Find up to max_periods disjoint time periods with the largest total revenue from battery discharge.
 
-                # Add revenue: price_per_kwh * discharge_kwh_per_minute * minutes
-                price_per_kwh = current_hourly_price.price.normalize_to_price_per_kwh().money
-                discharge_kwh_per_minute = Decimal(discharge_energy_1h.value) / Decimal(period_duration_minutes)
-                revenue += price_per_kwh * discharge_kwh_per_minute * Decimal(minutes_to_take)
-                minutes_covered += minutes_to_take
+    The maximum duration is an energy budget shared by all periods. Dynamic programming walks the prices once, the
+    state is the number of periods opened, the number of whole price periods used, whether the partially used price
+    period is taken and whether the previous price period belongs to an open discharge period. A budget not aligned
+    to price periods needs at most one partially used price period, at the start or at the end of a discharge period:
+    shifting minutes from a cheaper partial price period to a more expensive one never lowers the revenue.
 
-                # Move to next period
-                current_period_idx += 1
-                minutes_into_current_period = 0
+    Revenue is calculated as in find_max_revenue_period. If several plans yield the same revenue, the one with fewer
+    periods wins, so no inverter slot is used without a gain.
 
-            # Check if this is a valid and better solution
-            if minutes_covered >= 1:
-                end_time = start_time + timedelta(minutes=minutes_covered)
+    Args:
+        prices: Sorted list of fixed length period prices (e.g. hourly or 15-minute) with no gaps.
+        min_price_threshold: Minimum price threshold that must apply to each individual period in every window.
+        max_duration_minutes: Maximum total duration of all periods in minutes.
+        discharge_energy_1h: Maximum energy the battery can discharge in one hour (kWh).
+        max_periods: Maximum number of disjoint periods, e.g. the number of inverter discharge slots.
+        period_duration_minutes: Duration of every price period in minutes, 60 for hourly and 15 for 15-minute prices.
 
-                if max_revenue is None or revenue >= max_revenue:
-                    max_revenue = revenue
-                    best_start_time = start_time
-                    best_end_time = end_time
+    Returns:
+        Tuple of (revenue, [(start_time, end_time), ...]) with periods in chronological order if a valid plan
+        exists, None otherwise.
 
-    if max_revenue is None or best_start_time is None or best_end_time is None:
+    Time Complexity: O(n * k * b) where n is number of periods, k is max_periods and b is the number of whole
+    periods in the budget
+    """
+    if max_duration_minutes < 1:
+        raise ValueError(f"max_duration_minutes must be at least 1, got {max_duration_minutes}")
+
+    if period_duration_minutes < 1:
+        raise ValueError(f"period_duration_minutes must be at least 1, got {period_duration_minutes}")
+
+    if max_periods < 1:
+        raise ValueError(f"max_periods must be at least 1, got {max_periods}")
+
+    if not prices:
         return None
 
-    return (max_revenue, best_start_time, best_end_time)
+    price_vector = PriceVector.from_prices(period_price.price for period_price in prices)
+    threshold = price_vector.fixed_point(min_price_threshold)
+    eligible_count = sum(1 for price in price_vector.values if price >= threshold)
+    if eligible_count == 0:
+        return None
+
+    whole_budget, remainder_minutes = divmod(max_duration_minutes, period_duration_minutes)
+    whole_budget = min(whole_budget, eligible_count)
+
+    # (opened periods, whole price periods used, partial price period used, inside an open period) -> price-minutes
+    states: dict[_PlanState, int] = {(0, 0, False, False): 0}
+    # per price period: state -> (previous state, action), walked back to rebuild the best plan
+    back_pointers: list[dict[_PlanState, tuple[_PlanState, _Action]]] = []
+
+    for price in price_vector.values:
+        next_states: dict[_PlanState, int] = {}
+        pointers: dict[_PlanState, tuple[_PlanState, _Action]] = {}
+
+        for state, value in states.items():
+            opened, used, partial_used, inside = state
+            _relax(next_states, pointers, (opened, used, partial_used, False), value, state, _Action.SKIP)
+
+            if price < threshold:
+                continue
+
+            full_value = value + price * period_duration_minutes
+            if used < whole_budget and inside:
+                _relax(next_states, pointers, (opened, used + 1, partial_used, True), full_value, state, _Action.FULL)
+            elif used < whole_budget and opened < max_periods:
+                _relax(
+                    next_states, pointers, (opened + 1, used + 1, partial_used, True), full_value, state, _Action.FULL
+                )
+
+            partial_value = value + price * remainder_minutes
+            if remainder_minutes and not partial_used and inside:
+                # the first minutes of the price period close the discharge period
+                _relax(next_states, pointers, (opened, used, True, False), partial_value, state, _Action.PARTIAL_END)
+            elif remainder_minutes and not partial_used and opened < max_periods:
+                # the last minutes of the price period open a discharge period
+                _relax(
+                    next_states, pointers, (opened + 1, used, True, True), partial_value, state, _Action.PARTIAL_START
+                )
+
+        states = next_states
+        back_pointers.append(pointers)
+
+    best_state = max(states, key=lambda state: (states[state], -state[0]))
+    if best_state[0] == 0:
+        return None
+
+    actions: list[_Action] = []
+    state = best_state
+    for pointers in reversed(back_pointers):
+        state, action = pointers[state]
+        actions.append(action)
+    actions.reverse()
+
+    windows = _windows_from_actions(prices, actions, period_duration_minutes, remainder_minutes)
+
+    discharge_kwh_per_minute = Decimal(discharge_energy_1h.value) / Decimal(_MINUTES_PER_HOUR)
+    price_minutes_per_kwh = price_vector.to_money(states[best_state])
+    max_revenue = Money(
+        value=price_minutes_per_kwh.value * discharge_kwh_per_minute, currency=price_minutes_per_kwh.currency
+    )
+
+    return (max_revenue, windows)
+
+
+type _PlanState = tuple[int, int, bool, bool]
+
+
+class _Action(Enum):
+    SKIP = auto()
+    FULL = auto()
+    PARTIAL_START = auto()
+    PARTIAL_END = auto()
+
+
+def _relax(
+    states: dict[_PlanState, int],
+    pointers: dict[_PlanState, tuple[_PlanState, _Action]],
+    state: _PlanState,
+    value: int,
+    previous: _PlanState,
+    action: _Action,
+) -> None:
+    if state not in states or value > states[state]:
+        states[state] = value
+        pointers[state] = (previous, action)
+
+
+def _windows_from_actions(
+    prices: Sequence[HourlyPrice] | Sequence[FifteenMinutePrice],
+    actions: list[_Action],
+    period_duration_minutes: int,
+    remainder_minutes: int,
+) -> list[tuple[datetime, datetime]]:
+    period = timedelta(minutes=period_duration_minutes)
+    remainder = timedelta(minutes=remainder_minutes)
+
+    windows: list[tuple[datetime, datetime]] = []
+    inside = False
+    for period_price, action in zip(prices, actions, strict=True):
+        period_start = period_price.period.start
+        match action:
+            case _Action.SKIP:
+                inside = False
+            case _Action.FULL if inside:
+                windows[-1] = (windows[-1][0], period_start + period)
+            case _Action.FULL:
+                windows.append((period_start, period_start + period))
+                inside = True
+            case _Action.PARTIAL_START:
+                windows.append((period_start + period - remainder, period_start + period))
+                inside = True
+            case _Action.PARTIAL_END:
+                windows[-1] = (windows[-1][0], period_start + remainder)
+                inside = False
+
+    return windows
+
+
+def _find_threshold_runs(price_vector: PriceVector, threshold: int) -> list[tuple[int, int]]:
+    runs = []
+    run_start_idx = None
+
+    for idx, price in enumerate(price_vector.values):
+        if price >= threshold:
+            if run_start_idx is None:
+                run_start_idx = idx
+        elif run_start_idx is not None:
+            runs.append((run_start_idx, idx))
+            run_start_idx = None
+
+    if run_start_idx is not None:
+        runs.append((run_start_idx, len(price_vector)))
+
+    return runs
+
+
+def _cumulative_price_minutes(prices: Sequence[int], period_duration_minutes: int) -> list[int]:
+    cumulative = [0]
+    for price in prices:
+        cumulative.append(cumulative[-1] + price * period_duration_minutes)
+    return cumulative
+
+
+def _price_minutes_at(
+    minute: int, prices: Sequence[int], cumulative_prices: list[int], period_duration_minutes: int
+) -> int:
+    period_idx, offset = divmod(minute, period_duration_minutes)
+    if offset == 0:
+        return cumulative_prices[period_idx]
+    return cumulative_prices[period_idx] + prices[period_idx] * offset
+
+
+def _breakpoints(run_minutes: int, period_duration_minutes: int, max_duration_minutes: int) -> list[int]:
+    last_start_minute = run_minutes - 1
+
+    # Both sequences are already sorted, merge them in a single pass
+    boundaries = range(0, run_minutes, period_duration_minutes)
+    shifted_boundaries = range(
+        _first_shifted_boundary(period_duration_minutes, max_duration_minutes),
+        min(last_start_minute, run_minutes - max_duration_minutes) + 1,
+        period_duration_minutes,
+    )
+
+    breakpoints = []
+    for minute in merge(boundaries, shifted_boundaries, [last_start_minute]):
+        if not breakpoints or breakpoints[-1] != minute:
+            breakpoints.append(minute)
+
+    return breakpoints
+
+
+def _first_shifted_boundary(period_duration_minutes: int, max_duration_minutes: int) -> int:
+    # smallest non-negative (boundary - max_duration_minutes) for a boundary after the run start
+    return (period_duration_minutes - max_duration_minutes % period_duration_minutes) % period_duration_minutes
@@ -0,0 +1,110 @@
+import logging
+from collections.abc import Generator
+from contextlib import contextmanager
+from itertools import count
+
+from appdaemon_protocols.appdaemon_logger import AppdaemonLogger
+from appdaemon_protocols.appdaemon_service import AppdaemonService
+from appdaemon_protocols.appdaemon_state import AppdaemonState
+from utils.safe_converters import safe_float
+
+# service -> (attribute holding the target, None for the entity state; data key with the requested value)
+_VALUE_SERVICES = {
+    "number/set_value": (None, "value"),
+    "text/set_value": (None, "value"),
+    "select/select_option": (None, "option"),
+    "climate/set_temperature": ("temperature", "temperature"),
+    "water_heater/set_temperature": ("temperature", "temperature"),
+}
+_ON_OFF_SERVICES = {
+    "switch/turn_on": "on",
+    "switch/turn_off": "off",
+    "input_boolean/turn_on": "on",
+    "input_boolean/turn_off": "off",
+}
+
+
+class BatchingAppdaemonService:
+    """Coalesces service calls issued within a batch and drops calls that wouldn't change anything.
+
+    Writes to the same entity are merged into the last one, calls are flushed in the order their entities were first
+    written. Calls of other services, e.g. timers, are never dropped nor merged.
+    """
+
+    def __init__(
+        self, appdaemon_logger: AppdaemonLogger, appdaemon_state: AppdaemonState, appdaemon_service: AppdaemonService
+    ) -> None:
+        self.appdaemon_logger = appdaemon_logger
+        self.appdaemon_state = appdaemon_state
+        self.appdaemon_service = appdaemon_service
+
+        self.calls = 0
+        self.dispatched = 0
+        self.merged = 0
+        self.dropped = 0
+
+        self._depth = 0
+        self._pending: dict[str | int, tuple[str, dict]] = {}
+        self._sequence = count()
+
+    def call_service(self, service: str, **data) -> object:  # noqa: ANN003
+        self.calls += 1
+
+        entity_id = data.get("entity_id")
+        if isinstance(entity_id, str) and (service in _VALUE_SERVICES or service in _ON_OFF_SERVICES):
+            if entity_id in self._pending:
+                self.merged += 1
+            # a merged write keeps the position of the first one, so the flush order doesn't depend on re-evaluations
+            self._pending[entity_id] = (service, data)
+        else:
+            self._pending[next(self._sequence)] = (service, data)
+
+        if self._depth == 0:
+            self.flush()
+        return None
+
+    @contextmanager
+    def batch(self) -> Generator[None]:
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                self.flush()
+
+    def flush(self) -> None:
+        pending = self._pending
+        self._pending = {}
+
+        for service, data in pending.values():
+            if self._is_noop(service, data):
+                self.dropped += 1
+                self.appdaemon_logger.log(
+                    "Skip %s for %s, already set", service, data.get("entity_id"), level=logging.DEBUG
+                )
+                continue
+
+            self.dispatched += 1
+            self.appdaemon_service.call_service(service, **data)
+
+    def calls_saved(self) -> int:
+        return self.merged + self.dropped
+
+    def _is_noop(self, service: str, data: dict) -> bool:
+        entity_id = data.get("entity_id")
+        if not isinstance(entity_id, str):
+            return False
+
+        if (target := _ON_OFF_SERVICES.get(service)) is not None:
+            return self.appdaemon_state.get_state(entity_id) == target
+
+        if (value_service := _VALUE_SERVICES.get(service)) is None:
+            return False
+
+        attribute, value_key = value_service
+        current = self.appdaemon_state.get_state(entity_id, attribute)
+        requested = data.get(value_key)
+        if isinstance(requested, int | float) and not isinstance(requested, bool):
+            return safe_float(current) == float(requested)
+        return current is not None and str(current) == str(requested)
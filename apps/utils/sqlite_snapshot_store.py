@@ -0,0 +1,71 @@
+import pickle
+import sqlite3
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    value: object
+    timestamp: float  # POSIX timestamp of the source data
+
+
+class SqliteSnapshotStore:
+    """Named, pickled snapshots with the timestamp of their source data in a single SQLite file.
+
+    Every operation opens its own connection, so the store can be used from any AppDaemon worker thread.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with self._connect() as connection, connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots "
+                "(name TEXT PRIMARY KEY, timestamp REAL NOT NULL, payload BLOB NOT NULL)"
+            )
+
+    def save(self, name: str, value: object, timestamp: float) -> None:
+        """Save a snapshot, replacing the previous one with the same name.
+
+        Args:
+            name: Snapshot name.
+            value: Picklable value.
+            timestamp: POSIX timestamp of the source data, e.g. of its newest record.
+        """
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._connect() as connection, connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO snapshots (name, timestamp, payload) VALUES (?, ?, ?)",
+                (name, timestamp, payload),
+            )
+
+    def load(self, name: str, now: float, max_age_seconds: float) -> Snapshot | None:
+        """Load a snapshot if its source data isn't older than the maximum age.
+
+        Args:
+            name: Snapshot name.
+            now: Current POSIX timestamp.
+            max_age_seconds: Maximum age of the snapshot.
+
+        Returns:
+            Snapshot with the unpickled value, or None if the snapshot is missing, stale or unreadable.
+        """
+        with self._connect() as connection:
+            row = connection.execute("SELECT timestamp, payload FROM snapshots WHERE name = ?", (name,)).fetchone()
+
+        if row is None:
+            return None
+
+        timestamp, payload = row
+        if now - timestamp > max_age_seconds:
+            return None
+
+        try:
+            return Snapshot(value=pickle.loads(payload), timestamp=timestamp)
+        except (pickle.UnpicklingError, AttributeError, ImportError, EOFError, TypeError):
+            # snapshot written by an incompatible version of the classes
+            return None
+
+    def _connect(self) -> closing[sqlite3.Connection]:
+        return closing(sqlite3.connect(self.path))
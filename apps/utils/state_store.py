@@ -0,0 +1,93 @@
+from collections.abc import Iterable, Mapping
+from typing import Protocol
+
+from appdaemon_protocols.appdaemon_namespace_state import AppdaemonNamespaceState
+from appdaemon_protocols.appdaemon_state import AppdaemonState
+from appdaemon_protocols.appdaemon_state_listener import AppdaemonStateListener
+
+
+class StateStore:
+    """In-memory copy of entity states kept up to date by state change events.
+
+    Every entity is fetched and subscribed once, on first read. Later reads are served from memory, so state factories
+    built on top of the store don't issue any ``get_state`` round-trips. The version is bumped on every change and
+    lets snapshots detect that they are stale.
+    """
+
+    def __init__(self, appdaemon_state: AppdaemonState, appdaemon_state_listener: AppdaemonStateListener) -> None:
+        self.appdaemon_state = appdaemon_state
+        self.appdaemon_state_listener = appdaemon_state_listener
+        self.version = 0
+        self._states: dict[str, object] = {}
+
+    def get_state(self, entity_id: str, attribute: str | None = None) -> object:
+        if entity_id not in self._states:
+            self._store(entity_id, self.appdaemon_state.get_state(entity_id, "all"))
+
+        match self._states[entity_id]:
+            case {"state": state} if attribute is None:
+                return state
+            case {"attributes": {**attributes}} if attribute is not None:
+                return attributes.get(attribute)
+            case _:
+                return None
+
+    def preload(self, states: Mapping[str, object]) -> None:
+        """Store states fetched up front, e.g. by fetch_states, entities already in the store are kept.
+
+        Args:
+            states: Full states, with state and attributes, by entity id.
+        """
+        for entity_id, state in states.items():
+            if entity_id not in self._states:
+                self._store(entity_id, state)
+
+    def _store(self, entity_id: str, state: object) -> None:
+        self._states[entity_id] = state
+        self.appdaemon_state_listener.listen_state(self._on_state_change, entity_id, attribute="all")
+
+    def _on_state_change(self, entity, attribute, old, new, **kwargs) -> None:  # noqa: ANN001, ANN003, ARG002
+        self._states[entity] = new
+        self.version += 1
+
+
+def fetch_states(appdaemon_namespace_state: AppdaemonNamespaceState, entity_ids: Iterable[str]) -> dict[str, object]:
+    """Fetch full states of many entities with a single read of the whole namespace.
+
+    Args:
+        appdaemon_namespace_state: State API, ``get_state()`` without arguments returns all entities.
+        entity_ids: Entities to fetch.
+
+    Returns:
+        Full states, with state and attributes, by entity id. None for entities missing in the namespace.
+    """
+    namespace = appdaemon_namespace_state.get_state()
+    if not isinstance(namespace, dict):
+        namespace = {}
+    return {entity_id: namespace.get(entity_id) for entity_id in entity_ids}
+
+
+class VersionedState(Protocol):
+    version: int
+
+
+class StateFactory[T](Protocol):
+    def create(self) -> T | None: ...
+
+
+class SnapshotStateFactory[T]:
+    """Reuses the last created state until the store reports a change."""
+
+    def __init__(self, state_store: VersionedState, state_factory: StateFactory[T]) -> None:
+        self.state_store = state_store
+        self.state_factory = state_factory
+        self._snapshot: T | None = None
+        self._snapshot_version = -1
+
+    def create(self) -> T | None:
+        # read the version first, a change arriving while the state is created makes the snapshot stale
+        version = self.state_store.version
+        if self._snapshot is None or self._snapshot_version != version:
+            self._snapshot = self.state_factory.create()
+            self._snapshot_version = version
+        return self._snapshot
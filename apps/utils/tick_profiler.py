@@ -0,0 +1,82 @@
+import cProfile
+import io
+import logging
+import pstats
+import threading
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+
+from appdaemon_protocols.appdaemon_logger import AppdaemonLogger
+
+# cProfile sits on the process wide sys.monitoring since Python 3.12, a single profile can be active at a time
+_PROFILING_LOCK = threading.Lock()
+
+
+class TickProfiler:
+    """Profiles the next N control ticks with cProfile, on request and without restarting AppDaemon.
+
+    Stats of all profiled ticks are accumulated, saved to a ``.prof`` file readable with ``pstats`` or snakeviz,
+    and the hottest functions by cumulative time are logged. The profile covers every thread running while a tick is
+    profiled, e.g. callbacks of other apps, not only the tick itself.
+
+    A tick is never skipped: while another profile is active it runs unprofiled and a later tick is profiled instead.
+    """
+
+    def __init__(self, appdaemon_logger: AppdaemonLogger, output_directory: Path) -> None:
+        self.appdaemon_logger = appdaemon_logger
+        self.output_directory = output_directory
+
+        self.remaining_ticks = 0
+        self._profile: cProfile.Profile | None = None
+        self._path: Path | None = None
+        self._top = 0
+
+    def start(self, name: str, ticks: int, top: int, now: datetime) -> None:
+        if ticks <= 0:
+            raise ValueError(f"ticks must be positive, got {ticks}")
+
+        self.remaining_ticks = ticks
+        self._profile = cProfile.Profile()
+        self._path = self.output_directory / f"{name}_{now:%Y%m%dT%H%M%S}.prof"
+        self._top = top
+        self.appdaemon_logger.log("Profiling next %d ticks to %s", ticks, self._path)
+
+    def profile(self, tick: Callable[[], object]) -> None:
+        if (profile := self._profile) is None:
+            tick()
+            return
+
+        if not _PROFILING_LOCK.acquire(blocking=False):
+            self.appdaemon_logger.log("Skip profiling, another tick is profiled", level=logging.WARNING)
+            tick()
+            return
+
+        try:
+            profile.enable()
+        except ValueError as e:
+            # another profiling tool, e.g. a debugger or coverage, owns sys.monitoring
+            _PROFILING_LOCK.release()
+            self.appdaemon_logger.log("Skip profiling: %s", e, level=logging.WARNING)
+            tick()
+            return
+
+        try:
+            tick()
+        finally:
+            profile.disable()
+            _PROFILING_LOCK.release()
+            self.remaining_ticks -= 1
+            if self.remaining_ticks == 0:
+                self._finish(profile)
+
+    def _finish(self, profile: cProfile.Profile) -> None:
+        assert self._path is not None
+        self._profile = None
+
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        profile.dump_stats(self._path)
+
+        report = io.StringIO()
+        pstats.Stats(profile, stream=report).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self._top)
+        self.appdaemon_logger.log("Profile saved to %s\n%s", self._path, report.getvalue())
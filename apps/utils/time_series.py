@@ -0,0 +1,28 @@
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Iterator
+from datetime import datetime
+
+
+class TimeSeries[T]:
+    """Items sorted by timestamp with bisect-based range slicing and O(1) exact-timestamp lookup."""
+
+    def __init__(self, items: Iterable[T], key: Callable[[T], datetime]) -> None:
+        # stable sort, items sharing a timestamp keep their input order
+        self.items = sorted(items, key=key)
+        self._keys = [key(item) for item in self.items]
+        self._index: dict[datetime, T] = {}
+        for timestamp, item in zip(self._keys, self.items, strict=True):
+            self._index.setdefault(timestamp, item)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self.items)
+
+    def find(self, timestamp: datetime) -> T | None:
+        return self._index.get(timestamp)
+
+    def range(self, start: datetime, end: datetime) -> list[T]:
+        """Return the items with start <= timestamp < end."""
+        return self.items[bisect_left(self._keys, start) : bisect_left(self._keys, end)]
@@ -0,0 +1,110 @@
+import random
+import timeit
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from units.energy_kwh import EnergyKwh
+from units.energy_price import EnergyPrice
+from units.fifteen_minute_period import FifteenMinutePeriod
+from units.fifteen_minute_price import FifteenMinutePrice
+from units.hourly_period import HourlyPeriod
+from units.hourly_price import HourlyPrice
+from units.money import Money
+from utils.revenue_estimators import find_max_revenue_period
+
+_REPEAT = 5
+
+
+def find_max_revenue_period_brute_force(
+    prices: list[HourlyPrice] | list[FifteenMinutePrice],
+    min_price_threshold: EnergyPrice,
+    max_duration_minutes: int,
+    discharge_energy_1h: EnergyKwh,
+    period_duration_minutes: int = 60,
+) -> tuple[Money, datetime, datetime] | None:
+    # Previous implementation, evaluates every starting minute of every period
+    best = None
+    discharge_kwh_per_minute = Decimal(discharge_energy_1h.value) / Decimal(60)
+
+    for start_idx, start_period in enumerate(prices):
+        if start_period.price < min_price_threshold:
+            continue
+
+        for start_offset_minutes in range(period_duration_minutes):
+            revenue = start_period.price.normalize_to_price_per_kwh().money.zeroed()
+            minutes_covered = 0
+            idx = start_idx
+            minutes_into_period = start_offset_minutes
+
+            while minutes_covered < max_duration_minutes and idx < len(prices):
+                if prices[idx].price < min_price_threshold:
+                    break
+                minutes_to_take = min(
+                    period_duration_minutes - minutes_into_period, max_duration_minutes - minutes_covered
+                )
+                price_per_kwh = prices[idx].price.normalize_to_price_per_kwh().money
+                revenue += price_per_kwh * discharge_kwh_per_minute * Decimal(minutes_to_take)
+                minutes_covered += minutes_to_take
+                idx += 1
+                minutes_into_period = 0
+
+            start_time = start_period.period.start + timedelta(minutes=start_offset_minutes)
+            if best is None or revenue >= best[0]:
+                best = (revenue, start_time, start_time + timedelta(minutes=minutes_covered))
+
+    return best
+
+
+def synthetic_hourly_prices(hours: int, seed: int = 42) -> list[HourlyPrice]:
+    rnd = random.Random(seed)
+    start = datetime.fromisoformat("2025-10-10T00:00:00+00:00")
+    return [
+        HourlyPrice(
+            period=HourlyPeriod(start + timedelta(hours=i)),
+            price=EnergyPrice.per_mwh(Money.pln(Decimal(rnd.randint(-50, 1500)))),
+        )
+        for i in range(hours)
+    ]
+
+
+def synthetic_fifteen_minute_prices(hours: int, seed: int = 42) -> list[FifteenMinutePrice]:
+    rnd = random.Random(seed)
+    start = datetime.fromisoformat("2025-10-10T00:00:00+00:00")
+    return [
+        FifteenMinutePrice(
+            period=FifteenMinutePeriod(start + timedelta(minutes=15 * i)),
+            price=EnergyPrice.per_mwh(Money.pln(Decimal(rnd.randint(-50, 1500)))),
+        )
+        for i in range(hours * 4)
+    ]
+
+
+def main() -> None:
+    threshold = EnergyPrice.per_mwh(Money.pln(Decimal(300)))
+    discharge_energy_1h = EnergyKwh(8.32)
+
+    print(f"{'period':>6} {'hours':>6} {'minutes':>8} {'brute force ms':>15} {'breakpoints ms':>15} {'speedup':>8}")
+
+    for period_duration_minutes in (60, 15):
+        for hours in (6, 24, 48):
+            if period_duration_minutes == 15:
+                prices = synthetic_fifteen_minute_prices(hours)
+            else:
+                prices = synthetic_hourly_prices(hours)
+
+            for max_duration_minutes in (60, 180, 360):
+                args = (prices, threshold, max_duration_minutes, discharge_energy_1h, period_duration_minutes)
+
+                brute_force = min(
+                    timeit.repeat(lambda a=args: find_max_revenue_period_brute_force(*a), number=1, repeat=_REPEAT)
+                )
+                breakpoints = min(timeit.repeat(lambda a=args: find_max_revenue_period(*a), number=1, repeat=_REPEAT))
+
+                print(
+                    f"{period_duration_minutes:>6} {hours:>6} {max_duration_minutes:>8} "
+                    f"{brute_force * 1000:>15.2f} {breakpoints * 1000:>15.2f} {brute_force / breakpoints:>7.0f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
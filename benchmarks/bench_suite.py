@@ -0,0 +1,242 @@
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import timeit
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+from entities.entities import (
+    AWAY_MODE_ENTITY,
+    BATTERY_FULL_CHARGE_ENTITY,
+    BATTERY_MAX_CHARGE_CURRENT_ENTITY,
+    BATTERY_MAX_DISCHARGE_CURRENT_ENTITY,
+    BATTERY_RESERVE_SOC_ENTITY,
+    BATTERY_SOC_ENTITY,
+    ECO_MODE_ENTITY,
+    EXCESS_ENERGY_ENTITY,
+    HEATING_ENTITY,
+    INDOOR_TEMPERATURE_ENTITY,
+    INVERTER_STORAGE_MODE_ENTITY,
+    OUTDOOR_TEMPERATURE_ENTITY,
+    PRICE_FORECAST_TODAY_ENTITY,
+    PRICE_FORECAST_TOMORROW_ENTITY,
+    PV_FORECAST_TODAY_ENTITY,
+    PV_FORECAST_TOMORROW_ENTITY,
+    SLOT1_DISCHARGE_CURRENT_ENTITY,
+    SLOT1_DISCHARGE_ENABLED_ENTITY,
+    SLOT1_DISCHARGE_TIME_ENTITY,
+    WEATHER_FORECAST_ENTITY,
+)
+from simulation.history import History
+from simulation.simulated_appdaemon import SimulatedLogger, SimulatedService, SimulatedState, SimulationClock
+from simulation.synthetic import synthetic_history_steps
+from solar.battery_discharge_slot_estimator import BatteryDischargeSlotEstimator
+from solar.battery_max_current_estimator import BatteryMaxCurrentEstimator
+from solar.battery_reserve_soc_estimator import BatteryReserveSocEstimator
+from solar.excess_energy_estimator import ExcessEnergyEstimator
+from solar.forecast_factory import DefaultForecastFactory
+from solar.price_forecast import PriceForecast
+from solar.solar import Solar
+from solar.solar_configuration import create_configuration
+from solar.solar_state import SolarState
+from solar.solar_state_factory import DefaultSolarStateFactory
+from solar.storage_mode import StorageMode
+from solar.storage_mode_estimator import StorageModeEstimator
+from units.energy_kwh import EnergyKwh
+from units.energy_price import EnergyPrice
+from units.money import Money
+from utils.energy_aggregators import maximum_cumulative_deficit
+from utils.revenue_estimators import find_max_revenue_period, find_max_revenue_periods
+
+_TIME_ZONE = "Europe/Warsaw"
+_START = datetime.fromisoformat("2025-10-10T00:00:00+02:00")
+# evening discharge decisions are made in the afternoon, with tomorrow prices already published
+_NOW = datetime.fromisoformat("2025-10-10T15:30:00+02:00")
+_WEATHER_FORECAST_DAYS = 7
+_REPEAT = 7
+_RESULTS_DIRECTORY = Path(__file__).with_name("results")
+
+
+@dataclass(frozen=True)
+class Fixtures:
+    rce_prices: list[dict]  # 48 hours of 15-minute prices
+    pv_forecast_today: list[dict]  # Solcast detailedHourly
+    pv_forecast_tomorrow: list[dict]
+    weather_forecast: list[dict]  # 7 days, hourly
+
+
+def create_fixtures() -> Fixtures:
+    steps = synthetic_history_steps(_START, _WEATHER_FORECAST_DAYS, _TIME_ZONE)
+    history = History(steps)
+    today = _START.date()
+    tomorrow = today + timedelta(days=1)
+
+    return Fixtures(
+        rce_prices=history.price_forecast(today) + history.price_forecast(tomorrow),
+        pv_forecast_today=history.pv_forecast(today),
+        pv_forecast_tomorrow=history.pv_forecast(tomorrow),
+        weather_forecast=[
+            {"datetime": step.timestamp.isoformat(), "temperature": step.temperature, "humidity": step.humidity}
+            for step in steps
+            if step.timestamp.minute == 0
+        ],
+    )
+
+
+def create_state(fixtures: Fixtures) -> SimulatedState:
+    today = len(fixtures.rce_prices) // 2
+    state = SimulatedState()
+    for entity_id, value in {
+        BATTERY_SOC_ENTITY: 65.0,
+        BATTERY_FULL_CHARGE_ENTITY: "idle",
+        BATTERY_RESERVE_SOC_ENTITY: 20.0,
+        BATTERY_MAX_CHARGE_CURRENT_ENTITY: 160.0,
+        BATTERY_MAX_DISCHARGE_CURRENT_ENTITY: 160.0,
+        INDOOR_TEMPERATURE_ENTITY: 20.5,
+        OUTDOOR_TEMPERATURE_ENTITY: 12.0,
+        AWAY_MODE_ENTITY: "off",
+        ECO_MODE_ENTITY: "on",
+        INVERTER_STORAGE_MODE_ENTITY: StorageMode.SELF_USE.value,
+        SLOT1_DISCHARGE_ENABLED_ENTITY: "off",
+        SLOT1_DISCHARGE_TIME_ENTITY: "00:00-00:00",
+        SLOT1_DISCHARGE_CURRENT_ENTITY: 0.0,
+        HEATING_ENTITY: "heat",
+        PRICE_FORECAST_TODAY_ENTITY: 450.0,
+        EXCESS_ENERGY_ENTITY: "off",
+    }.items():
+        state.set_state(entity_id, value)
+
+    state.set_attribute(HEATING_ENTITY, "temperature", 20.0)
+    state.set_attribute(PV_FORECAST_TODAY_ENTITY, "detailedHourly", fixtures.pv_forecast_today)
+    state.set_attribute(PV_FORECAST_TOMORROW_ENTITY, "detailedHourly", fixtures.pv_forecast_tomorrow)
+    state.set_attribute(WEATHER_FORECAST_ENTITY, "forecast", fixtures.weather_forecast)
+    state.set_attribute(PRICE_FORECAST_TODAY_ENTITY, "prices", fixtures.rce_prices[:today])
+    state.set_attribute(PRICE_FORECAST_TOMORROW_ENTITY, "prices", fixtures.rce_prices[today:])
+    return state
+
+
+def create_solar(state: SimulatedState) -> Solar:
+    # no snapshots nor forecast caches, every control run creates the state and parses the forecasts
+    logger = SimulatedLogger()
+    configuration = create_configuration(_TIME_ZONE)
+    forecast_factory = DefaultForecastFactory(logger, configuration)
+    return Solar(
+        appdaemon_logger=logger,
+        appdaemon_service=SimulatedService(state, SimulationClock(_NOW)),
+        configuration=configuration,
+        state_factory=DefaultSolarStateFactory(logger, state),
+        battery_max_current_estimator=BatteryMaxCurrentEstimator(logger, configuration),
+        battery_discharge_slot_estimator=BatteryDischargeSlotEstimator(logger, configuration, forecast_factory),
+        battery_reserve_soc_estimator=BatteryReserveSocEstimator(logger, configuration, forecast_factory),
+        storage_mode_estimator=StorageModeEstimator(logger, configuration, forecast_factory),
+        excess_energy_estimator=ExcessEnergyEstimator(logger, configuration),
+    )
+
+
+def create_cases(fixtures: Fixtures) -> dict[str, Callable[[], object]]:
+    state = create_state(fixtures)
+    solar_state = DefaultSolarStateFactory(SimulatedLogger(), state).create()
+    assert isinstance(solar_state, SolarState)
+
+    configuration = create_configuration(_TIME_ZONE)
+    forecast_factory = DefaultForecastFactory(SimulatedLogger(), configuration)
+    price_forecast = PriceForecast.create_from_rce_15_mins(fixtures.rce_prices, _TIME_ZONE)
+    # deficit of the next 24 hours, from the start of the evening peak
+    evening = _NOW.replace(minute=0) + timedelta(hours=1)
+    consumptions = forecast_factory.create_consumption_forecast(solar_state).hourly(evening, 24)
+    productions = forecast_factory.create_production_forecast(solar_state).hourly(evening, 24)
+    threshold = EnergyPrice.per_mwh(Money.pln(Decimal(300)))
+
+    solar = create_solar(state)
+
+    return {
+        "PriceForecast.create_from_rce_15_mins": lambda: PriceForecast.create_from_rce_15_mins(
+            fixtures.rce_prices, _TIME_ZONE
+        ),
+        "find_max_revenue_period": lambda: find_max_revenue_period(
+            price_forecast.periods, threshold, 180, EnergyKwh(8.32), 15
+        ),
+        "find_max_revenue_periods": lambda: find_max_revenue_periods(
+            price_forecast.periods, threshold, 180, EnergyKwh(8.32), 3, 15
+        ),
+        "maximum_cumulative_deficit": lambda: maximum_cumulative_deficit(consumptions, productions),
+        "DefaultForecastFactory.create_production_forecast": lambda: forecast_factory.create_production_forecast(
+            solar_state
+        ),
+        "DefaultForecastFactory.create_consumption_forecast": lambda: forecast_factory.create_consumption_forecast(
+            solar_state
+        ),
+        "DefaultForecastFactory.create_price_forecast": lambda: forecast_factory.create_price_forecast(solar_state),
+        "DefaultForecastFactory.create_weather_forecast": lambda: forecast_factory.create_weather_forecast(solar_state),
+        "Solar.control_scheduled": lambda: solar.control_scheduled(_NOW),
+        "Solar.control_storage_mode": lambda: solar.control_storage_mode(_NOW),
+        "Solar.control_excess_energy": lambda: solar.control_excess_energy(_NOW),
+        "Solar.schedule_battery_discharge_at_4_pm": lambda: solar.schedule_battery_discharge_at_4_pm(_NOW),
+    }
+
+
+def measure(case: Callable[[], object]) -> dict[str, float | int]:
+    # calibrate the number of calls to about 0.2 s per repeat, shorter cases are too noisy timed one by one
+    timer = timeit.Timer(case)
+    number, _ = timer.autorange()
+    timings = [timing / number * 1000 for timing in timer.repeat(repeat=_REPEAT, number=number)]
+    return {"number": number, "min_ms": min(timings), "median_ms": statistics.median(timings)}
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, check=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time estimators, forecast parsing and Solar control runs")
+    parser.add_argument("--output", type=Path, help="results JSON, defaults to benchmarks/results/<revision>.json")
+    parser.add_argument("--baseline", type=Path, help="results JSON of an earlier run to compare with")
+    parser.add_argument("--filter", default="", help="run only cases containing this text")
+    args = parser.parse_args()
+
+    revision = git_revision()
+    baseline = json.loads(args.baseline.read_text())["results"] if args.baseline else {}
+
+    fixtures = create_fixtures()
+    results = {}
+    print(f"{'case':>50} {'calls':>7} {'min ms':>9} {'median ms':>10} {'vs baseline':>12}")
+    for name, case in create_cases(fixtures).items():
+        if args.filter not in name:
+            continue
+
+        results[name] = result = measure(case)
+        change = ""
+        if (baseline_result := baseline.get(name)) is not None:
+            change = f"{(result['min_ms'] / baseline_result['min_ms'] - 1) * 100:+.1f}%"
+        print(f"{name:>50} {result['number']:>7} {result['min_ms']:>9.3f} {result['median_ms']:>10.3f} {change:>12}")
+
+    output = args.output or _RESULTS_DIRECTORY / f"{revision}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(
+        json.dumps(
+            {
+                "revision": revision,
+                "created_at": datetime.now().astimezone().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "results": results,
+            },
+            indent=2,
+        )
+        + "\n"
+    )
+    print(f"Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import tracemalloc
+from dataclasses import fields, make_dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any
+
+from units.battery_current import BatteryCurrent
+from units.battery_soc import BatterySoc
+from units.celsius import Celsius
+from units.energy_kwh import EnergyKwh
+from units.energy_price import EnergyPrice
+from units.fifteen_minute_period import FifteenMinutePeriod
+from units.fifteen_minute_price import FifteenMinutePrice
+from units.hourly_energy import HourlyConsumptionEnergy, HourlyProductionEnergy
+from units.hourly_period import HourlyPeriod
+from units.hourly_price import HourlyPrice
+from units.hourly_weather import HourlyWeather
+from units.money import Money
+
+_HORIZON_DAYS = 7
+_FIFTEEN_MINUTE_PERIODS = _HORIZON_DAYS * 24 * 4
+_HOURLY_PERIODS = _HORIZON_DAYS * 24
+
+
+def allocated_bytes_per_object(cls: type, args: tuple, count: int) -> float:
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    objects = [cls(*args) for _ in range(count)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # the list holding the objects is measured as well, subtract its pointers
+    return (after - before) / len(objects) - 8
+
+
+def dict_based(cls: type[Any]) -> type:
+    # same fields without slots, how the units were declared before
+    return make_dataclass(cls.__name__, [(field.name, field.type) for field in fields(cls)], frozen=True)
+
+
+def main() -> None:
+    start = datetime.fromisoformat("2025-10-10T00:00:00+00:00")
+    money = Money.pln(Decimal(450))
+    price = EnergyPrice.per_mwh(money)
+    hourly_period = HourlyPeriod(start)
+    fifteen_minute_period = FifteenMinutePeriod(start + timedelta(minutes=15))
+    energy = EnergyKwh(1.5)
+
+    # objects held in memory for a single forecast series over the horizon
+    cases = [
+        (Money, (money.value, money.currency), _FIFTEEN_MINUTE_PERIODS),
+        (EnergyPrice, (money, price.unit), _FIFTEEN_MINUTE_PERIODS),
+        (FifteenMinutePeriod, (fifteen_minute_period.start,), _FIFTEEN_MINUTE_PERIODS),
+        (FifteenMinutePrice, (fifteen_minute_period, price), _FIFTEEN_MINUTE_PERIODS),
+        (HourlyPeriod, (start,), _HOURLY_PERIODS),
+        (HourlyPrice, (hourly_period, price), _HOURLY_PERIODS),
+        (EnergyKwh, (1.5,), _HOURLY_PERIODS),
+        (HourlyConsumptionEnergy, (hourly_period, energy), _HOURLY_PERIODS),
+        (HourlyProductionEnergy, (hourly_period, energy), _HOURLY_PERIODS),
+        (Celsius, (12.5,), _HOURLY_PERIODS),
+        (HourlyWeather, (hourly_period, Celsius(12.5), 60.0), _HOURLY_PERIODS),
+        (BatterySoc, (50.0,), _HOURLY_PERIODS),
+        (BatteryCurrent, (80.0,), _HOURLY_PERIODS),
+    ]
+
+    print(f"{_HORIZON_DAYS}-day horizon, 15-minute and hourly series")
+    print(f"{'unit':>24} {'objects':>8} {'dict B/obj':>11} {'slots B/obj':>12} {'saved KiB':>10}")
+
+    total_saved = 0.0
+    for cls, args, count in cases:
+        dict_bytes = allocated_bytes_per_object(dict_based(cls), args, count)
+        slots_bytes = allocated_bytes_per_object(cls, args, count)
+        saved = (dict_bytes - slots_bytes) * count
+        total_saved += saved
+
+        print(f"{cls.__name__:>24} {count:>8} {dict_bytes:>11.0f} {slots_bytes:>12.0f} {saved / 1024:>10.1f}")
+
+    print(f"{'total':>24} {'':>8} {'':>11} {'':>12} {total_saved / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,3 +16,28 @@ def mock_appdaemon_state() -> Mock:
 @pytest.fixture
 def mock_appdaemon_service() -> Mock:
     return Mock()
+
+
+@pytest.fixture
+def mock_appdaemon_scheduler() -> Mock:
+    return Mock()
+
+
+@pytest.fixture
+def mock_appdaemon_state_listener() -> Mock:
+    return Mock()
+
+
+class FakeClock:
+    """Monotonic clock stand-in, tests move the time by setting or advancing ``now``."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
@@ -0,0 +1,24 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+from simulation.history import History
+from simulation.synthetic import synthetic_history_steps
+from solar.solar_configuration import SolarConfiguration, create_configuration
+
+TIME_ZONE = "Europe/Warsaw"
+
+
+@pytest.fixture
+def configuration() -> SolarConfiguration:
+    return create_configuration(TIME_ZONE)
+
+
+@pytest.fixture
+def history_start() -> datetime:
+    return datetime(2025, 6, 1, tzinfo=ZoneInfo(TIME_ZONE))
+
+
+@pytest.fixture
+def history(history_start: datetime) -> History:
+    return History(synthetic_history_steps(history_start, days=3, time_zone=TIME_ZONE))
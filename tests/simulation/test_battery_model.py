@@ -0,0 +1,115 @@
+from dataclasses import replace
+from datetime import time
+
+import pytest
+from simulation.battery_model import BatteryModel, DischargeSlotSettings, InverterSettings
+from solar.storage_mode import StorageMode
+
+# 100 A at 50 V is 5 kWh per hour
+_VOLTAGE = 50.0
+
+
+@pytest.fixture
+def settings() -> InverterSettings:
+    return InverterSettings(
+        battery_reserve_soc=20.0,
+        battery_max_charge_current=100.0,
+        battery_max_discharge_current=100.0,
+        storage_mode=StorageMode.SELF_USE,
+        discharge_slots=(
+            DischargeSlotSettings(is_enabled=False, start=time(19, 0), end=time(20, 0), current=40.0),
+            DischargeSlotSettings(is_enabled=False, start=time(7, 0), end=time(8, 0), current=80.0),
+        ),
+    )
+
+
+def test_self_use_charges_surplus(settings: InverterSettings) -> None:
+    battery = BatteryModel(capacity=10.0, voltage=_VOLTAGE, soc=50.0)
+
+    grid_flow = battery.step(time(12, 0), 1.0, production=3.0, consumption=1.0, settings=settings)
+
+    assert battery.soc == pytest.approx(70.0)
+    assert grid_flow.grid_import == 0.0
+    assert grid_flow.grid_export == 0.0
+
+
+def test_self_use_exports_when_full(settings: InverterSettings) -> None:
+    battery = BatteryModel(capacity=10.0, voltage=_VOLTAGE, soc=95.0)
+
+    grid_flow = battery.step(time(12, 0), 1.0, production=3.0, consumption=1.0, settings=settings)
+
+    assert battery.soc == pytest.approx(100.0)
+    assert grid_flow.grid_export == pytest.approx(1.5)
+
+
+def test_charge_limited_by_current(settings: InverterSettings) -> None:
+    battery = BatteryModel(capacity=20.0, voltage=_VOLTAGE, soc=50.0)
+
+    grid_flow = battery.step(time(12, 0), 1.0, production=8.0, consumption=0.0, settings=settings)
+
+    assert battery.soc == pytest.approx(75.0)
+    assert grid_flow.grid_export == pytest.approx(3.0)
+
+
+def test_feed_in_priority_exports_surplus(settings: InverterSettings) -> None:
+    battery = BatteryModel(capacity=10.0, voltage=_VOLTAGE, soc=50.0)
+    settings = replace(settings, storage_mode=StorageMode.FEED_IN_PRIORITY)
+
+    grid_flow = battery.step(time(12, 0), 1.0, production=3.0, consumption=1.0, settings=settings)
+
+    assert battery.soc == pytest.approx(50.0)
+    assert grid_flow.grid_export == pytest.approx(2.0)
+
+
+def test_deficit_discharges_to_reserve(settings: InverterSettings) -> None:
+    battery = BatteryModel(capacity=10.0, voltage=_VOLTAGE, soc=30.0)
+
+    grid_flow = battery.step(time(22, 0), 1.0, production=0.0, consumption=2.0, settings=settings)
+
+    assert battery.soc == pytest.approx(20.0)
+    assert grid_flow.grid_import == pytest.approx(1.0)
+
+
+def test_below_reserve_charges_from_grid(settings: InverterSettings) -> None:
+    battery = BatteryModel(capacity=10.0, voltage=_VOLTAGE, soc=10.0)
+    settings = replace(settings, battery_reserve_soc=90.0)
+
+    grid_flow = battery.step(time(2, 0), 1.0, production=0.0, consumption=0.5, settings=settings)
+
+    assert battery.soc == pytest.approx(60.0)
+    assert grid_flow.grid_import == pytest.approx(5.5)
+
+
+def test_slot_discharge(settings: InverterSettings) -> None:
+    battery = BatteryModel(capacity=10.0, voltage=_VOLTAGE, soc=80.0)
+    settings = _enable_discharge_slots(settings)
+
+    grid_flow = battery.step(time(19, 30), 0.5, production=0.0, consumption=0.5, settings=settings)
+
+    assert battery.soc == pytest.approx(70.0)
+    assert grid_flow.grid_export == pytest.approx(0.5)
+
+
+def test_slot_discharge_outside_slot(settings: InverterSettings) -> None:
+    battery = BatteryModel(capacity=10.0, voltage=_VOLTAGE, soc=80.0)
+    settings = _enable_discharge_slots(settings)
+
+    grid_flow = battery.step(time(21, 0), 0.5, production=0.0, consumption=0.5, settings=settings)
+
+    assert battery.soc == pytest.approx(75.0)
+    assert grid_flow.grid_export == 0.0
+
+
+def test_second_slot_discharge(settings: InverterSettings) -> None:
+    battery = BatteryModel(capacity=10.0, voltage=_VOLTAGE, soc=80.0)
+    settings = _enable_discharge_slots(settings)
+
+    grid_flow = battery.step(time(7, 30), 0.5, production=0.0, consumption=0.5, settings=settings)
+
+    # 80 A at 50 V for half an hour
+    assert battery.soc == pytest.approx(60.0)
+    assert grid_flow.grid_export == pytest.approx(1.5)
+
+
+def _enable_discharge_slots(settings: InverterSettings) -> InverterSettings:
+    return replace(settings, discharge_slots=tuple(replace(slot, is_enabled=True) for slot in settings.discharge_slots))
@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta
+
+from entities.entities import (
+    BATTERY_FULL_CHARGE_ENTITY,
+    BATTERY_RESERVE_SOC_ENTITY,
+    SLOT1_DISCHARGE_ENABLED_ENTITY,
+)
+from simulation.engine import SimulationEngine
+from simulation.history import History
+from simulation.synthetic import synthetic_history_steps
+from solar.solar_configuration import SolarConfiguration
+
+
+def test_run(configuration: SolarConfiguration, history: History) -> None:
+    engine = SimulationEngine(configuration, history)
+
+    report = engine.run()
+
+    assert report.steps == len(history.steps)
+    assert report.grid_export > 0
+    assert 0.0 <= report.final_battery_soc <= 100.0
+    # evening price peak is worth a discharge slot
+    assert report.decisions[f"switch/turn_on {SLOT1_DISCHARGE_ENABLED_ENTITY}"] > 0
+    assert report.decisions[f"switch/turn_off {SLOT1_DISCHARGE_ENABLED_ENTITY}"] > 0
+    assert report.decisions[f"number/set_value {BATTERY_RESERVE_SOC_ENTITY}"] > 0
+    assert report.savings().value > 0
+    assert engine.logger.messages == []
+
+
+def test_run_initial_battery_soc(configuration: SolarConfiguration, history: History) -> None:
+    engine = SimulationEngine(configuration, history, initial_battery_soc=90.0)
+
+    assert engine.battery.soc == 90.0
+
+
+def test_run_full_charge_timer(configuration: SolarConfiguration, history_start: datetime) -> None:
+    history = History(synthetic_history_steps(history_start, days=1, time_zone=configuration.time_zone))
+    engine = SimulationEngine(configuration, history, initial_battery_soc=95.0, full_charge_timer_duration=timedelta(0))
+
+    report = engine.run()
+
+    assert report.decisions[f"timer/start {BATTERY_FULL_CHARGE_ENTITY}"] >= 1
+    assert engine.state.get_state(BATTERY_FULL_CHARGE_ENTITY) == "idle"
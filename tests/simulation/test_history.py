@@ -0,0 +1,123 @@
+import csv
+import importlib
+from dataclasses import replace
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pytest
+from simulation.history import History
+from simulation.synthetic import synthetic_history_steps
+from solar.price_forecast import PriceForecast
+from solar.production_forecast import ProductionForecastDefault
+from solar.weather_forecast import WeatherForecast
+
+TIME_ZONE = "Europe/Warsaw"
+
+
+def test_from_csv(tmp_path: Path, history_start: datetime) -> None:
+    steps = synthetic_history_steps(history_start, days=1, time_zone=TIME_ZONE)
+    path = tmp_path / "history.csv"
+    with path.open("w", newline="") as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(
+            ["timestamp", "battery_soc", "pv_estimate", "production", "consumption", "price", "temperature", "humidity"]
+        )
+        for step in steps:
+            writer.writerow(
+                [
+                    step.timestamp.astimezone(tz=None).isoformat(),
+                    "" if step.battery_soc is None else step.battery_soc,
+                    step.pv_estimate,
+                    step.production,
+                    step.consumption,
+                    step.price,
+                    step.temperature,
+                    step.humidity,
+                ]
+            )
+
+    history = History.from_csv(path, TIME_ZONE)
+
+    assert history.steps == steps
+    assert history.initial_battery_soc() == 50.0
+
+
+def test_from_rows_requires_timezone() -> None:
+    row = {
+        "timestamp": "2025-06-01T00:00:00",
+        "battery_soc": "",
+        "pv_estimate": 0,
+        "production": 0,
+        "consumption": 0,
+        "price": 0,
+        "temperature": 0,
+        "humidity": 0,
+    }
+
+    with pytest.raises(ValueError, match="timezone-aware"):
+        History.from_rows([row], TIME_ZONE)
+
+
+def test_from_parquet_requires_pyarrow(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    def import_module(name: str) -> None:
+        raise ImportError(name)
+
+    monkeypatch.setattr(importlib, "import_module", import_module)
+
+    with pytest.raises(ImportError, match="requires pyarrow"):
+        History.from_parquet(tmp_path / "history.parquet", TIME_ZONE)
+
+
+def test_empty_history() -> None:
+    with pytest.raises(ValueError, match="at least one step"):
+        History([])
+
+
+def test_history_with_gap(history_start: datetime) -> None:
+    steps = synthetic_history_steps(history_start, days=1, time_zone=TIME_ZONE)
+    del steps[10]
+
+    with pytest.raises(ValueError, match="without gaps"):
+        History(steps)
+
+
+def test_history_across_dst_change(history_start: datetime) -> None:
+    steps = synthetic_history_steps(history_start.replace(month=10, day=25), days=2, time_zone=TIME_ZONE)
+
+    history = History(steps)
+
+    assert len(history.steps) == 2 * 96
+
+
+def test_forecasts_are_parsable(history: History) -> None:
+    day = history.steps[0].timestamp.date()
+
+    production_forecast = ProductionForecastDefault.create(history.pv_forecast(day))
+    price_forecast = PriceForecast.create_from_rce_15_mins(history.price_forecast(day), TIME_ZONE)
+    weather_forecast = WeatherForecast.create(history.weather_forecast(day))
+
+    assert len(production_forecast.periods) == 24
+    assert len(price_forecast.periods) == 96
+    assert price_forecast.periods[0].period.start == history.steps[0].timestamp
+    assert len(weather_forecast.periods) == 48
+
+
+def test_forecasts_are_shared(history: History) -> None:
+    day = history.steps[0].timestamp.date()
+
+    assert history.price_forecast(day) is history.price_forecast(day)
+    assert history.weather_forecast(day + timedelta(days=2)) is history.weather_forecast(day + timedelta(days=2))
+
+
+def test_missing_day(history: History) -> None:
+    assert history.pv_forecast(date(2000, 1, 1)) == []
+    assert history.price_forecast(date(2000, 1, 1)) == []
+    assert history.weather_forecast(date(2000, 1, 1)) == []
+
+
+def test_initial_battery_soc_unknown(history_start: datetime) -> None:
+    steps = [
+        replace(step, battery_soc=None) for step in synthetic_history_steps(history_start, days=1, time_zone=TIME_ZONE)
+    ]
+
+    assert History(steps).initial_battery_soc() is None
@@ -0,0 +1,18 @@
+from decimal import Decimal
+
+from simulation.report import SimulationReport
+from units.money import Money
+
+
+def test_report() -> None:
+    report = SimulationReport()
+
+    report.add_step(grid_import=1.0, grid_export=0.0, baseline_net=-2.0, price_per_kwh=0.5)
+    report.add_step(grid_import=0.0, grid_export=3.0, baseline_net=1.0, price_per_kwh=0.8)
+    report.decisions["switch/turn_on switch.any"] += 1
+
+    assert report.steps == 2
+    assert report.revenue() == Money.pln(Decimal("1.9"))
+    assert report.savings() == Money.pln(Decimal("2.1"))
+    assert "Grid export: 3.00kWh" in str(report)
+    assert "  switch/turn_on switch.any: 1" in str(report)
@@ -0,0 +1,14 @@
+from simulation.history import History
+from simulation.shared_history import SharedHistory, attach_history
+from solar.solar_configuration import SolarConfiguration
+
+
+def test_attach_history(configuration: SolarConfiguration, history: History) -> None:
+    with SharedHistory(history) as shared_history:
+        attached = attach_history(shared_history.name, shared_history.length, configuration.time_zone)
+
+    first_day = history.steps[0].timestamp.date()
+    assert attached.steps == history.steps
+    assert attached.initial_battery_soc() == 50.0
+    assert attached.steps[1].battery_soc is None
+    assert attached.pv_forecast(first_day) == history.pv_forecast(first_day)
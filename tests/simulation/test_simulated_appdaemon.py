@@ -0,0 +1,108 @@
+import logging
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+from zoneinfo import ZoneInfo
+
+import pytest
+from simulation.simulated_appdaemon import SimulatedLogger, SimulatedService, SimulatedState, SimulationClock
+
+_NOW = datetime(2025, 6, 1, 12, 0, tzinfo=ZoneInfo("Europe/Warsaw"))
+
+
+@pytest.fixture
+def clock() -> SimulationClock:
+    return SimulationClock(_NOW)
+
+
+@pytest.fixture
+def simulated_state() -> SimulatedState:
+    return SimulatedState()
+
+
+@pytest.fixture
+def simulated_service(simulated_state: SimulatedState, clock: SimulationClock) -> SimulatedService:
+    return SimulatedService(simulated_state, clock, timer_durations={"timer.any": timedelta(hours=1)})
+
+
+def test_clock_advance(clock: SimulationClock) -> None:
+    clock.advance_to(_NOW + timedelta(minutes=15))
+
+    assert clock.now == _NOW + timedelta(minutes=15)
+
+    with pytest.raises(ValueError, match="can't go back"):
+        clock.advance_to(_NOW)
+
+
+def test_logger_keeps_warnings_only() -> None:
+    logger = SimulatedLogger()
+
+    logger.log("info %s", 1)
+    logger.log("warning %s", 2, level=logging.WARNING)
+    logger.log("error", level="ERROR")
+
+    assert logger.messages == ["warning 2", "error"]
+
+
+def test_state(simulated_state: SimulatedState) -> None:
+    attribute_value = [1, 2]
+
+    simulated_state.set_state("sensor.any", "on")
+    simulated_state.set_state("sensor.any", "on")
+    simulated_state.set_attribute("sensor.any", "forecast", attribute_value)
+    simulated_state.set_attribute("sensor.any", "forecast", attribute_value)
+
+    assert simulated_state.get_state("sensor.any") == "on"
+    assert simulated_state.get_state("sensor.any", "forecast") is attribute_value
+    assert simulated_state.get_state("sensor.unknown") is None
+    assert simulated_state.get_state("sensor.unknown", "forecast") is None
+    assert simulated_state.version == 2
+
+
+@pytest.mark.parametrize(
+    ("service", "data", "expected_state"),
+    [
+        ("number/set_value", {"value": 40.0}, 40.0),
+        ("text/set_value", {"value": "19:00-20:00"}, "19:00-20:00"),
+        ("select/select_option", {"option": "Self-Use"}, "Self-Use"),
+        ("switch/turn_on", {}, "on"),
+        ("input_boolean/turn_off", {}, "off"),
+    ],
+)
+def test_service(
+    simulated_service: SimulatedService,
+    simulated_state: SimulatedState,
+    service: str,
+    data: dict,
+    expected_state: object,
+) -> None:
+    callback = Mock()
+
+    simulated_service.call_service(service, entity_id="any.entity", callback=callback, **data)
+
+    assert simulated_state.get_state("any.entity") == expected_state
+    assert simulated_service.decisions == {f"{service} any.entity": 1}
+    callback.assert_called_once_with({"success": True})
+
+
+def test_service_unsupported(simulated_service: SimulatedService) -> None:
+    with pytest.raises(ValueError, match="Unsupported service"):
+        simulated_service.call_service("light/turn_on", entity_id="light.any")
+
+
+def test_timer(simulated_service: SimulatedService, simulated_state: SimulatedState, clock: SimulationClock) -> None:
+    simulated_service.call_service("timer/start", entity_id="timer.any")
+    simulated_service.expire_timers()
+
+    assert simulated_state.get_state("timer.any") == "active"
+
+    clock.advance_to(_NOW + timedelta(hours=1))
+    simulated_service.expire_timers()
+
+    assert simulated_state.get_state("timer.any") == "idle"
+
+
+def test_timer_cancel(simulated_service: SimulatedService, simulated_state: SimulatedState) -> None:
+    simulated_service.call_service("timer/start", entity_id="timer.any")
+    simulated_service.call_service("timer/cancel", entity_id="timer.any")
+
+    assert simulated_state.get_state("timer.any") == "idle"
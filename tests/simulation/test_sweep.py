@@ -0,0 +1,105 @@
+from datetime import datetime, time
+from decimal import Decimal
+
+import pytest
+from simulation.history import History
+from simulation.shared_history import SharedHistory
+from simulation.sweep import (
+    SweepResult,
+    _initialize_worker,
+    _simulate,
+    grid_search,
+    parse_parameter,
+    random_search,
+    run_sweep,
+)
+from simulation.synthetic import synthetic_history_steps
+from solar.solar_configuration import SolarConfiguration
+from units.battery_current import BatteryCurrent
+from units.battery_soc import BatterySoc
+from units.battery_voltage import BatteryVoltage
+from units.celsius import Celsius
+from units.energy_kwh import EnergyKwh
+from units.energy_price import EnergyPrice
+from units.money import Money
+
+
+def test_grid_search() -> None:
+    candidates = grid_search({"heating_h": [0.1, 0.2], "heating_cop_at_7c": [3.0, 4.0]})
+
+    assert candidates == [
+        {"heating_h": 0.1, "heating_cop_at_7c": 3.0},
+        {"heating_h": 0.1, "heating_cop_at_7c": 4.0},
+        {"heating_h": 0.2, "heating_cop_at_7c": 3.0},
+        {"heating_h": 0.2, "heating_cop_at_7c": 4.0},
+    ]
+
+
+def test_random_search() -> None:
+    space = {"heating_h": [0.1, 0.2, 0.3], "heating_cop_at_7c": [3.0, 4.0]}
+
+    candidates = random_search(space, count=5, seed=42)
+
+    assert len(candidates) == 5
+    assert candidates == random_search(space, count=5, seed=42)
+    assert all(candidate["heating_h"] in space["heating_h"] for candidate in candidates)
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        (
+            "battery_discharge_evening_margin=500,750",
+            (
+                "battery_discharge_evening_margin",
+                [EnergyPrice.per_mwh(Money.pln(Decimal(500))), EnergyPrice.per_mwh(Money.pln(Decimal(750)))],
+            ),
+        ),
+        ("battery_reserve_soc_margin=0, 10", ("battery_reserve_soc_margin", [BatterySoc(0.0), BatterySoc(10.0)])),
+        ("battery_capacity=10", ("battery_capacity", [EnergyKwh(10.0)])),
+        ("battery_voltage=48", ("battery_voltage", [BatteryVoltage(48.0)])),
+        ("battery_maximum_current=100", ("battery_maximum_current", [BatteryCurrent(100.0)])),
+        ("temp_in=21.5", ("temp_in", [Celsius(21.5)])),
+        ("heating_h=0.15", ("heating_h", [0.15])),
+        ("battery_discharge_max_slots=1,2", ("battery_discharge_max_slots", [1, 2])),
+        ("night_low_tariff_time_start=22:05", ("night_low_tariff_time_start", [time(22, 5)])),
+    ],
+)
+def test_parse_parameter(configuration: SolarConfiguration, text: str, expected: tuple[str, list[object]]) -> None:
+    assert parse_parameter(configuration, text) == expected
+
+
+@pytest.mark.parametrize("text", ["heating_h", "heating_h=", "unknown=1.0", "time_zone=UTC"])
+def test_parse_parameter_invalid(configuration: SolarConfiguration, text: str) -> None:
+    with pytest.raises(ValueError):
+        parse_parameter(configuration, text)
+
+
+def test_simulate(configuration: SolarConfiguration, history: History) -> None:
+    with SharedHistory(history) as shared_history:
+        _initialize_worker(configuration, shared_history.name, shared_history.length)
+
+    result = _simulate({"battery_reserve_soc_margin": BatterySoc(10.0)})
+
+    assert result.parameters == {"battery_reserve_soc_margin": BatterySoc(10.0)}
+    assert result.savings.value > 0
+    assert str(result).endswith("parameters: battery_reserve_soc_margin=10.00%")
+
+
+def test_run_sweep(configuration: SolarConfiguration, history_start: datetime) -> None:
+    history = History(synthetic_history_steps(history_start, days=1, time_zone=configuration.time_zone))
+    candidates = grid_search({"battery_reserve_soc_margin": [BatterySoc(0.0), BatterySoc(40.0)]})
+
+    results = run_sweep(configuration, history, candidates, max_workers=1)
+
+    assert [type(result) for result in results] == [SweepResult, SweepResult]
+    assert results[0].revenue.value >= results[1].revenue.value
+    assert {result.parameters["battery_reserve_soc_margin"] for result in results} == {
+        BatterySoc(0.0),
+        BatterySoc(40.0),
+    }
+
+
+def test_run_sweep_unknown_parameter(configuration: SolarConfiguration, history: History) -> None:
+    with pytest.raises(ValueError, match="unknown"):
+        run_sweep(configuration, history, [{"unknown": 1.0}])
@@ -67,6 +67,7 @@ def configuration() -> SolarConfiguration:
         battery_discharge_evening_margin=EnergyPrice.per_mwh(Money.eur(Decimal(0))),
         battery_discharge_morning_margin=EnergyPrice.per_mwh(Money.eur(Decimal(0))),
         battery_export_threshold_energy=ENERGY_KWH_ZERO,
+        battery_discharge_max_slots=1,
         night_low_tariff_time_start=time.fromisoformat("00:00:00"),
         night_low_tariff_time_end=time.fromisoformat("00:00:00"),
         day_low_tariff_time_start=time.fromisoformat("00:00:00"),
@@ -1,12 +1,11 @@
 from dataclasses import replace
-from datetime import datetime, time
+from datetime import datetime, time, timedelta
 from decimal import Decimal
 from unittest.mock import Mock, call
 
 import pytest
 from solar.battery_discharge_slot import BatteryDischargeSlot
 from solar.battery_discharge_slot_estimator import BatteryDischargeSlotEstimator
-from solar.price_forecast import HourlyPrice
 from solar.solar_configuration import SolarConfiguration
 from solar.solar_state import SolarState
 from units.battery_current import BatteryCurrent
@@ -14,6 +13,8 @@ from units.battery_soc import BatterySoc
 from units.battery_voltage import BatteryVoltage
 from units.energy_kwh import EnergyKwh
 from units.energy_price import EnergyPrice
+from units.fifteen_minute_period import FifteenMinutePeriod
+from units.fifteen_minute_price import FifteenMinutePrice
 from units.hourly_energy import HourlyConsumptionEnergy, HourlyProductionEnergy
 from units.hourly_period import HourlyPeriod
 from units.money import Money
@@ -87,18 +88,13 @@ def test_estimate_battery_discharge_at_4_pm(
         [HourlyConsumptionEnergy(solar_period, energy=EnergyKwh(1.0))],
     ]
 
-    hourly_price_1 = HourlyPrice(
-        period=HourlyPeriod.parse("2025-10-10T19:00:00+00:00"),
-        price=EnergyPrice.per_mwh(Money.pln(Decimal(1250))),
-    )
-    hourly_price_2 = HourlyPrice(
-        period=HourlyPeriod.parse("2025-10-10T20:00:00+00:00"),
-        price=EnergyPrice.per_mwh(Money.pln(Decimal(1600))),
-    )
-    mock_price_forecast.hourly.return_value = [hourly_price_1, hourly_price_2]
+    mock_price_forecast.fifteen_minute.return_value = [
+        *_fifteen_minute_prices("2025-10-10T19:00:00+00:00", 1250),
+        *_fifteen_minute_prices("2025-10-10T20:00:00+00:00", 1600),
+    ]
     mock_price_forecast.average_price.return_value = EnergyPrice.per_mwh(Money.pln(Decimal(500)))
 
-    battery_discharge_slot = battery_discharge_slot_estimator.estimate_battery_discharge_at_4_pm(state, this_day)
+    battery_discharge_slots = battery_discharge_slot_estimator.estimate_battery_discharge_at_4_pm(state, this_day)
 
     assert mock_production_forecast.hourly.call_args_list == [
         call(this_day_4_pm, high_tariff_hours),
@@ -108,14 +104,115 @@ def test_estimate_battery_discharge_at_4_pm(
         call(this_day_4_pm, high_tariff_hours),
         call(tomorrow_7_am, daytime_hours),
     ]
-    mock_price_forecast.hourly.assert_called_once_with(this_day_4_pm, this_day_10_pm)
+    mock_price_forecast.fifteen_minute.assert_called_once_with(this_day_4_pm, this_day_10_pm)
     mock_price_forecast.average_price.assert_called_once_with(tomorrow_10_30_am, midday_hours)
 
-    assert battery_discharge_slot == BatteryDischargeSlot(
-        start_time=expected_start_time,
-        end_time=expected_end_time,
-        current=battery_discharge_slot_estimator.configuration.battery_maximum_current,
+    assert battery_discharge_slots == [
+        BatteryDischargeSlot(
+            start_time=expected_start_time,
+            end_time=expected_end_time,
+            current=battery_discharge_slot_estimator.configuration.battery_maximum_current,
+        )
+    ]
+
+
+def test_estimate_battery_discharge_at_4_pm_captures_intra_hour_spike(
+    battery_discharge_slot_estimator: BatteryDischargeSlotEstimator,
+    state: SolarState,
+    mock_production_forecast: Mock,
+    mock_consumption_forecast: Mock,
+    mock_price_forecast: Mock,
+) -> None:
+    state = replace(state, battery_soc=BatterySoc(60.0))
+
+    this_day = datetime.fromisoformat("2025-10-10T15:30:00+00:00")
+    discharge_period = HourlyPeriod.parse("2025-10-10T16:00:00+00:00")
+    solar_period = HourlyPeriod.parse("2025-10-11T07:00:00+00:00")
+
+    mock_production_forecast.hourly.side_effect = [
+        [HourlyProductionEnergy(discharge_period, energy=EnergyKwh(2.0))],
+        [HourlyProductionEnergy(solar_period, energy=EnergyKwh(20.0))],
+    ]
+
+    mock_consumption_forecast.hourly.side_effect = [
+        [HourlyConsumptionEnergy(discharge_period, energy=EnergyKwh(4.0))],
+        [HourlyConsumptionEnergy(solar_period, energy=EnergyKwh(1.0))],
+    ]
+
+    spike_hour = _fifteen_minute_prices("2025-10-10T19:00:00+00:00", 1250)
+    spike_hour[2] = replace(spike_hour[2], price=EnergyPrice.per_mwh(Money.pln(Decimal(3000))))
+    mock_price_forecast.fifteen_minute.return_value = [
+        *spike_hour,
+        *_fifteen_minute_prices("2025-10-10T20:00:00+00:00", 1600),
+    ]
+    mock_price_forecast.average_price.return_value = EnergyPrice.per_mwh(Money.pln(Decimal(500)))
+
+    battery_discharge_slots = battery_discharge_slot_estimator.estimate_battery_discharge_at_4_pm(state, this_day)
+
+    assert battery_discharge_slots == [
+        BatteryDischargeSlot(
+            start_time=time(19, 30),
+            end_time=time(20, 6),
+            current=battery_discharge_slot_estimator.configuration.battery_maximum_current,
+        )
+    ]
+
+
+def test_estimate_battery_discharge_at_4_pm_splits_surplus_between_price_peaks(
+    battery_discharge_slot_estimator: BatteryDischargeSlotEstimator,
+    mock_appdaemon_logger: Mock,
+    state: SolarState,
+    mock_production_forecast: Mock,
+    mock_consumption_forecast: Mock,
+    mock_price_forecast: Mock,
+) -> None:
+    battery_discharge_slot_estimator.configuration = replace(
+        battery_discharge_slot_estimator.configuration, battery_discharge_max_slots=2
     )
+    state = replace(state, battery_soc=BatterySoc(100.0))
+
+    this_day = datetime.fromisoformat("2025-10-10T15:30:00+00:00")
+    discharge_period = HourlyPeriod.parse("2025-10-10T16:00:00+00:00")
+    solar_period = HourlyPeriod.parse("2025-10-11T07:00:00+00:00")
+
+    mock_production_forecast.hourly.side_effect = [
+        [HourlyProductionEnergy(discharge_period, energy=EnergyKwh(2.0))],
+        [HourlyProductionEnergy(solar_period, energy=EnergyKwh(20.0))],
+    ]
+
+    mock_consumption_forecast.hourly.side_effect = [
+        [HourlyConsumptionEnergy(discharge_period, energy=EnergyKwh(4.0))],
+        [HourlyConsumptionEnergy(solar_period, energy=EnergyKwh(1.0))],
+    ]
+
+    evening_peak_hour = _fifteen_minute_prices("2025-10-10T20:00:00+00:00", 1600)
+    evening_peak_hour[3] = replace(evening_peak_hour[3], price=EnergyPrice.per_mwh(Money.pln(Decimal(1800))))
+    mock_price_forecast.fifteen_minute.return_value = [
+        *_fifteen_minute_prices("2025-10-10T17:00:00+00:00", 1700),
+        *_fifteen_minute_prices("2025-10-10T18:00:00+00:00", 100),
+        *_fifteen_minute_prices("2025-10-10T19:00:00+00:00", 100),
+        *evening_peak_hour,
+    ]
+    mock_price_forecast.average_price.return_value = EnergyPrice.per_mwh(Money.pln(Decimal(500)))
+
+    battery_discharge_slots = battery_discharge_slot_estimator.estimate_battery_discharge_at_4_pm(state, this_day)
+
+    # 93 minutes of surplus, the whole first peak and the most expensive end of the second one
+    assert battery_discharge_slots == [
+        BatteryDischargeSlot(
+            start_time=time(17, 0),
+            end_time=time(18, 0),
+            current=battery_discharge_slot_estimator.configuration.battery_maximum_current,
+        ),
+        BatteryDischargeSlot(
+            start_time=time(20, 27),
+            end_time=time(21, 0),
+            current=battery_discharge_slot_estimator.configuration.battery_maximum_current,
+        ),
+    ]
+    # the slots are joined only when the message is formatted
+    logged_slots = mock_appdaemon_logger.log.call_args.args[3]
+    assert str(logged_slots) == ", ".join(str(discharge_slot) for discharge_slot in battery_discharge_slots)
 
 
 def test_estimate_battery_discharge_at_4_pm_when_solar_cannot_replenish(
@@ -152,7 +249,7 @@ def test_estimate_battery_discharge_at_4_pm_when_solar_cannot_replenish(
 
     mock_price_forecast.average_price.return_value = EnergyPrice.per_mwh(Money.pln(Decimal(500)))
 
-    battery_discharge_slot = battery_discharge_slot_estimator.estimate_battery_discharge_at_4_pm(state, this_day)
+    battery_discharge_slots = battery_discharge_slot_estimator.estimate_battery_discharge_at_4_pm(state, this_day)
 
     assert mock_production_forecast.hourly.call_args_list == [
         call(this_day_4_pm, high_tariff_hours),
@@ -162,10 +259,10 @@ def test_estimate_battery_discharge_at_4_pm_when_solar_cannot_replenish(
         call(this_day_4_pm, high_tariff_hours),
         call(tomorrow_7_am, daytime_hours),
     ]
-    mock_price_forecast.hourly.assert_not_called()
+    mock_price_forecast.fifteen_minute.assert_not_called()
     mock_price_forecast.average_price.assert_called_once_with(tomorrow_10_30_am, midday_hours)
 
-    assert battery_discharge_slot is None
+    assert battery_discharge_slots == []
 
 
 def test_estimate_battery_discharge_at_4_pm_when_surplus_energy_below_threshold(
@@ -201,7 +298,7 @@ def test_estimate_battery_discharge_at_4_pm_when_surplus_energy_below_threshold(
 
     mock_price_forecast.average_price.return_value = EnergyPrice.per_mwh(Money.pln(Decimal(500)))
 
-    battery_discharge_slot = battery_discharge_slot_estimator.estimate_battery_discharge_at_4_pm(state, this_day)
+    battery_discharge_slots = battery_discharge_slot_estimator.estimate_battery_discharge_at_4_pm(state, this_day)
 
     assert mock_production_forecast.hourly.call_args_list == [
         call(this_day_4_pm, high_tariff_hours),
@@ -211,10 +308,10 @@ def test_estimate_battery_discharge_at_4_pm_when_surplus_energy_below_threshold(
         call(this_day_4_pm, high_tariff_hours),
         call(tomorrow_7_am, daytime_hours),
     ]
-    mock_price_forecast.hourly.assert_not_called()
+    mock_price_forecast.fifteen_minute.assert_not_called()
     mock_price_forecast.average_price.assert_called_once_with(tomorrow_10_30_am, midday_hours)
 
-    assert battery_discharge_slot is None
+    assert battery_discharge_slots == []
 
 
 @pytest.mark.parametrize(
@@ -259,22 +356,14 @@ def test_estimate_battery_discharge_at_6_am(
         [HourlyConsumptionEnergy(discharge_period, energy=EnergyKwh(1.0))],
     ]
 
-    hourly_price_0 = HourlyPrice(
-        period=HourlyPeriod.parse("2025-10-10T06:00:00+00:00"),
-        price=EnergyPrice.per_mwh(Money.pln(Decimal(800))),
-    )
-    hourly_price_1 = HourlyPrice(
-        period=HourlyPeriod.parse("2025-10-10T07:00:00+00:00"),
-        price=EnergyPrice.per_mwh(Money.pln(Decimal(950))),
-    )
-    hourly_price_2 = HourlyPrice(
-        period=HourlyPeriod.parse("2025-10-10T08:00:00+00:00"),
-        price=EnergyPrice.per_mwh(Money.pln(Decimal(750))),
-    )
-    mock_price_forecast.hourly.return_value = [hourly_price_0, hourly_price_1, hourly_price_2]
+    mock_price_forecast.fifteen_minute.return_value = [
+        *_fifteen_minute_prices("2025-10-10T06:00:00+00:00", 800),
+        *_fifteen_minute_prices("2025-10-10T07:00:00+00:00", 950),
+        *_fifteen_minute_prices("2025-10-10T08:00:00+00:00", 750),
+    ]
     mock_price_forecast.average_price.return_value = EnergyPrice.per_mwh(Money.pln(Decimal(100)))
 
-    battery_discharge_slot = battery_discharge_slot_estimator.estimate_battery_discharge_at_6_am(state, this_day)
+    battery_discharge_slots = battery_discharge_slot_estimator.estimate_battery_discharge_at_6_am(state, this_day)
 
     assert mock_production_forecast.hourly.call_args_list == [
         call(this_day_7_am, high_tariff_hours),
@@ -284,14 +373,16 @@ def test_estimate_battery_discharge_at_6_am(
         call(this_day_7_am, high_tariff_hours),
         call(this_day_7_am, daytime_hours),
     ]
-    mock_price_forecast.hourly.assert_called_once_with(this_day_6_am, this_day_9_am)
+    mock_price_forecast.fifteen_minute.assert_called_once_with(this_day_6_am, this_day_9_am)
     mock_price_forecast.average_price.assert_called_once_with(today_10_30_am, midday_hours)
 
-    assert battery_discharge_slot == BatteryDischargeSlot(
-        start_time=expected_start_time,
-        end_time=expected_end_time,
-        current=battery_discharge_slot_estimator.configuration.battery_maximum_current,
-    )
+    assert battery_discharge_slots == [
+        BatteryDischargeSlot(
+            start_time=expected_start_time,
+            end_time=expected_end_time,
+            current=battery_discharge_slot_estimator.configuration.battery_maximum_current,
+        )
+    ]
 
 
 def test_estimate_battery_discharge_at_6_am_when_solar_cannot_replenish(
@@ -325,7 +416,7 @@ def test_estimate_battery_discharge_at_6_am_when_solar_cannot_replenish(
 
     mock_price_forecast.average_price.return_value = EnergyPrice.per_mwh(Money.pln(Decimal(800)))
 
-    battery_discharge_slot = battery_discharge_slot_estimator.estimate_battery_discharge_at_6_am(state, this_day)
+    battery_discharge_slots = battery_discharge_slot_estimator.estimate_battery_discharge_at_6_am(state, this_day)
 
     assert mock_production_forecast.hourly.call_args_list == [
         call(this_day_7_am, high_tariff_hours),
@@ -335,10 +426,10 @@ def test_estimate_battery_discharge_at_6_am_when_solar_cannot_replenish(
         call(this_day_7_am, high_tariff_hours),
         call(this_day_7_am, daytime_hours),
     ]
-    mock_price_forecast.hourly.assert_not_called()
+    mock_price_forecast.fifteen_minute.assert_not_called()
     mock_price_forecast.average_price.assert_called_once_with(today_10_30_am, midday_hours)
 
-    assert battery_discharge_slot is None
+    assert battery_discharge_slots == []
 
 
 def test_estimate_battery_discharge_at_6_am_when_surplus_energy_below_threshold(
@@ -372,7 +463,7 @@ def test_estimate_battery_discharge_at_6_am_when_surplus_energy_below_threshold(
 
     mock_price_forecast.average_price.return_value = EnergyPrice.per_mwh(Money.pln(Decimal(100)))
 
-    battery_discharge_slot = battery_discharge_slot_estimator.estimate_battery_discharge_at_6_am(state, this_day)
+    battery_discharge_slots = battery_discharge_slot_estimator.estimate_battery_discharge_at_6_am(state, this_day)
 
     assert mock_production_forecast.hourly.call_args_list == [
         call(this_day_7_am, high_tariff_hours),
@@ -382,7 +473,18 @@ def test_estimate_battery_discharge_at_6_am_when_surplus_energy_below_threshold(
         call(this_day_7_am, high_tariff_hours),
         call(this_day_7_am, daytime_hours),
     ]
-    mock_price_forecast.hourly.assert_not_called()
+    mock_price_forecast.fifteen_minute.assert_not_called()
     mock_price_forecast.average_price.assert_called_once_with(today_10_30_am, midday_hours)
 
-    assert battery_discharge_slot is None
+    assert battery_discharge_slots == []
+
+
+def _fifteen_minute_prices(hour_start: str, price: int) -> list[FifteenMinutePrice]:
+    start = datetime.fromisoformat(hour_start)
+    return [
+        FifteenMinutePrice(
+            period=FifteenMinutePeriod(start + timedelta(minutes=15 * quarter)),
+            price=EnergyPrice.per_mwh(Money.pln(Decimal(price))),
+        )
+        for quarter in range(4)
+    ]
@@ -1,13 +1,27 @@
-from unittest.mock import Mock
+import copy
+import logging
+import sqlite3
+from dataclasses import replace
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import ANY, Mock
 
 import pytest
 from solar.consumption_forecast import ConsumptionForecastComposite
-from solar.forecast_factory import DefaultForecastFactory
+from solar.forecast_factory import (
+    CachingForecastFactory,
+    DefaultForecastFactory,
+    ForecastDigest,
+    PersistentForecastFactory,
+    RecordingForecastFactory,
+)
 from solar.price_forecast import PriceForecast
 from solar.production_forecast import ProductionForecastComposite
 from solar.solar_configuration import SolarConfiguration
 from solar.solar_state import SolarState
 from solar.weather_forecast import WeatherForecast
+from utils.recorder import Recorder
+from utils.sqlite_snapshot_store import SqliteSnapshotStore
 
 
 @pytest.fixture
@@ -51,3 +65,333 @@ def test_create_weather_forecast(
     weather_forecast = forecast_factory.create_weather_forecast(state)
 
     assert isinstance(weather_forecast, WeatherForecast)
+
+
+def test_create_weather_forecast_logs_rejected(
+    forecast_factory: DefaultForecastFactory,
+    state: SolarState,
+    mock_appdaemon_logger: Mock,
+) -> None:
+    state = replace(state, weather_forecast=[{"datetime": "2025-10-03T15:00:00+02:00"}])
+
+    weather_forecast = forecast_factory.create_weather_forecast(state)
+
+    assert weather_forecast.periods == []
+    mock_appdaemon_logger.log.assert_called_once_with(
+        "Rejected %s forecast records, %s", "weather", ANY, level=logging.WARNING
+    )
+    assert str(mock_appdaemon_logger.log.call_args.args[2]) == "accepted: 0, rejected: 1 (missing temperature: 1)"
+
+
+def test_create_weather_forecast_stops_at_horizon(
+    forecast_factory: DefaultForecastFactory,
+    state: SolarState,
+    mock_appdaemon_logger: Mock,
+) -> None:
+    start = datetime.fromisoformat("2025-10-03T15:00:00+02:00")
+    raw_forecast: list = [
+        {"datetime": (start + timedelta(hours=hour)).isoformat(), "temperature": 15.0, "humidity": 60.0}
+        for hour in range(72)
+    ]
+    # never reached, the parsing stops at the first record beyond the horizon
+    raw_forecast.insert(49, {"datetime": (start + timedelta(hours=49)).isoformat()})
+    state = replace(state, weather_forecast=raw_forecast)
+
+    weather_forecast = forecast_factory.create_weather_forecast(state)
+
+    assert len(weather_forecast.periods) == 48
+    assert weather_forecast.periods[-1].period.start == start + timedelta(hours=47)
+    mock_appdaemon_logger.log.assert_not_called()
+
+
+@pytest.fixture
+def caching_forecast_factory(mock_appdaemon_logger: Mock, configuration: SolarConfiguration) -> CachingForecastFactory:
+    return CachingForecastFactory(appdaemon_logger=mock_appdaemon_logger, configuration=configuration)
+
+
+def test_caching_production_forecast(caching_forecast_factory: CachingForecastFactory, state: SolarState) -> None:
+    state = replace(state, pv_forecast_tomorrow=[{"period_start": "2025-10-04T00:00:00+02:00", "pv_estimate": 0.5}])
+
+    first = caching_forecast_factory.create_production_forecast(state)
+    second = caching_forecast_factory.create_production_forecast(state)
+
+    assert isinstance(first, ProductionForecastComposite)
+    assert isinstance(second, ProductionForecastComposite)
+    assert first.components == second.components
+    assert caching_forecast_factory.production_cache.misses == 2
+    assert caching_forecast_factory.production_cache.hits == 2
+
+
+def test_caching_price_forecast(caching_forecast_factory: CachingForecastFactory, state: SolarState) -> None:
+    first = caching_forecast_factory.create_price_forecast(state)
+    second = caching_forecast_factory.create_price_forecast(state)
+
+    assert first is second
+
+
+def test_caching_weather_forecast(caching_forecast_factory: CachingForecastFactory, state: SolarState) -> None:
+    first = caching_forecast_factory.create_weather_forecast(state)
+    second = caching_forecast_factory.create_weather_forecast(state)
+
+    assert first is second
+
+
+def test_caching_consumption_forecast_reuses_weather(
+    caching_forecast_factory: CachingForecastFactory, state: SolarState
+) -> None:
+    caching_forecast_factory.create_consumption_forecast(state)
+    caching_forecast_factory.create_consumption_forecast(state)
+
+    assert caching_forecast_factory.weather_cache.misses == 1
+    assert caching_forecast_factory.weather_cache.hits == 1
+
+
+def test_caching_reparses_changed_content(caching_forecast_factory: CachingForecastFactory, state: SolarState) -> None:
+    first = caching_forecast_factory.create_price_forecast(state)
+    changed_state = replace(state, price_forecast_today=[{"dtime": "2025-10-03 15:15:00", "rce_pln": 450.0}])
+    second = caching_forecast_factory.create_price_forecast(changed_state)
+
+    assert first is not second
+    assert caching_forecast_factory.price_cache.misses == 2
+
+
+def test_caching_keeps_content_after_entity_updates(
+    caching_forecast_factory: CachingForecastFactory, state: SolarState
+) -> None:
+    first = caching_forecast_factory.create_price_forecast(state)
+    # Home Assistant updates the entity, e.g. its last_updated, without changing the forecast attributes
+    updated_state = replace(state, price_forecast_today=copy.deepcopy(state.price_forecast_today))
+    second = caching_forecast_factory.create_price_forecast(updated_state)
+
+    assert first is second
+
+
+def test_caching_reparses_list_changed_in_place(
+    caching_forecast_factory: CachingForecastFactory, state: SolarState
+) -> None:
+    raw_forecast = [{"dtime": "2025-10-03 15:15:00", "rce_pln": 450.0}]
+    state = replace(state, price_forecast_today=raw_forecast)
+    first = caching_forecast_factory.create_price_forecast(state)
+
+    raw_forecast[0] = {"dtime": "2025-10-03 15:15:00", "rce_pln": 500.0}
+    second = caching_forecast_factory.create_price_forecast(state)
+
+    assert first is not second
+    assert second.periods != first.periods
+
+
+@pytest.fixture
+def snapshot_store(tmp_path: Path) -> SqliteSnapshotStore:
+    return SqliteSnapshotStore(tmp_path / "snapshots.db")
+
+
+# newest period of the fresh forecasts
+_DATA_TIMESTAMP = datetime.fromisoformat("2025-10-03T12:00:00+02:00").timestamp()
+
+
+def _persistent_forecast_factory(
+    mock_appdaemon_logger: Mock,
+    configuration: SolarConfiguration,
+    snapshot_store: SqliteSnapshotStore,
+    now: float = _DATA_TIMESTAMP,
+) -> PersistentForecastFactory:
+    return PersistentForecastFactory(
+        appdaemon_logger=mock_appdaemon_logger,
+        configuration=configuration,
+        snapshot_store=snapshot_store,
+        max_age=timedelta(hours=1),
+        clock=lambda: now,
+    )
+
+
+@pytest.fixture
+def fresh_state(state: SolarState) -> SolarState:
+    return replace(
+        state,
+        pv_forecast_today=[{"period_start": "2025-10-03T12:00:00+02:00", "pv_estimate": 2.5}],
+        weather_forecast=[{"datetime": "2025-10-03T12:00:00+02:00", "temperature": 15.0, "humidity": 60.0}],
+        # RCE times are local, UTC in the tests
+        price_forecast_today=[{"dtime": "2025-10-03 10:15:00", "rce_pln": 450.0}],
+    )
+
+
+def test_persistent_restores_snapshots(
+    mock_appdaemon_logger: Mock,
+    configuration: SolarConfiguration,
+    snapshot_store: SqliteSnapshotStore,
+    state: SolarState,
+    fresh_state: SolarState,
+) -> None:
+    fresh = _persistent_forecast_factory(mock_appdaemon_logger, configuration, snapshot_store)
+    fresh_production = fresh.create_production_forecast(fresh_state)
+    fresh_weather = fresh.create_weather_forecast(fresh_state)
+    fresh_price = fresh.create_price_forecast(fresh_state)
+
+    restarted = _persistent_forecast_factory(
+        mock_appdaemon_logger, configuration, snapshot_store, now=_DATA_TIMESTAMP + 60
+    )
+    period_start = datetime.fromisoformat("2025-10-03T12:00:00+02:00")
+
+    assert restarted.create_production_forecast(state).hourly(period_start, 1) == fresh_production.hourly(
+        period_start, 1
+    )
+    assert restarted.create_weather_forecast(state).periods == fresh_weather.periods
+    assert restarted.create_price_forecast(state).periods == fresh_price.periods
+    assert restarted.create_price_forecast(state) is restarted.create_price_forecast(state)
+
+
+def test_persistent_parses_tomorrow_prices_without_today(
+    mock_appdaemon_logger: Mock,
+    configuration: SolarConfiguration,
+    snapshot_store: SqliteSnapshotStore,
+    state: SolarState,
+    fresh_state: SolarState,
+) -> None:
+    _persistent_forecast_factory(mock_appdaemon_logger, configuration, snapshot_store).create_price_forecast(
+        fresh_state
+    )
+    tomorrow_state = replace(
+        state,
+        price_forecast_today=None,
+        price_forecast_tomorrow=[{"dtime": "2025-10-04 10:15:00", "rce_pln": 300.0}],
+    )
+
+    restarted = _persistent_forecast_factory(
+        mock_appdaemon_logger, configuration, snapshot_store, now=_DATA_TIMESTAMP + 60
+    )
+    price_forecast = restarted.create_price_forecast(tomorrow_state)
+
+    assert [period.period.start for period in price_forecast.periods] == [
+        datetime.fromisoformat("2025-10-04T10:00:00+00:00")
+    ]
+
+
+def test_persistent_ignores_stale_snapshots(
+    mock_appdaemon_logger: Mock,
+    configuration: SolarConfiguration,
+    snapshot_store: SqliteSnapshotStore,
+    state: SolarState,
+    fresh_state: SolarState,
+) -> None:
+    _persistent_forecast_factory(mock_appdaemon_logger, configuration, snapshot_store).create_price_forecast(
+        fresh_state
+    )
+
+    restarted = _persistent_forecast_factory(
+        mock_appdaemon_logger, configuration, snapshot_store, now=_DATA_TIMESTAMP + 5000
+    )
+
+    assert restarted.create_price_forecast(state).periods == []
+
+
+def test_persistent_ages_snapshots_by_data(
+    mock_appdaemon_logger: Mock,
+    configuration: SolarConfiguration,
+    snapshot_store: SqliteSnapshotStore,
+    state: SolarState,
+    fresh_state: SolarState,
+) -> None:
+    # Home Assistant kept serving the same forecast for hours before the restart
+    two_hours_later = _DATA_TIMESTAMP + 2 * 3600
+    _persistent_forecast_factory(
+        mock_appdaemon_logger, configuration, snapshot_store, now=two_hours_later
+    ).create_price_forecast(fresh_state)
+
+    restarted = _persistent_forecast_factory(mock_appdaemon_logger, configuration, snapshot_store, now=two_hours_later)
+
+    assert restarted.create_price_forecast(state).periods == []
+
+
+def test_persistent_expires_restored_snapshot(
+    mock_appdaemon_logger: Mock,
+    configuration: SolarConfiguration,
+    snapshot_store: SqliteSnapshotStore,
+    state: SolarState,
+    fresh_state: SolarState,
+) -> None:
+    _persistent_forecast_factory(mock_appdaemon_logger, configuration, snapshot_store).create_price_forecast(
+        fresh_state
+    )
+    now = _DATA_TIMESTAMP + 1000
+    restarted = PersistentForecastFactory(
+        mock_appdaemon_logger, configuration, snapshot_store, timedelta(hours=1), clock=lambda: now
+    )
+
+    assert restarted.create_price_forecast(state).periods != []
+    now = _DATA_TIMESTAMP + 5000
+    assert restarted.create_price_forecast(state).periods == []
+
+
+def test_persistent_saves_once_per_change(
+    mock_appdaemon_logger: Mock, configuration: SolarConfiguration, fresh_state: SolarState
+) -> None:
+    snapshot_store = Mock(spec=SqliteSnapshotStore)
+    persistent_forecast_factory = _persistent_forecast_factory(mock_appdaemon_logger, configuration, snapshot_store)
+
+    persistent_forecast_factory.create_price_forecast(fresh_state)
+    persistent_forecast_factory.create_price_forecast(fresh_state)
+    changed_state = replace(fresh_state, price_forecast_today=[{"dtime": "2025-10-03 10:15:00", "rce_pln": 500.0}])
+    persistent_forecast_factory.create_price_forecast(changed_state)
+
+    assert snapshot_store.save.call_count == 2
+
+
+def test_persistent_logs_store_errors(
+    mock_appdaemon_logger: Mock, configuration: SolarConfiguration, state: SolarState, fresh_state: SolarState
+) -> None:
+    snapshot_store = Mock(spec=SqliteSnapshotStore)
+    snapshot_store.save.side_effect = sqlite3.OperationalError("disk I/O error")
+    snapshot_store.load.side_effect = sqlite3.OperationalError("disk I/O error")
+    persistent_forecast_factory = _persistent_forecast_factory(mock_appdaemon_logger, configuration, snapshot_store)
+
+    assert persistent_forecast_factory.create_price_forecast(fresh_state).periods != []
+    assert persistent_forecast_factory.create_weather_forecast(state).periods == []
+
+    mock_appdaemon_logger.log.assert_any_call(
+        "Can't save %s forecast snapshot: %s", "price", ANY, level=logging.WARNING
+    )
+    mock_appdaemon_logger.log.assert_any_call(
+        "Can't load %s forecast snapshot: %s", "weather", ANY, level=logging.WARNING
+    )
+
+
+def test_recording_records_digest_of_new_forecasts(
+    caching_forecast_factory: CachingForecastFactory, fresh_state: SolarState
+) -> None:
+    recorder = Mock(spec=Recorder)
+    recording_forecast_factory = RecordingForecastFactory(caching_forecast_factory, recorder)
+
+    first = recording_forecast_factory.create_price_forecast(fresh_state)
+    recording_forecast_factory.create_price_forecast(fresh_state)
+    changed_state = replace(fresh_state, price_forecast_today=[{"dtime": "2025-10-03 15:15:00", "rce_pln": 450.0}])
+    second = recording_forecast_factory.create_price_forecast(changed_state)
+
+    assert [recorded.args[0] for recorded in recorder.record.call_args_list] == ["forecast", "forecast"]
+    first_digest, second_digest = (recorded.args[1] for recorded in recorder.record.call_args_list)
+    assert first_digest == ForecastDigest(
+        name="price",
+        periods=1,
+        first_period_start=first.periods[0].period.start,
+        last_period_start=first.periods[0].period.start,
+        checksum=ANY,
+    )
+    assert second_digest.first_period_start == second.periods[0].period.start
+    assert first_digest.checksum != second_digest.checksum
+
+
+def test_recording_records_production_components(
+    caching_forecast_factory: CachingForecastFactory, state: SolarState
+) -> None:
+    recorder = Mock(spec=Recorder)
+    recording_forecast_factory = RecordingForecastFactory(caching_forecast_factory, recorder)
+
+    recording_forecast_factory.create_production_forecast(state)
+    recording_forecast_factory.create_production_forecast(state)
+    recording_forecast_factory.create_weather_forecast(state)
+    recording_forecast_factory.create_consumption_forecast(state)
+
+    assert [recorded.args[1].name for recorded in recorder.record.call_args_list] == [
+        "production_today",
+        "production_tomorrow",
+        "weather",
+    ]
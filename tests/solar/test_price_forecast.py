@@ -159,6 +159,28 @@ def test_average_price(forecast_price: PriceForecast) -> None:
     assert average == EnergyPrice.per_mwh(Money.pln(Decimal("537.5")))
 
 
+def test_fifteen_minute(forecast_price: PriceForecast) -> None:
+    selected_periods = forecast_price.fifteen_minute(
+        period_start=datetime.fromisoformat("2025-10-03T16:30:00+00:00"),
+        period_end=datetime.fromisoformat("2025-10-03T17:15:00+00:00"),
+    )
+
+    assert selected_periods == [
+        FifteenMinutePrice(
+            period=FifteenMinutePeriod.parse("2025-10-03T16:30:00+00:00"),
+            price=EnergyPrice.per_mwh(Money.pln(Decimal(450))),
+        ),
+        FifteenMinutePrice(
+            period=FifteenMinutePeriod.parse("2025-10-03T16:45:00+00:00"),
+            price=EnergyPrice.per_mwh(Money.pln(Decimal(480))),
+        ),
+        FifteenMinutePrice(
+            period=FifteenMinutePeriod.parse("2025-10-03T17:00:00+00:00"),
+            price=EnergyPrice.per_mwh(Money.pln(Decimal(520))),
+        ),
+    ]
+
+
 def test_hourly(forecast_price: PriceForecast) -> None:
     selected_hours = forecast_price.hourly(
         period_start=datetime.fromisoformat("2025-10-03T16:00:00+00:00"),
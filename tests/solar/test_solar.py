@@ -1,6 +1,6 @@
 from dataclasses import replace
 from datetime import datetime, time
-from unittest.mock import ANY, Mock
+from unittest.mock import ANY, Mock, call
 
 import pytest
 from entities.entities import (
@@ -13,6 +13,9 @@ from entities.entities import (
     SLOT1_DISCHARGE_CURRENT_ENTITY,
     SLOT1_DISCHARGE_ENABLED_ENTITY,
     SLOT1_DISCHARGE_TIME_ENTITY,
+    slot_discharge_current_entity,
+    slot_discharge_enabled_entity,
+    slot_discharge_time_entity,
 )
 from solar.battery_discharge_slot import BatteryDischargeSlot
 from solar.solar import Solar
@@ -78,6 +81,70 @@ def solar(
     )
 
 
+def test_control_scheduled(
+    solar: Solar,
+    state: SolarState,
+    mock_appdaemon_service: Mock,
+    mock_state_factory: Mock,
+    mock_battery_reserve_soc_estimator: Mock,
+    mock_battery_max_current_estimator: Mock,
+) -> None:
+    new_battery_reserve_soc = BatterySoc(40.0)
+    new_battery_max_charge_current = BatteryCurrent(50.0)
+    new_battery_max_discharge_current = BatteryCurrent(60.0)
+
+    mock_state_factory.create.return_value = state
+
+    mock_battery_reserve_soc_estimator.estimate_battery_reserve_soc.return_value = new_battery_reserve_soc
+    mock_battery_max_current_estimator.estimate_battery_max_charge_current.return_value = new_battery_max_charge_current
+    mock_battery_max_current_estimator.estimate_battery_max_discharge_current.return_value = (
+        new_battery_max_discharge_current
+    )
+
+    now = datetime.now()
+    solar.control_scheduled(now)
+
+    mock_state_factory.create.assert_called_once()
+    mock_battery_reserve_soc_estimator.estimate_battery_reserve_soc.assert_called_once_with(state, now)
+    mock_battery_max_current_estimator.estimate_battery_max_charge_current.assert_called_once_with(state, now)
+    mock_battery_max_current_estimator.estimate_battery_max_discharge_current.assert_called_once_with(state)
+
+    assert mock_appdaemon_service.call_service.call_args_list == [
+        call(
+            "number/set_value",
+            callback=ANY,
+            entity_id=BATTERY_RESERVE_SOC_ENTITY,
+            value=new_battery_reserve_soc.value,
+        ),
+        call(
+            "number/set_value",
+            callback=ANY,
+            entity_id=BATTERY_MAX_CHARGE_CURRENT_ENTITY,
+            value=new_battery_max_charge_current.value,
+        ),
+        call(
+            "number/set_value",
+            callback=ANY,
+            entity_id=BATTERY_MAX_DISCHARGE_CURRENT_ENTITY,
+            value=new_battery_max_discharge_current.value,
+        ),
+    ]
+
+
+def test_control_scheduled_unknown_state(
+    solar: Solar,
+    mock_appdaemon_service: Mock,
+    mock_state_factory: Mock,
+    mock_battery_reserve_soc_estimator: Mock,
+) -> None:
+    mock_state_factory.create.return_value = None
+
+    solar.control_scheduled(datetime.now())
+
+    mock_battery_reserve_soc_estimator.estimate_battery_reserve_soc.assert_not_called()
+    mock_appdaemon_service.call_service.assert_not_called()
+
+
 def test_control_battery_reserve_soc(
     solar: Solar,
     state: SolarState,
@@ -355,7 +422,7 @@ def test_schedule_battery_discharge_at_4_pm(
         current=new_slot1_discharge_current,
     )
 
-    mock_battery_discharge_slot_estimator.estimate_battery_discharge_at_4_pm.return_value = estimated_discharge_slot
+    mock_battery_discharge_slot_estimator.estimate_battery_discharge_at_4_pm.return_value = [estimated_discharge_slot]
 
     now = datetime.now()
     solar.schedule_battery_discharge_at_4_pm(now)
@@ -408,7 +475,7 @@ def test_schedule_battery_discharge_at_6_am(
         current=new_slot1_discharge_current,
     )
 
-    mock_battery_discharge_slot_estimator.estimate_battery_discharge_at_6_am.return_value = estimated_discharge_slot
+    mock_battery_discharge_slot_estimator.estimate_battery_discharge_at_6_am.return_value = [estimated_discharge_slot]
 
     now = datetime.now()
     solar.schedule_battery_discharge_at_6_am(now)
@@ -452,6 +519,67 @@ def test_disable_battery_discharge(
     )
 
 
+def test_schedule_battery_discharge_uses_extra_slots(
+    solar: Solar,
+    state: SolarState,
+    mock_appdaemon_service: Mock,
+    mock_state_factory: Mock,
+    mock_battery_discharge_slot_estimator: Mock,
+) -> None:
+    solar.configuration = replace(solar.configuration, battery_discharge_max_slots=3)
+    mock_state_factory.create.return_value = replace(state, is_slot1_discharge_enabled=False)
+
+    first_discharge_slot = BatteryDischargeSlot(
+        start_time=time(17, 0), end_time=time(18, 0), current=BatteryCurrent(30.0)
+    )
+    second_discharge_slot = BatteryDischargeSlot(
+        start_time=time(20, 27), end_time=time(21, 0), current=BatteryCurrent(30.0)
+    )
+    mock_battery_discharge_slot_estimator.estimate_battery_discharge_at_4_pm.return_value = [
+        first_discharge_slot,
+        second_discharge_slot,
+    ]
+
+    solar.schedule_battery_discharge_at_4_pm(datetime.now())
+
+    mock_appdaemon_service.call_service.assert_any_call(
+        "text/set_value", callback=ANY, entity_id=SLOT1_DISCHARGE_TIME_ENTITY, value="17:00-18:00"
+    )
+    assert mock_appdaemon_service.call_service.call_args_list[-4:] == [
+        call("text/set_value", callback=ANY, entity_id=slot_discharge_time_entity(2), value="20:27-21:00"),
+        call("number/set_value", callback=ANY, entity_id=slot_discharge_current_entity(2), value=30.0),
+        call("switch/turn_on", callback=ANY, entity_id=slot_discharge_enabled_entity(2)),
+        call("switch/turn_off", callback=ANY, entity_id=slot_discharge_enabled_entity(3)),
+    ]
+
+
+def test_disable_battery_discharge_disables_extra_slots(
+    solar: Solar,
+    state: SolarState,
+    mock_appdaemon_service: Mock,
+    mock_state_factory: Mock,
+) -> None:
+    solar.configuration = replace(solar.configuration, battery_discharge_max_slots=2)
+    mock_state_factory.create.return_value = replace(state, is_slot1_discharge_enabled=True)
+
+    solar.disable_battery_discharge()
+
+    assert mock_appdaemon_service.call_service.call_args_list == [
+        call("switch/turn_off", callback=ANY, entity_id=SLOT1_DISCHARGE_ENABLED_ENTITY),
+        call("switch/turn_off", callback=ANY, entity_id=slot_discharge_enabled_entity(2)),
+    ]
+
+
+@pytest.mark.parametrize("battery_discharge_max_slots", [0, 7])
+def test_invalid_battery_discharge_max_slots(
+    configuration: SolarConfiguration, battery_discharge_max_slots: int
+) -> None:
+    configuration = replace(configuration, battery_discharge_max_slots=battery_discharge_max_slots)
+
+    with pytest.raises(ValueError, match="battery_discharge_max_slots must be between 1 and 6"):
+        Solar(Mock(), Mock(), configuration, Mock(), Mock(), Mock(), Mock(), Mock(), Mock())
+
+
 def test_reset_battery_full_charge_timer_if_full_when_crossing_100_percent(
     solar: Solar,
     mock_appdaemon_service: Mock,
@@ -207,3 +207,16 @@ def test_create_missing_optional_field(
 
     assert result is not None
     mock_appdaemon_logger.log.assert_called_once_with(expected_message, level=logging.WARNING)
+
+
+def test_entity_ids_cover_all_reads(
+    mock_appdaemon_logger: Mock, mock_appdaemon_state: Mock, state_values: dict
+) -> None:
+    mock_appdaemon_state.get_state.side_effect = lambda entity_id, attribute="", *_args, **_kwargs: state_values.get(
+        f"{entity_id}:{attribute}"
+    )
+
+    DefaultSolarStateFactory(mock_appdaemon_logger, mock_appdaemon_state).create()
+
+    read_entity_ids = {entry.args[0] for entry in mock_appdaemon_state.get_state.call_args_list}
+    assert read_entity_ids == set(DefaultSolarStateFactory.ENTITY_IDS)
@@ -50,6 +50,7 @@ def any_hourly_price(any_hourly_period: HourlyPeriod) -> HourlyPrice:
 
 def test_estimator_self_use_when_no_remaining_hours(
     storage_mode_estimator: StorageModeEstimator,
+    mock_appdaemon_logger: Mock,
     state: SolarState,
     mock_production_forecast: Mock,
     mock_consumption_forecast: Mock,
@@ -66,6 +67,8 @@ def test_estimator_self_use_when_no_remaining_hours(
     mock_price_forecast.find_min_hour.assert_not_called()
 
     assert storage_mode == StorageMode.SELF_USE
+    msg, *args = mock_appdaemon_logger.log.call_args.args
+    assert msg % tuple(args) == f"Use {StorageMode.SELF_USE}, past feed-in priority end hour | hour=12"
 
 
 def test_estimator_self_use_when_battery_soc_below_reserve(
@@ -94,6 +97,7 @@ def test_estimator_self_use_when_battery_soc_below_reserve(
 
 def test_estimator_self_use_when_min_price_not_found(
     storage_mode_estimator: StorageModeEstimator,
+    mock_appdaemon_logger: Mock,
     state: SolarState,
     mock_production_forecast: Mock,
     mock_consumption_forecast: Mock,
@@ -119,6 +123,8 @@ def test_estimator_self_use_when_min_price_not_found(
     mock_price_forecast.find_min_hour.assert_called_once_with(today_8_am, day_hours)
 
     assert storage_mode == StorageMode.SELF_USE
+    msg, *args = mock_appdaemon_logger.log.call_args.args
+    assert msg % tuple(args) == f"Use {StorageMode.SELF_USE}, minimum price not found in the forecast"
 
 
 def test_estimator_self_use_when_current_price_below_threshold(
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import pytest
 from solar.weather_forecast import HourlyWeather, WeatherForecast
@@ -37,6 +37,16 @@ def test_create() -> None:
     ]
 
 
+def test_create_within_horizon() -> None:
+    raw_forecast = [
+        {"datetime": f"2025-10-03T{hour}:00:00+00:00", "temperature": 12.0, "humidity": 46.0} for hour in range(14, 18)
+    ]
+
+    forecast_weather = WeatherForecast.create(raw_forecast, horizon=timedelta(hours=2))
+
+    assert [weather.period.start.hour for weather in forecast_weather.periods] == [14, 15]
+
+
 @pytest.fixture
 def forecast_weather() -> WeatherForecast:
     return WeatherForecast(
@@ -1,7 +1,7 @@
 from datetime import UTC, datetime, time
 
 import pytest
-from units.fifteen_minute_period import FifteenMinutePeriod
+from units.fifteen_minute_period import FIFTEEN_MINUTE_PERIOD_PARSE_CACHE, FifteenMinutePeriod
 
 
 def test_valid_fifteen_minute_period() -> None:
@@ -72,3 +72,17 @@ def test_parse_custom_from_end_date() -> None:
     )
     expected = datetime(2025, 10, 21, 14, 15, 0, tzinfo=ZoneInfo("Europe/Warsaw"))
     assert period.start == expected
+
+
+def test_parse_custom_from_end_date_interned() -> None:
+    FIFTEEN_MINUTE_PERIOD_PARSE_CACHE.clear()
+    hits = FIFTEEN_MINUTE_PERIOD_PARSE_CACHE.hits
+
+    first = FifteenMinutePeriod.parse_custom_from_end_date("2025-10-21 14:15:00", "%Y-%m-%d %H:%M:%S", "Europe/Warsaw")
+    second = FifteenMinutePeriod.parse_custom_from_end_date("2025-10-21 14:15:00", "%Y-%m-%d %H:%M:%S", "Europe/Warsaw")
+    other_zone = FifteenMinutePeriod.parse_custom_from_end_date("2025-10-21 14:15:00", "%Y-%m-%d %H:%M:%S", "UTC")
+
+    assert first is second
+    assert other_zone is not first
+    assert other_zone.start != first.start
+    assert FIFTEEN_MINUTE_PERIOD_PARSE_CACHE.hits == hits + 1
@@ -15,3 +15,14 @@ class TestHourlyEnergyStrMixin:
     def test_str(self, energy_class: type) -> None:
         energy = energy_class(HourlyPeriod.parse("2025-10-21T14:00:00+00:00"), EnergyKwh(50.5))
         assert f"{energy}" == "2025-10-21T14:00:00+00:00 50.50kWh"
+
+    @pytest.mark.parametrize(
+        "energy_class",
+        [
+            HourlyConsumptionEnergy,
+            HourlyProductionEnergy,
+        ],
+    )
+    def test_slots(self, energy_class: type) -> None:
+        energy = energy_class(HourlyPeriod.parse("2025-10-21T14:00:00+00:00"), EnergyKwh(50.5))
+        assert not hasattr(energy, "__dict__")
@@ -1,7 +1,7 @@
 from datetime import UTC, datetime, time
 
 import pytest
-from units.hourly_period import HourlyPeriod
+from units.hourly_period import HOURLY_PERIOD_PARSE_CACHE, HourlyPeriod
 
 
 def test_valid_hourly_period() -> None:
@@ -47,3 +47,23 @@ def test_parse() -> None:
     start = "2025-10-21T14:00:00+00:00"
     period = HourlyPeriod.parse(start)
     assert period.start == datetime.fromisoformat(start)
+
+
+def test_parse_interned() -> None:
+    HOURLY_PERIOD_PARSE_CACHE.clear()
+    hits = HOURLY_PERIOD_PARSE_CACHE.hits
+
+    first = HourlyPeriod.parse("2025-10-21T14:00:00+00:00")
+    second = HourlyPeriod.parse("2025-10-21T14:00:00+00:00")
+
+    assert first is second
+    assert HOURLY_PERIOD_PARSE_CACHE.hits == hits + 1
+
+
+def test_parse_invalid_not_interned() -> None:
+    HOURLY_PERIOD_PARSE_CACHE.clear()
+
+    with pytest.raises(ValueError, match="beginning of an hour"):
+        HourlyPeriod.parse("2025-10-21T14:30:00+00:00")
+
+    assert "2025-10-21T14:30:00+00:00" not in HOURLY_PERIOD_PARSE_CACHE
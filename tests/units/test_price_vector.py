@@ -0,0 +1,82 @@
+import random
+from decimal import Decimal
+
+import pytest
+from units.energy_price import EnergyPrice
+from units.money import Money
+from units.price_vector import PriceVector
+
+
+def test_from_prices() -> None:
+    price_vector = PriceVector.from_prices(
+        [EnergyPrice.per_mwh(Money.pln(Decimal("450.25"))), EnergyPrice.per_mwh(Money.pln(Decimal("-12.5")))]
+    )
+
+    assert len(price_vector) == 2
+    assert list(price_vector.values) == [450_250_000, -12_500_000]
+    assert price_vector.currency == "PLN"
+    assert price_vector.unit == "MWh"
+
+
+def test_from_prices_kwh() -> None:
+    price_vector = PriceVector.from_prices([EnergyPrice.per_kwh(Money.eur(Decimal("0.45")))])
+
+    assert list(price_vector.values) == [450_000_000]
+
+
+def test_from_prices_empty() -> None:
+    price_vector = PriceVector.from_prices([])
+
+    assert len(price_vector) == 0
+    with pytest.raises(ValueError, match="Empty price vector has no currency"):
+        price_vector.to_money(0)
+
+
+@pytest.mark.parametrize(
+    "other",
+    [
+        EnergyPrice.per_mwh(Money.eur(Decimal(100))),
+        EnergyPrice.per_kwh(Money.pln(Decimal(100))),
+    ],
+)
+def test_from_prices_mixed(other: EnergyPrice) -> None:
+    with pytest.raises(ValueError, match="single currency and unit"):
+        PriceVector.from_prices([EnergyPrice.per_mwh(Money.pln(Decimal(100))), other])
+
+
+def test_fixed_point() -> None:
+    price_vector = PriceVector.from_prices([EnergyPrice.per_mwh(Money.pln(Decimal(100)))])
+
+    assert price_vector.fixed_point(EnergyPrice.per_kwh(Money.pln(Decimal("0.3")))) == 300_000_000
+    with pytest.raises(ValueError, match="Price must be in PLN"):
+        price_vector.fixed_point(EnergyPrice.per_mwh(Money.eur(Decimal(100))))
+
+
+def test_to_money() -> None:
+    price_vector = PriceVector.from_prices([EnergyPrice.per_mwh(Money.pln(Decimal(100)))])
+
+    assert price_vector.to_money(1_234_500_000) == Money.pln(Decimal("1.2345"))
+
+
+@pytest.mark.parametrize(
+    ("price", "value", "count", "expected"),
+    [
+        (EnergyPrice.per_mwh(Money.pln(Decimal(1))), 450_250_000, 1, EnergyPrice.per_mwh(Money.pln(Decimal("450.25")))),
+        (EnergyPrice.per_mwh(Money.pln(Decimal(1))), 300_000_000, 4, EnergyPrice.per_mwh(Money.pln(Decimal(75)))),
+        (EnergyPrice.per_kwh(Money.eur(Decimal(1))), 450_000_000, 3, EnergyPrice.per_kwh(Money.eur(Decimal("0.15")))),
+    ],
+)
+def test_to_energy_price(price: EnergyPrice, value: int, count: int, expected: EnergyPrice) -> None:
+    price_vector = PriceVector.from_prices([price])
+
+    assert price_vector.to_energy_price(value, count) == expected
+
+
+def test_average_matches_decimal() -> None:
+    rnd = random.Random(42)
+    prices = [EnergyPrice.per_mwh(Money.pln(Decimal(rnd.randint(-5000, 150000)) / 100)) for _ in range(4)]
+    price_vector = PriceVector.from_prices(prices)
+
+    average = price_vector.to_energy_price(sum(price_vector.values), count=len(prices))
+
+    assert average == sum(prices[1:], start=prices[0]) / Decimal(len(prices))
@@ -0,0 +1,180 @@
+import threading
+from typing import TYPE_CHECKING
+from unittest.mock import Mock, call
+
+import pytest
+from utils.command_queue import CommandQueue
+
+if TYPE_CHECKING:
+    from tests.conftest import FakeClock
+
+_RESERVE_SOC = "number.reserve_soc"
+_MAX_CURRENT = "number.max_current"
+_SLOT_TIME = "text.slot_time"
+
+
+@pytest.fixture
+def command_queue(
+    mock_appdaemon_logger: Mock, mock_appdaemon_scheduler: Mock, mock_appdaemon_service: Mock, clock: "FakeClock"
+) -> CommandQueue:
+    return CommandQueue(
+        mock_appdaemon_logger,
+        mock_appdaemon_scheduler,
+        mock_appdaemon_service,
+        priorities={_RESERVE_SOC: 0, _MAX_CURRENT: 1, _SLOT_TIME: 2},
+        min_spacing_seconds=1.0,
+        min_entity_spacing_seconds=5.0,
+        max_retries=2,
+        retry_backoff_seconds=10.0,
+        clock=clock,
+    )
+
+
+def _advance_to_timer(mock_appdaemon_scheduler: Mock, clock: "FakeClock") -> None:
+    on_timer, delay = mock_appdaemon_scheduler.run_in.call_args.args
+    clock.now += delay
+    on_timer()
+
+
+def _dispatched(mock_appdaemon_service: Mock) -> list[str]:
+    return [entry.kwargs["entity_id"] for entry in mock_appdaemon_service.call_service.call_args_list]
+
+
+def test_invalid_spacing(mock_appdaemon_logger: Mock, mock_appdaemon_scheduler: Mock) -> None:
+    with pytest.raises(ValueError, match="spacing must not be negative"):
+        CommandQueue(mock_appdaemon_logger, mock_appdaemon_scheduler, Mock(), {}, -1.0, 5.0)
+
+
+def test_unprioritised_call_is_passed_through(
+    command_queue: CommandQueue, mock_appdaemon_scheduler: Mock, mock_appdaemon_service: Mock
+) -> None:
+    command_queue.call_service("timer/start", entity_id="timer.any")
+    command_queue.call_service("timer/start", entity_id="timer.any")
+
+    assert mock_appdaemon_service.call_service.call_args_list == [call("timer/start", entity_id="timer.any")] * 2
+    mock_appdaemon_scheduler.run_in.assert_not_called()
+    assert command_queue.enqueued == 0
+
+
+def test_first_write_is_dispatched_immediately(
+    command_queue: CommandQueue, mock_appdaemon_scheduler: Mock, mock_appdaemon_service: Mock
+) -> None:
+    command_queue.call_service("number/set_value", entity_id=_RESERVE_SOC, value=30.0)
+
+    mock_appdaemon_service.call_service.assert_called_once_with("number/set_value", entity_id=_RESERVE_SOC, value=30.0)
+    mock_appdaemon_scheduler.run_in.assert_not_called()
+    assert (command_queue.throttled, command_queue.max_latency_seconds) == (0, 0.0)
+
+
+def test_burst_is_spaced_by_priority(
+    command_queue: CommandQueue, mock_appdaemon_scheduler: Mock, mock_appdaemon_service: Mock, clock: "FakeClock"
+) -> None:
+    command_queue.call_service("text/set_value", entity_id=_SLOT_TIME, value="16:00-17:00")
+    command_queue.call_service("number/set_value", entity_id=_MAX_CURRENT, value=80.0)
+    command_queue.call_service("number/set_value", entity_id=_RESERVE_SOC, value=30.0)
+
+    assert _dispatched(mock_appdaemon_service) == [_SLOT_TIME]
+    assert mock_appdaemon_scheduler.run_in.call_args.args[1] == 1.0
+
+    _advance_to_timer(mock_appdaemon_scheduler, clock)
+    _advance_to_timer(mock_appdaemon_scheduler, clock)
+
+    assert _dispatched(mock_appdaemon_service) == [_SLOT_TIME, _RESERVE_SOC, _MAX_CURRENT]
+    assert (command_queue.enqueued, command_queue.dispatched, command_queue.throttled) == (3, 3, 2)
+    assert command_queue.max_latency_seconds == 2.0
+    assert command_queue.average_latency_seconds() == 1.0
+
+
+def test_newer_write_supersedes_queued_one(
+    command_queue: CommandQueue, mock_appdaemon_scheduler: Mock, mock_appdaemon_service: Mock, clock: "FakeClock"
+) -> None:
+    command_queue.call_service("number/set_value", entity_id=_RESERVE_SOC, value=30.0)
+    command_queue.call_service("number/set_value", entity_id=_RESERVE_SOC, value=35.0)
+    command_queue.call_service("number/set_value", entity_id=_RESERVE_SOC, value=40.0)
+
+    # same entity waits for its own spacing
+    assert mock_appdaemon_scheduler.run_in.call_args.args[1] == 5.0
+    _advance_to_timer(mock_appdaemon_scheduler, clock)
+
+    assert [entry.kwargs["value"] for entry in mock_appdaemon_service.call_service.call_args_list] == [30.0, 40.0]
+    assert command_queue.superseded == 1
+    mock_appdaemon_scheduler.cancel_timer.assert_called_once()
+
+
+def test_failed_write_is_retried_with_backoff(
+    command_queue: CommandQueue,
+    mock_appdaemon_logger: Mock,
+    mock_appdaemon_scheduler: Mock,
+    mock_appdaemon_service: Mock,
+    clock: "FakeClock",
+) -> None:
+    callback = Mock()
+    command_queue.call_service("number/set_value", callback=callback, entity_id=_RESERVE_SOC, value=30.0)
+
+    for expected_backoff in [10.0, 20.0]:
+        wrapped_callback = mock_appdaemon_service.call_service.call_args.kwargs["callback"]
+        wrapped_callback({"success": False})
+        _advance_to_timer(mock_appdaemon_scheduler, clock)
+        assert mock_appdaemon_scheduler.run_in.call_args.args[1] == expected_backoff
+        _advance_to_timer(mock_appdaemon_scheduler, clock)
+
+    callback.assert_not_called()
+    assert mock_appdaemon_service.call_service.call_count == 3
+    assert mock_appdaemon_logger.log.call_count == 2
+
+    mock_appdaemon_service.call_service.call_args.kwargs["callback"]({"success": False})
+    _advance_to_timer(mock_appdaemon_scheduler, clock)
+
+    callback.assert_called_once_with({"success": False})
+    assert (command_queue.dispatched, command_queue.retries, command_queue.failures) == (3, 2, 1)
+
+
+def test_successful_write_calls_callback(command_queue: CommandQueue, mock_appdaemon_service: Mock) -> None:
+    callback = Mock()
+    command_queue.call_service("number/set_value", callback=callback, entity_id=_RESERVE_SOC, value=30.0)
+
+    mock_appdaemon_service.call_service.call_args.kwargs["callback"]({"success": True})
+
+    callback.assert_called_once_with({"success": True})
+    assert (command_queue.retries, command_queue.failures) == (0, 0)
+
+
+def test_failed_write_superseded_by_queued_one_isnt_retried(
+    command_queue: CommandQueue, mock_appdaemon_scheduler: Mock, mock_appdaemon_service: Mock, clock: "FakeClock"
+) -> None:
+    callback = Mock()
+    command_queue.call_service("number/set_value", callback=callback, entity_id=_RESERVE_SOC, value=30.0)
+    failed_callback = mock_appdaemon_service.call_service.call_args.kwargs["callback"]
+    command_queue.call_service("number/set_value", callback=callback, entity_id=_RESERVE_SOC, value=40.0)
+
+    failed_callback({"success": False})
+    _advance_to_timer(mock_appdaemon_scheduler, clock)
+    _advance_to_timer(mock_appdaemon_scheduler, clock)
+
+    callback.assert_called_once_with({"success": False})
+    assert [entry.kwargs["value"] for entry in mock_appdaemon_service.call_service.call_args_list] == [30.0, 40.0]
+    assert command_queue.retries == 0
+
+
+def test_failed_write_is_handed_over_from_event_loop_thread(
+    command_queue: CommandQueue, mock_appdaemon_scheduler: Mock, mock_appdaemon_service: Mock, clock: "FakeClock"
+) -> None:
+    callback = Mock()
+    command_queue.call_service("number/set_value", callback=callback, entity_id=_RESERVE_SOC, value=30.0)
+    wrapped_callback = mock_appdaemon_service.call_service.call_args.kwargs["callback"]
+
+    event_loop_thread = threading.Thread(target=wrapped_callback, args=({"success": False},))
+    event_loop_thread.start()
+    event_loop_thread.join()
+
+    # nothing is retried or scheduled on the event loop thread, only the hand over timer
+    on_failed, delay = mock_appdaemon_scheduler.run_in.call_args.args
+    assert (mock_appdaemon_scheduler.run_in.call_count, delay) == (1, 0)
+    assert command_queue.retries == 0
+
+    on_failed()
+
+    assert mock_appdaemon_scheduler.run_in.call_args.args[1] == 10.0
+    assert command_queue.retries == 1
+    _advance_to_timer(mock_appdaemon_scheduler, clock)
+    assert mock_appdaemon_service.call_service.call_count == 2
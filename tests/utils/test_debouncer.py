@@ -0,0 +1,92 @@
+from typing import TYPE_CHECKING
+from unittest.mock import Mock
+
+import pytest
+from utils.debouncer import Debouncer
+
+if TYPE_CHECKING:
+    from tests.conftest import FakeClock
+
+
+@pytest.fixture
+def callback() -> Mock:
+    return Mock()
+
+
+@pytest.fixture
+def debouncer(mock_appdaemon_scheduler: Mock, callback: Mock, clock: "FakeClock") -> Debouncer:
+    mock_appdaemon_scheduler.run_in.side_effect = lambda _callback, _delay: (
+        f"timer-{mock_appdaemon_scheduler.run_in.call_count}"
+    )
+    return Debouncer(
+        mock_appdaemon_scheduler, callback, quiet_period_seconds=10.0, max_latency_seconds=30.0, clock=clock
+    )
+
+
+def _fire_last_timer(mock_appdaemon_scheduler: Mock) -> None:
+    evaluate, _ = mock_appdaemon_scheduler.run_in.call_args.args
+    evaluate()
+
+
+def test_single_trigger(debouncer: Debouncer, mock_appdaemon_scheduler: Mock, callback: Mock) -> None:
+    debouncer.trigger()
+
+    mock_appdaemon_scheduler.run_in.assert_called_once()
+    assert mock_appdaemon_scheduler.run_in.call_args.args[1] == 10.0
+    callback.assert_not_called()
+
+    _fire_last_timer(mock_appdaemon_scheduler)
+
+    callback.assert_called_once_with()
+    assert (debouncer.triggers, debouncer.absorbed, debouncer.evaluations) == (1, 0, 1)
+
+
+def test_burst_collapses_into_single_evaluation(
+    debouncer: Debouncer, mock_appdaemon_scheduler: Mock, callback: Mock, clock: "FakeClock"
+) -> None:
+    for _ in range(5):
+        debouncer.trigger()
+        clock.now += 1.0
+
+    assert mock_appdaemon_scheduler.cancel_timer.call_count == 4
+    mock_appdaemon_scheduler.cancel_timer.assert_called_with("timer-4")
+
+    _fire_last_timer(mock_appdaemon_scheduler)
+
+    callback.assert_called_once_with()
+    assert (debouncer.triggers, debouncer.absorbed, debouncer.evaluations) == (5, 4, 1)
+
+
+def test_max_latency_bounds_delay(debouncer: Debouncer, mock_appdaemon_scheduler: Mock, clock: "FakeClock") -> None:
+    debouncer.trigger()
+    clock.now = 25.0
+    debouncer.trigger()
+
+    assert mock_appdaemon_scheduler.run_in.call_args.args[1] == 5.0
+
+    clock.now = 40.0
+    debouncer.trigger()
+
+    assert mock_appdaemon_scheduler.run_in.call_args.args[1] == 0.0
+
+
+def test_new_burst_after_evaluation(debouncer: Debouncer, mock_appdaemon_scheduler: Mock, clock: "FakeClock") -> None:
+    debouncer.trigger()
+    _fire_last_timer(mock_appdaemon_scheduler)
+
+    clock.now = 100.0
+    debouncer.trigger()
+
+    assert mock_appdaemon_scheduler.run_in.call_args.args[1] == 10.0
+    mock_appdaemon_scheduler.cancel_timer.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    ("quiet_period_seconds", "max_latency_seconds"),
+    [(-1.0, 10.0), (10.0, 5.0)],
+)
+def test_invalid_configuration(
+    mock_appdaemon_scheduler: Mock, callback: Mock, quiet_period_seconds: float, max_latency_seconds: float
+) -> None:
+    with pytest.raises(ValueError):
+        Debouncer(mock_appdaemon_scheduler, callback, quiet_period_seconds, max_latency_seconds)
@@ -1,3 +1,5 @@
+from datetime import timedelta
+
 import pytest
 from units.energy_kwh import EnergyKwh
 from units.hourly_energy import HourlyConsumptionEnergy, HourlyProductionEnergy
@@ -83,3 +85,21 @@ def test_cumulative_deficit_capped(any_hourly_period: HourlyPeriod) -> None:
     result = maximum_cumulative_deficit(hourly_consumptions, hourly_productions)
 
     assert result == EnergyKwh(0.0)
+
+
+def test_cumulative_deficit_long_horizon() -> None:
+    start = HourlyPeriod.parse("2025-10-21T00:00:00+00:00").start
+    hourly_productions = [
+        HourlyProductionEnergy(
+            HourlyPeriod(start + timedelta(hours=hour)), EnergyKwh(1.0 if 8 <= hour % 24 < 16 else 0.0)
+        )
+        for hour in range(48)
+    ]
+    hourly_consumptions = [
+        HourlyConsumptionEnergy(HourlyPeriod(start + timedelta(hours=hour)), EnergyKwh(0.5)) for hour in range(48)
+    ]
+
+    result = maximum_cumulative_deficit(hourly_consumptions, hourly_productions)
+
+    # 16 hours from the first evening to the next morning, the first night is covered by the day surplus
+    assert result == EnergyKwh(8.0)
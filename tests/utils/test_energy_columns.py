@@ -0,0 +1,130 @@
+import random
+import sys
+from datetime import timedelta
+
+import pytest
+from units.energy_kwh import EnergyKwh
+from units.hourly_energy import HourlyConsumptionEnergy, HourlyProductionEnergy
+from units.hourly_period import HourlyPeriod
+from utils import energy_aggregators, energy_columns
+from utils.energy_columns import EnergyColumns, maximum_cumulative_deficit, total_surplus, windowed_mean
+
+_START = HourlyPeriod.parse("2025-10-21T00:00:00+02:00").start
+
+
+@pytest.fixture(params=["numpy", "array"], autouse=True)
+def backend(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(energy_columns, "_numpy", None)
+    return request.param
+
+
+def _period(hour: int) -> HourlyPeriod:
+    return HourlyPeriod(_START + timedelta(hours=hour))
+
+
+def _consumptions(values: list[float], first_hour: int = 0) -> list[HourlyConsumptionEnergy]:
+    return [HourlyConsumptionEnergy(_period(first_hour + hour), EnergyKwh(value)) for hour, value in enumerate(values)]
+
+
+def _productions(values: list[float], first_hour: int = 0) -> list[HourlyProductionEnergy]:
+    return [HourlyProductionEnergy(_period(first_hour + hour), EnergyKwh(value)) for hour, value in enumerate(values)]
+
+
+def test_round_trip() -> None:
+    consumptions = _consumptions([1.0, 0.5, 2.0])
+    productions = _productions([0.0, 3.0])
+
+    assert EnergyColumns.from_hourly(consumptions).to_consumption() == consumptions
+    assert EnergyColumns.from_hourly(productions).to_production() == productions
+
+
+def test_round_trip_keeps_time_zone() -> None:
+    columns = EnergyColumns.from_hourly(_consumptions([1.0]))
+
+    assert columns.to_consumption()[0].period.start.utcoffset() == timedelta(hours=2)
+
+
+def test_empty() -> None:
+    columns = EnergyColumns.from_hourly([])
+
+    assert len(columns) == 0
+    assert columns.to_production() == []
+    assert total_surplus(columns, columns) == EnergyKwh(0.0)
+    assert maximum_cumulative_deficit(columns, columns) == EnergyKwh(0.0)
+    assert len(windowed_mean(columns, 2)) == 0
+
+
+def test_columns_of_different_length() -> None:
+    with pytest.raises(ValueError, match="same length"):
+        EnergyColumns([1.0, 2.0], [1.0], None)
+
+
+def test_total_surplus() -> None:
+    consumptions = EnergyColumns.from_hourly(_consumptions([1.0, 1.0, 1.0]))
+    productions = EnergyColumns.from_hourly(_productions([0.5, 1.0, 2.0]))
+
+    assert total_surplus(consumptions, productions) == EnergyKwh(0.5)
+
+
+def test_total_surplus_capped() -> None:
+    consumptions = EnergyColumns.from_hourly(_consumptions([2.0]))
+    productions = EnergyColumns.from_hourly(_productions([0.5]))
+
+    assert total_surplus(consumptions, productions) == EnergyKwh(0.0)
+
+
+def test_maximum_cumulative_deficit() -> None:
+    consumptions = EnergyColumns.from_hourly(_consumptions([2.0, 2.0, 1.0, 0.5]))
+    productions = EnergyColumns.from_hourly(_productions([0.5, 1.0, 3.0]))
+
+    assert maximum_cumulative_deficit(consumptions, productions) == EnergyKwh(2.5)
+
+
+def test_maximum_cumulative_deficit_unaligned_hours() -> None:
+    consumptions = EnergyColumns.from_hourly(_consumptions([1.0, 1.0], first_hour=2))
+    productions = EnergyColumns.from_hourly(_productions([0.5, 0.5, 0.5]))
+
+    assert maximum_cumulative_deficit(consumptions, productions) == EnergyKwh(0.5)
+
+
+def test_windowed_mean() -> None:
+    columns = EnergyColumns.from_hourly(_productions([1.0, 2.0, 3.0, 6.0]))
+
+    means = windowed_mean(columns, 2).to_production()
+
+    assert means == _productions([1.5, 2.5, 4.5])
+
+
+def test_windowed_mean_longer_than_series() -> None:
+    columns = EnergyColumns.from_hourly(_productions([1.0, 2.0]))
+
+    assert windowed_mean(columns, 3).to_production() == []
+
+
+def test_windowed_mean_invalid_window() -> None:
+    columns = EnergyColumns.from_hourly(_productions([1.0]))
+
+    with pytest.raises(ValueError, match="window_hours"):
+        windowed_mean(columns, 0)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_same_results_as_energy_aggregators(seed: int, monkeypatch: pytest.MonkeyPatch) -> None:
+    # reference results from the dataclass loops, whatever the horizon
+    monkeypatch.setattr(energy_aggregators, "_COLUMNAR_MIN_PERIODS", sys.maxsize)
+    rng = random.Random(seed)
+    consumptions = _consumptions([rng.uniform(0.0, 3.0) for _ in range(rng.randint(0, 72))], rng.randint(0, 5))
+    productions = _productions([rng.uniform(0.0, 5.0) for _ in range(rng.randint(0, 72))], rng.randint(0, 5))
+
+    consumption_columns = EnergyColumns.from_hourly(consumptions)
+    production_columns = EnergyColumns.from_hourly(productions)
+
+    assert total_surplus(consumption_columns, production_columns).value == pytest.approx(
+        energy_aggregators.total_surplus(consumptions, productions).value
+    )
+    assert maximum_cumulative_deficit(consumption_columns, production_columns).value == pytest.approx(
+        energy_aggregators.maximum_cumulative_deficit(consumptions, productions).value
+    )
@@ -0,0 +1,114 @@
+from typing import TYPE_CHECKING
+from unittest.mock import Mock
+
+import pytest
+from utils.instrumentation import Histogram, Instrumentation, not_instrumented
+
+if TYPE_CHECKING:
+    from tests.conftest import FakeClock
+
+
+class Estimator:
+    def __init__(self, clock: "FakeClock") -> None:
+        self.clock = clock
+        self.threshold = 10
+
+    def estimate(self, value: int) -> int:
+        self.clock.now += 0.002
+        return value * 2
+
+    def fail(self) -> None:
+        raise ValueError("failed")
+
+
+@pytest.fixture
+def instrumentation(clock: "FakeClock") -> Instrumentation:
+    return Instrumentation(clock)
+
+
+def test_histogram() -> None:
+    histogram = Histogram((1.0, 10.0))
+
+    for value in [0.5, 1.0, 5.0, 20.0]:
+        histogram.observe(value)
+
+    assert histogram.counts == [2, 1, 1]
+    assert (histogram.count, histogram.sum, histogram.max) == (4, 26.5, 20.0)
+    assert histogram.mean() == 6.625
+    assert histogram.quantile(0.5) == 1.0
+    assert histogram.quantile(0.75) == 10.0
+    assert histogram.quantile(1.0) == 20.0
+
+
+def test_empty_histogram() -> None:
+    histogram = Histogram()
+
+    assert histogram.mean() == 0.0
+    assert histogram.quantile(0.5) == 0.0
+
+
+def test_instrument_measures_public_methods(instrumentation: Instrumentation, clock: "FakeClock") -> None:
+    estimator = instrumentation.instrument(Estimator(clock), "estimator")
+
+    assert estimator.estimate(2) == 4
+    assert estimator.estimate(3) == 6
+    assert estimator.threshold == 10
+
+    metrics = instrumentation.stages["estimator.estimate"]
+    assert metrics.latency_ms.count == 2
+    assert metrics.latency_ms.sum == pytest.approx(4.0)
+    assert metrics.errors == 0
+    assert list(instrumentation.stages) == ["estimator.estimate"]
+
+
+def test_instrument_counts_errors(instrumentation: Instrumentation, clock: "FakeClock") -> None:
+    estimator = instrumentation.instrument(Estimator(clock), "estimator")
+
+    with pytest.raises(ValueError, match="failed"):
+        estimator.fail()
+
+    metrics = instrumentation.stages["estimator.fail"]
+    assert (metrics.latency_ms.count, metrics.errors) == (1, 1)
+
+
+def test_measure_counts_allocated_blocks(instrumentation: Instrumentation) -> None:
+    with instrumentation.measure("allocate"):
+        allocated = [object() for _ in range(1000)]
+
+    assert instrumentation.stages["allocate"].allocated_blocks >= len(allocated)
+
+
+def test_not_instrumented_returns_target(clock: "FakeClock") -> None:
+    estimator = Estimator(clock)
+
+    assert not_instrumented(estimator, "estimator") is estimator
+
+
+def test_render_text(instrumentation: Instrumentation, clock: "FakeClock") -> None:
+    instrumentation.instrument(Estimator(clock), "estimator").estimate(1)
+
+    text = instrumentation.render_text("solar")
+
+    assert "# TYPE appdaemon_stage_latency_ms histogram\n" in text
+    assert 'appdaemon_stage_latency_ms_bucket{app="solar",stage="estimator.estimate",le="1.0"} 0\n' in text
+    assert 'appdaemon_stage_latency_ms_bucket{app="solar",stage="estimator.estimate",le="2.5"} 1\n' in text
+    assert 'appdaemon_stage_latency_ms_bucket{app="solar",stage="estimator.estimate",le="+Inf"} 1\n' in text
+    assert 'appdaemon_stage_latency_ms_count{app="solar",stage="estimator.estimate"} 1\n' in text
+    assert 'appdaemon_stage_errors_total{app="solar",stage="estimator.estimate"} 0\n' in text
+    assert 'appdaemon_stage_allocated_blocks{app="solar",stage="estimator.estimate"}' in text
+
+
+def test_publish_sensors(instrumentation: Instrumentation, clock: "FakeClock") -> None:
+    instrumentation.instrument(Estimator(clock), "storage_mode_estimator").estimate(1)
+    state_writer = Mock()
+
+    instrumentation.publish_sensors(state_writer, "sensor.solar_stage")
+
+    state_writer.set_state.assert_called_once()
+    entity_id = state_writer.set_state.call_args.args[0]
+    kwargs = state_writer.set_state.call_args.kwargs
+    assert entity_id == "sensor.solar_stage_storage_mode_estimator_estimate"
+    assert kwargs["state"] == 2.0
+    assert kwargs["attributes"]["calls"] == 1
+    assert kwargs["attributes"]["p95_ms"] == 2.5
+    assert kwargs["attributes"]["unit_of_measurement"] == "ms"
@@ -0,0 +1,37 @@
+import logging
+from unittest.mock import Mock
+
+from utils.lazy_logger import Lazy, LazyLogger
+
+
+def _is_info_enabled(level: int) -> bool:
+    return level >= logging.INFO
+
+
+def test_log_enabled_level(mock_appdaemon_logger: Mock) -> None:
+    logger = LazyLogger(mock_appdaemon_logger, _is_info_enabled)
+
+    logger.log("Use %s", "self-use", level="WARNING")
+    logger.log("Use %s", "self-use")
+
+    assert mock_appdaemon_logger.log.call_count == 2
+    mock_appdaemon_logger.log.assert_called_with("Use %s", "self-use", level=logging.INFO)
+
+
+def test_log_suppressed_level(mock_appdaemon_logger: Mock) -> None:
+    logger = LazyLogger(mock_appdaemon_logger, _is_info_enabled)
+
+    supplier = Mock()
+
+    logger.log("Use %s", Lazy(supplier), level=logging.DEBUG)
+
+    mock_appdaemon_logger.log.assert_not_called()
+    supplier.assert_not_called()
+
+
+def test_lazy_argument_is_evaluated_on_formatting() -> None:
+    supplier = Mock(return_value=42)
+    argument = Lazy(supplier)
+
+    supplier.assert_not_called()
+    assert "value: %s, %r" % (argument, argument) == "value: 42, 42"  # noqa: UP031
@@ -0,0 +1,50 @@
+from unittest.mock import Mock
+
+import pytest
+from utils.lru_cache import LruCache
+
+
+def test_get_or_create_miss_then_hit() -> None:
+    cache = LruCache[str, int](max_size=2)
+    factory = Mock(return_value=1)
+
+    assert cache.get_or_create("a", factory) == 1
+    assert cache.get_or_create("a", factory) == 1
+
+    factory.assert_called_once_with()
+    assert cache.hits == 1
+    assert cache.misses == 1
+    assert cache.hit_rate() == 0.5
+
+
+def test_evicts_least_recently_used() -> None:
+    cache = LruCache[str, int](max_size=2)
+
+    cache.get_or_create("a", lambda: 1)
+    cache.get_or_create("b", lambda: 2)
+    cache.get_or_create("a", lambda: 1)  # "b" becomes least recently used
+    cache.get_or_create("c", lambda: 3)
+
+    assert len(cache) == 2
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+
+
+def test_clear() -> None:
+    cache = LruCache[str, int](max_size=2)
+    cache.get_or_create("a", lambda: 1)
+
+    cache.clear()
+
+    assert len(cache) == 0
+    assert "a" not in cache
+
+
+def test_hit_rate_without_lookups() -> None:
+    assert LruCache[str, int](max_size=1).hit_rate() == 0.0
+
+
+def test_invalid_max_size() -> None:
+    with pytest.raises(ValueError, match="max_size must be at least 1"):
+        LruCache[str, int](max_size=0)
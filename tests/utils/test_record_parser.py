@@ -0,0 +1,71 @@
+from itertools import islice
+
+import pytest
+from utils.record_parser import ParseStats, RecordSchema, parse_records
+
+SCHEMA = RecordSchema(
+    name="test", required_keys=("hour", "value"), build=lambda item: (int(item["hour"]), item["value"])
+)
+
+
+def test_parse_records() -> None:
+    stats = ParseStats()
+
+    records = list(
+        parse_records([{"hour": "1", "value": 1.5}, {"hour": 2, "value": 2.5, "extra": True}], SCHEMA, stats)
+    )
+
+    assert records == [(1, 1.5), (2, 2.5)]
+    assert stats.accepted == 2
+    assert stats.rejected_total() == 0
+
+
+def test_parse_records_none() -> None:
+    assert list(parse_records(None, SCHEMA)) == []
+
+
+@pytest.mark.parametrize(
+    ("raw_record", "reason"),
+    [
+        ("not a dict", "not a dict"),
+        ({"value": 1.5}, "missing hour"),
+        ({"hour": 1}, "missing value"),
+        ({"hour": "invalid", "value": 1.5}, "invalid value"),
+        ({"hour": None, "value": 1.5}, "invalid value"),
+    ],
+)
+def test_parse_records_rejected(raw_record: object, reason: str) -> None:
+    stats = ParseStats()
+
+    records = list(parse_records([raw_record, {"hour": 1, "value": 1.5}], SCHEMA, stats))
+
+    assert records == [(1, 1.5)]
+    assert stats.accepted == 1
+    assert stats.rejected == {reason: 1}
+
+
+def test_parse_records_stop() -> None:
+    stats = ParseStats()
+    raw_records = [{"hour": hour, "value": 1.0} for hour in range(48)]
+
+    records = list(parse_records(raw_records, SCHEMA, stats, stop=lambda record: record[0] >= 24))
+
+    assert len(records) == 24
+    assert stats.accepted == 24
+
+
+def test_parse_records_lazy() -> None:
+    stats = ParseStats()
+    raw_records = [{"hour": hour, "value": 1.0} for hour in range(48)]
+
+    records = list(islice(parse_records(raw_records, SCHEMA, stats), 2))
+
+    assert records == [(0, 1.0), (1, 1.0)]
+    assert stats.accepted == 2
+
+
+def test_parse_stats_str() -> None:
+    stats = ParseStats()
+    list(parse_records(["a", {"hour": 1}, "b", {"hour": 1, "value": 1.0}], SCHEMA, stats))
+
+    assert str(stats) == "accepted: 1, rejected: 3 (missing value: 1, not a dict: 2)"
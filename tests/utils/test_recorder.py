@@ -0,0 +1,172 @@
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+from unittest.mock import Mock
+
+import pytest
+from utils.recorder import (
+    Record,
+    Recorder,
+    RecordingAppdaemonService,
+    RecordingStateFactory,
+    not_recorded,
+    read_records,
+)
+
+if TYPE_CHECKING:
+    from tests.conftest import FakeClock
+
+
+@pytest.fixture
+def path(tmp_path: Path) -> Path:
+    return tmp_path / "records.bin"
+
+
+def test_record_and_read(path: Path, clock: "FakeClock") -> None:
+    recorder = Recorder(path, chunk_size=2, clock=clock)
+
+    recorder.record("state", {"battery_soc": 50.0})
+    clock.now = 300.0
+    recorder.record("service_call", ("number/set_value", {"value": 20}))
+    recorder.record("state", {"battery_soc": 51.0})
+    recorder.close()
+
+    assert list(read_records(path)) == [
+        Record(timestamp=0.0, kind="state", payload={"battery_soc": 50.0}),
+        Record(timestamp=300.0, kind="service_call", payload=("number/set_value", {"value": 20})),
+        Record(timestamp=300.0, kind="state", payload={"battery_soc": 51.0}),
+    ]
+    assert recorder.records == 3
+    assert recorder.chunks_written == 2
+    assert recorder.bytes_written == path.stat().st_size
+    assert recorder.write_errors == 0
+
+
+def test_record_hands_over_after_flush_interval(path: Path, clock: "FakeClock") -> None:
+    recorder = Recorder(path, chunk_size=100, flush_interval_seconds=60.0, clock=clock)
+
+    recorder.record("state", 1)
+    clock.now += 60.0
+    recorder.record("state", 2)
+    recorder.record("state", 3)
+    recorder.close()
+
+    assert recorder.chunks_written == 2
+
+
+def test_writer_hands_over_chunk_of_idle_recorder(path: Path, clock: "FakeClock") -> None:
+    recorder = Recorder(path, chunk_size=100, flush_interval_seconds=0.01, clock=clock)
+
+    recorder.record("state", 1)
+    clock.now += 0.01
+    deadline = time.monotonic() + 5.0
+    while recorder.chunks_written == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert [record.payload for record in read_records(path)] == [1]
+    recorder.close()
+    assert recorder.chunks_written == 1
+
+
+def test_record_appends(path: Path, clock: "FakeClock") -> None:
+    for payload in (1, 2):
+        recorder = Recorder(path, clock=clock)
+        recorder.record("state", payload)
+        recorder.close()
+
+    assert [record.payload for record in read_records(path)] == [1, 2]
+
+
+def test_record_unpicklable_payload(path: Path, clock: "FakeClock") -> None:
+    recorder = Recorder(path, clock=clock)
+
+    recorder.record("state", lambda: None)
+    recorder.close()
+
+    assert recorder.write_errors == 1
+    assert not path.exists()
+
+
+def test_invalid_chunk_size(path: Path) -> None:
+    with pytest.raises(ValueError, match="chunk_size must be at least 1"):
+        Recorder(path, chunk_size=0)
+
+
+def test_read_records_truncated(path: Path, clock: "FakeClock") -> None:
+    recorder = Recorder(path, chunk_size=1, clock=clock)
+    recorder.record("state", 1)
+    recorder.record("state", 2)
+    recorder.close()
+
+    path.write_bytes(path.read_bytes()[:-1])
+
+    assert [record.payload for record in read_records(path)] == [1]
+
+
+def test_recording_state_factory(path: Path, clock: "FakeClock") -> None:
+    recorder = Recorder(path, clock=clock)
+    first_state = {"battery_soc": 50.0}
+    second_state = {"battery_soc": 51.0}
+    state_factory = Mock()
+    state_factory.create.side_effect = [first_state, first_state, None, second_state]
+    recording_state_factory = RecordingStateFactory(state_factory, recorder, "solar_state")
+
+    states = [recording_state_factory.create() for _ in range(4)]
+    recorder.close()
+
+    assert states == [first_state, first_state, None, second_state]
+    assert [record.payload for record in read_records(path)] == [first_state, second_state]
+
+
+def test_recording_appdaemon_service(path: Path, clock: "FakeClock", mock_appdaemon_service: Mock) -> None:
+    recorder = Recorder(path, clock=clock)
+    callback = Mock()
+    recording_service = RecordingAppdaemonService(mock_appdaemon_service, recorder)
+
+    recording_service.call_service(
+        "number/set_value", entity_id="number.battery_reserve_soc", value=20, callback=callback
+    )
+    recorder.close()
+
+    mock_appdaemon_service.call_service.assert_called_once_with(
+        "number/set_value", entity_id="number.battery_reserve_soc", value=20, callback=callback
+    )
+    assert list(read_records(path)) == [
+        Record(
+            timestamp=0.0,
+            kind="service_call",
+            payload=("number/set_value", {"entity_id": "number.battery_reserve_soc", "value": 20}),
+        )
+    ]
+
+
+class _Estimator:
+    threshold = 10
+
+    def estimate(self, value: int) -> int:
+        return value * 2
+
+    def _helper(self) -> str:
+        return "private"
+
+
+def test_record_outputs(path: Path, clock: "FakeClock") -> None:
+    recorder = Recorder(path, clock=clock)
+    estimator = recorder.record_outputs(_Estimator(), "estimator")
+
+    assert estimator.estimate(1) == 2
+    assert estimator.estimate(2) == 4
+    assert estimator.threshold == 10
+    assert estimator._helper() == "private"  # noqa: SLF001
+    recorder.close()
+
+    assert [(record.kind, record.payload) for record in read_records(path)] == [
+        ("estimator", ("estimate", 2)),
+        ("estimator", ("estimate", 4)),
+    ]
+
+
+def test_not_recorded() -> None:
+    estimator = _Estimator()
+
+    assert not_recorded(estimator, "estimator") is estimator
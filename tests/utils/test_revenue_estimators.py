@@ -1,13 +1,16 @@
-from datetime import datetime
+import random
+from datetime import datetime, timedelta
 from decimal import Decimal
 
 import pytest
 from units.energy_kwh import EnergyKwh
 from units.energy_price import EnergyPrice
+from units.fifteen_minute_period import FifteenMinutePeriod
+from units.fifteen_minute_price import FifteenMinutePrice
 from units.hourly_period import HourlyPeriod
 from units.hourly_price import HourlyPrice
 from units.money import Money
-from utils.revenue_estimators import find_max_revenue_period
+from utils.revenue_estimators import find_max_revenue_period, find_max_revenue_periods
 
 
 @pytest.fixture
@@ -148,6 +151,290 @@ def test_find_max_revenue_period_zero_duration(
         find_max_revenue_period(any_hourly_periods, any_energy_price, 0, any_discharge_energy_1h)
 
 
+def test_find_max_revenue_period_latest_window_wins_on_tie() -> None:
+    periods = _create_hourly_price_list(
+        [
+            ("2025-01-01T00:00:00+00:00", 200),
+            ("2025-01-01T01:00:00+00:00", 50),  # Below threshold
+            ("2025-01-01T02:00:00+00:00", 200),
+        ]
+    )
+
+    result = find_max_revenue_period(periods, EnergyPrice.per_mwh(Money.eur(Decimal(100))), 30, DISCHARGE_ENERGY_1H)
+
+    assert result is not None
+    _, start_time, end_time = result
+
+    assert start_time == datetime.fromisoformat("2025-01-01T02:30:00+00:00")
+    assert end_time == datetime.fromisoformat("2025-01-01T03:00:00+00:00")
+
+
+def test_find_max_revenue_period_fifteen_minute_spike() -> None:
+    periods = _create_fifteen_minute_price_list(
+        [
+            ("2025-01-01T19:00:00+00:00", 300),
+            ("2025-01-01T19:15:00+00:00", 900),  # Intra-hour spike
+            ("2025-01-01T19:30:00+00:00", 300),
+            ("2025-01-01T19:45:00+00:00", 300),
+            ("2025-01-01T20:00:00+00:00", 450),
+            ("2025-01-01T20:15:00+00:00", 450),
+            ("2025-01-01T20:30:00+00:00", 450),
+            ("2025-01-01T20:45:00+00:00", 450),
+        ]
+    )
+
+    result = find_max_revenue_period(
+        periods, EnergyPrice.per_mwh(Money.eur(Decimal(100))), 20, DISCHARGE_ENERGY_1H, period_duration_minutes=15
+    )
+
+    assert result is not None
+    revenue, start_time, end_time = result
+
+    # 15 min at 900 EUR/MWh + 5 min at 300 EUR/MWh = 1.0 EUR
+    expected_revenue = (900 / 1000) * (4.0 / 60) * 15 + (300 / 1000) * (4.0 / 60) * 5
+    assert revenue.value == pytest.approx(Decimal.from_float(expected_revenue))
+    assert start_time == datetime.fromisoformat("2025-01-01T19:15:00+00:00")
+    assert end_time == datetime.fromisoformat("2025-01-01T19:35:00+00:00")
+
+
+def test_find_max_revenue_period_zero_period_duration(
+    any_hourly_periods: list[HourlyPrice], any_energy_price: EnergyPrice, any_discharge_energy_1h: EnergyKwh
+) -> None:
+    with pytest.raises(ValueError, match="period_duration_minutes must be at least 1"):
+        find_max_revenue_period(any_hourly_periods, any_energy_price, 60, any_discharge_energy_1h, 0)
+
+
+@pytest.mark.parametrize("period_duration_minutes", [15, 60])
+@pytest.mark.parametrize("seed", range(20))
+def test_find_max_revenue_period_matches_brute_force(seed: int, period_duration_minutes: int) -> None:
+    rnd = random.Random(seed)
+    start = datetime.fromisoformat("2025-01-01T00:00:00+00:00")
+    data = [
+        ((start + timedelta(minutes=period_duration_minutes * i)).isoformat(), rnd.choice([0, 100, 150, 200, 350]))
+        for i in range(24)
+    ]
+    periods = (
+        _create_fifteen_minute_price_list(data) if period_duration_minutes == 15 else _create_hourly_price_list(data)
+    )
+    threshold = EnergyPrice.per_mwh(Money.eur(Decimal(rnd.choice([0, 100, 150]))))
+    max_duration_minutes = rnd.randint(1, 300)
+    # 6 kWh/h gives exactly 0.1 kWh per minute, so the brute force revenues carry no rounding noise on ties
+    discharge_energy_1h = EnergyKwh(6.0)
+
+    result = find_max_revenue_period(
+        periods, threshold, max_duration_minutes, discharge_energy_1h, period_duration_minutes
+    )
+    expected = _find_max_revenue_period_brute_force(
+        periods, threshold, max_duration_minutes, discharge_energy_1h, period_duration_minutes
+    )
+
+    assert result == expected
+
+
+def test_find_max_revenue_periods_morning_and_evening_peaks() -> None:
+    periods = _create_hourly_price_list(
+        [
+            ("2025-01-01T06:00:00+00:00", 500),
+            ("2025-01-01T07:00:00+00:00", 600),
+            ("2025-01-01T08:00:00+00:00", 50),
+            ("2025-01-01T09:00:00+00:00", 50),
+            ("2025-01-01T10:00:00+00:00", 400),
+            ("2025-01-01T11:00:00+00:00", 700),
+        ]
+    )
+
+    result = find_max_revenue_periods(
+        periods, EnergyPrice.per_mwh(Money.eur(Decimal(100))), 150, DISCHARGE_ENERGY_1H, 2
+    )
+
+    assert result is not None
+    revenue, windows = result
+
+    # 60 min at 600 + 30 min at 500 in the morning, 60 min at 700 in the evening
+    expected_revenue = (4.0 / 60) * (0.6 * 60 + 0.5 * 30 + 0.7 * 60)
+    assert revenue.value == pytest.approx(Decimal.from_float(expected_revenue))
+    assert windows == [
+        (datetime.fromisoformat("2025-01-01T06:30:00+00:00"), datetime.fromisoformat("2025-01-01T08:00:00+00:00")),
+        (datetime.fromisoformat("2025-01-01T11:00:00+00:00"), datetime.fromisoformat("2025-01-01T12:00:00+00:00")),
+    ]
+
+
+def test_find_max_revenue_periods_prefers_fewer_periods_on_tie() -> None:
+    periods = _create_hourly_price_list(
+        [
+            ("2025-01-01T00:00:00+00:00", 200),
+            ("2025-01-01T01:00:00+00:00", 200),
+            ("2025-01-01T02:00:00+00:00", 200),
+        ]
+    )
+
+    result = find_max_revenue_periods(periods, EnergyPrice.per_mwh(Money.eur(Decimal(100))), 90, DISCHARGE_ENERGY_1H, 3)
+
+    assert result is not None
+    _, windows = result
+    assert len(windows) == 1
+    assert windows[0][1] - windows[0][0] == timedelta(minutes=90)
+
+
+def test_find_max_revenue_periods_no_periods_meet_threshold(standard_periods: list[HourlyPrice]) -> None:
+    result = find_max_revenue_periods(
+        standard_periods, EnergyPrice.per_mwh(Money.eur(Decimal(500))), 60, DISCHARGE_ENERGY_1H, 2
+    )
+
+    assert result is None
+
+
+def test_find_max_revenue_periods_empty_periods(
+    any_hourly_periods: list[HourlyPrice], any_energy_price: EnergyPrice, any_discharge_energy_1h: EnergyKwh
+) -> None:
+    assert find_max_revenue_periods(any_hourly_periods, any_energy_price, 60, any_discharge_energy_1h, 2) is None
+
+
+@pytest.mark.parametrize(
+    ("max_duration_minutes", "max_periods", "period_duration_minutes", "message"),
+    [
+        (0, 1, 60, "max_duration_minutes must be at least 1"),
+        (60, 0, 60, "max_periods must be at least 1"),
+        (60, 1, 0, "period_duration_minutes must be at least 1"),
+    ],
+)
+def test_find_max_revenue_periods_invalid_arguments(
+    standard_periods: list[HourlyPrice],
+    any_energy_price: EnergyPrice,
+    any_discharge_energy_1h: EnergyKwh,
+    max_duration_minutes: int,
+    max_periods: int,
+    period_duration_minutes: int,
+    message: str,
+) -> None:
+    with pytest.raises(ValueError, match=message):
+        find_max_revenue_periods(
+            standard_periods,
+            any_energy_price,
+            max_duration_minutes,
+            any_discharge_energy_1h,
+            max_periods,
+            period_duration_minutes,
+        )
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_find_max_revenue_periods_single_period_matches_find_max_revenue_period(seed: int) -> None:
+    rnd = random.Random(seed)
+    start = datetime.fromisoformat("2025-01-01T00:00:00+00:00")
+    data = [((start + timedelta(minutes=15 * i)).isoformat(), rnd.choice([0, 100, 150, 200, 350])) for i in range(24)]
+    periods = _create_fifteen_minute_price_list(data)
+    threshold = EnergyPrice.per_mwh(Money.eur(Decimal(rnd.choice([0, 100, 150]))))
+    max_duration_minutes = rnd.randint(1, 300)
+    discharge_energy_1h = EnergyKwh(6.0)
+
+    result = find_max_revenue_periods(periods, threshold, max_duration_minutes, discharge_energy_1h, 1, 15)
+    expected = find_max_revenue_period(periods, threshold, max_duration_minutes, discharge_energy_1h, 15)
+
+    assert (result[0] if result else None) == (expected[0] if expected else None)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_find_max_revenue_periods_two_periods_match_brute_force(seed: int) -> None:
+    rnd = random.Random(seed)
+    period_duration_minutes = 3
+    start = datetime.fromisoformat("2025-01-01T00:00:00+00:00")
+    # 3-minute price periods keep the brute force fast, only durations and revenues are compared, not period starts
+    data = [((start + timedelta(hours=i)).isoformat(), rnd.choice([0, 100, 150, 200, 350])) for i in range(8)]
+    periods = _create_hourly_price_list(data)
+    threshold = EnergyPrice.per_mwh(Money.eur(Decimal(rnd.choice([0, 100, 150]))))
+    max_duration_minutes = rnd.randint(1, 20)
+    discharge_energy_1h = EnergyKwh(6.0)
+
+    result = find_max_revenue_periods(
+        periods, threshold, max_duration_minutes, discharge_energy_1h, 2, period_duration_minutes
+    )
+    expected = _find_max_price_minutes_brute_force(
+        [period.price for period in periods], threshold, max_duration_minutes, 2, period_duration_minutes
+    )
+
+    assert result is not None
+    revenue, windows = result
+    assert len(windows) <= 2
+    # price-minutes in EUR/MWh, 0.1 kWh per minute
+    assert revenue.value == Decimal(expected) / Decimal(1000) / Decimal(10)
+
+
+# Reference implementation evaluating every pair of disjoint minute ranges, returns the best price-minutes
+def _find_max_price_minutes_brute_force(
+    prices: list[EnergyPrice],
+    min_price_threshold: EnergyPrice,
+    max_duration_minutes: int,
+    max_periods: int,
+    period_duration_minutes: int,
+) -> int:
+    assert max_periods == 2
+    minute_prices = [
+        int(price.money.value) if price >= min_price_threshold else None
+        for price in prices
+        for _ in range(period_duration_minutes)
+    ]
+    ranges = [
+        (start, end)
+        for start in range(len(minute_prices))
+        for end in range(start + 1, min(start + max_duration_minutes, len(minute_prices)) + 1)
+        if all(price is not None for price in minute_prices[start:end])
+    ]
+
+    def value(start: int, end: int) -> int:
+        return sum(price for price in minute_prices[start:end] if price is not None)
+
+    best = max((value(start, end) for start, end in ranges), default=0)
+    for first_start, first_end in ranges:
+        for second_start, second_end in ranges:
+            if (
+                second_start > first_end
+                and (first_end - first_start) + (second_end - second_start) <= max_duration_minutes
+            ):
+                best = max(best, value(first_start, first_end) + value(second_start, second_end))
+    return best
+
+
+# Reference implementation evaluating every starting minute, used to verify the breakpoint search
+def _find_max_revenue_period_brute_force(
+    prices: list[HourlyPrice] | list[FifteenMinutePrice],
+    min_price_threshold: EnergyPrice,
+    max_duration_minutes: int,
+    discharge_energy_1h: EnergyKwh,
+    period_duration_minutes: int,
+) -> tuple[Money, datetime, datetime] | None:
+    best = None
+    discharge_kwh_per_minute = Decimal(discharge_energy_1h.value) / Decimal(60)
+
+    for start_idx, start_period in enumerate(prices):
+        if start_period.price < min_price_threshold:
+            continue
+
+        for start_offset_minutes in range(period_duration_minutes):
+            revenue = start_period.price.money.zeroed()
+            minutes_covered = 0
+            idx = start_idx
+            minutes_into_period = start_offset_minutes
+
+            while minutes_covered < max_duration_minutes and idx < len(prices):
+                if prices[idx].price < min_price_threshold:
+                    break
+                minutes_to_take = min(
+                    period_duration_minutes - minutes_into_period, max_duration_minutes - minutes_covered
+                )
+                price_per_kwh = prices[idx].price.normalize_to_price_per_kwh().money
+                revenue += price_per_kwh * discharge_kwh_per_minute * Decimal(minutes_to_take)
+                minutes_covered += minutes_to_take
+                idx += 1
+                minutes_into_period = 0
+
+            start_time = start_period.period.start + timedelta(minutes=start_offset_minutes)
+            if best is None or revenue >= best[0]:
+                best = (revenue, start_time, start_time + timedelta(minutes=minutes_covered))
+
+    return best
+
+
 def _create_hourly_price_list(data: list[tuple[str, int]]) -> list[HourlyPrice]:
     return [
         HourlyPrice(
@@ -156,3 +443,13 @@ def _create_hourly_price_list(data: list[tuple[str, int]]) -> list[HourlyPrice]:
         )
         for date_string, price_value in data
     ]
+
+
+def _create_fifteen_minute_price_list(data: list[tuple[str, int]]) -> list[FifteenMinutePrice]:
+    return [
+        FifteenMinutePrice(
+            FifteenMinutePeriod.parse(date_string),
+            EnergyPrice.per_mwh(Money.eur(Decimal(price_value))),
+        )
+        for date_string, price_value in data
+    ]
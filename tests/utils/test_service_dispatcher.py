@@ -0,0 +1,121 @@
+from unittest.mock import Mock, call
+
+import pytest
+from utils.service_dispatcher import BatchingAppdaemonService
+
+_STATES = {
+    ("number.reserve_soc", None): "20.0",
+    ("switch.slot1", None): "off",
+    ("climate.heating", "temperature"): 20.0,
+    ("select.storage_mode", None): "Self-Use",
+}
+
+
+@pytest.fixture
+def dispatcher(
+    mock_appdaemon_logger: Mock, mock_appdaemon_state: Mock, mock_appdaemon_service: Mock
+) -> BatchingAppdaemonService:
+    mock_appdaemon_state.get_state.side_effect = lambda entity_id, attribute=None: _STATES.get((entity_id, attribute))
+    return BatchingAppdaemonService(mock_appdaemon_logger, mock_appdaemon_state, mock_appdaemon_service)
+
+
+def test_call_outside_batch_is_dispatched_immediately(
+    dispatcher: BatchingAppdaemonService, mock_appdaemon_service: Mock
+) -> None:
+    dispatcher.call_service("number/set_value", entity_id="number.reserve_soc", value=30.0)
+
+    mock_appdaemon_service.call_service.assert_called_once_with(
+        "number/set_value", entity_id="number.reserve_soc", value=30.0
+    )
+
+
+def test_writes_to_same_entity_are_merged(dispatcher: BatchingAppdaemonService, mock_appdaemon_service: Mock) -> None:
+    with dispatcher.batch():
+        dispatcher.call_service("number/set_value", entity_id="number.reserve_soc", value=30.0)
+        dispatcher.call_service("switch/turn_on", entity_id="switch.slot1")
+        dispatcher.call_service("number/set_value", entity_id="number.reserve_soc", value=40.0)
+        mock_appdaemon_service.call_service.assert_not_called()
+
+    # merged write keeps the position of the first one
+    assert mock_appdaemon_service.call_service.call_args_list == [
+        call("number/set_value", entity_id="number.reserve_soc", value=40.0),
+        call("switch/turn_on", entity_id="switch.slot1"),
+    ]
+    assert (dispatcher.calls, dispatcher.dispatched, dispatcher.merged, dispatcher.dropped) == (3, 2, 1, 0)
+
+
+@pytest.mark.parametrize(
+    ("service", "data"),
+    [
+        ("number/set_value", {"entity_id": "number.reserve_soc", "value": 20}),
+        ("switch/turn_off", {"entity_id": "switch.slot1"}),
+        ("climate/set_temperature", {"entity_id": "climate.heating", "temperature": 20.0}),
+        ("select/select_option", {"entity_id": "select.storage_mode", "option": "Self-Use"}),
+    ],
+)
+def test_noop_write_is_dropped(
+    dispatcher: BatchingAppdaemonService,
+    mock_appdaemon_logger: Mock,
+    mock_appdaemon_service: Mock,
+    service: str,
+    data: dict,
+) -> None:
+    with dispatcher.batch():
+        dispatcher.call_service(service, **data)
+
+    mock_appdaemon_service.call_service.assert_not_called()
+    mock_appdaemon_logger.log.assert_called_once()
+    assert dispatcher.dropped == 1
+    assert dispatcher.calls_saved() == 1
+
+
+@pytest.mark.parametrize(
+    ("service", "data"),
+    [
+        ("number/set_value", {"entity_id": "number.unknown", "value": 20}),
+        ("switch/turn_on", {"entity_id": "switch.slot1"}),
+        ("climate/set_temperature", {"entity_id": "climate.heating", "temperature": 21.0}),
+        ("select/select_option", {"entity_id": "select.storage_mode", "option": "Feed-In"}),
+    ],
+)
+def test_changing_write_is_dispatched(
+    dispatcher: BatchingAppdaemonService, mock_appdaemon_service: Mock, service: str, data: dict
+) -> None:
+    with dispatcher.batch():
+        dispatcher.call_service(service, **data)
+
+    mock_appdaemon_service.call_service.assert_called_once_with(service, **data)
+
+
+def test_other_services_are_kept_in_order(dispatcher: BatchingAppdaemonService, mock_appdaemon_service: Mock) -> None:
+    with dispatcher.batch():
+        dispatcher.call_service("timer/cancel", entity_id="timer.full_charge")
+        dispatcher.call_service("timer/start", entity_id="timer.full_charge")
+        dispatcher.call_service("timer/cancel", entity_id="timer.full_charge")
+
+    assert mock_appdaemon_service.call_service.call_args_list == [
+        call("timer/cancel", entity_id="timer.full_charge"),
+        call("timer/start", entity_id="timer.full_charge"),
+        call("timer/cancel", entity_id="timer.full_charge"),
+    ]
+    assert dispatcher.calls_saved() == 0
+
+
+def test_nested_batch_flushes_once(dispatcher: BatchingAppdaemonService, mock_appdaemon_service: Mock) -> None:
+    with dispatcher.batch():
+        with dispatcher.batch():
+            dispatcher.call_service("number/set_value", entity_id="number.reserve_soc", value=30.0)
+        mock_appdaemon_service.call_service.assert_not_called()
+        dispatcher.call_service("number/set_value", entity_id="number.reserve_soc", value=35.0)
+
+    mock_appdaemon_service.call_service.assert_called_once_with(
+        "number/set_value", entity_id="number.reserve_soc", value=35.0
+    )
+
+
+def test_batch_is_flushed_on_error(dispatcher: BatchingAppdaemonService, mock_appdaemon_service: Mock) -> None:
+    with pytest.raises(RuntimeError), dispatcher.batch():
+        dispatcher.call_service("switch/turn_on", entity_id="switch.slot1")
+        raise RuntimeError
+
+    mock_appdaemon_service.call_service.assert_called_once_with("switch/turn_on", entity_id="switch.slot1")
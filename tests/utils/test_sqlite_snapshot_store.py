@@ -0,0 +1,48 @@
+from pathlib import Path
+
+import pytest
+from utils.sqlite_snapshot_store import Snapshot, SqliteSnapshotStore
+
+
+@pytest.fixture
+def snapshot_store(tmp_path: Path) -> SqliteSnapshotStore:
+    return SqliteSnapshotStore(tmp_path / "snapshots.db")
+
+
+def test_save_and_load(snapshot_store: SqliteSnapshotStore) -> None:
+    snapshot_store.save("price", [1, 2, 3], timestamp=1000.0)
+
+    assert snapshot_store.load("price", now=1060.0, max_age_seconds=60.0) == Snapshot(value=[1, 2, 3], timestamp=1000.0)
+
+
+def test_save_replaces(snapshot_store: SqliteSnapshotStore) -> None:
+    snapshot_store.save("price", [1], timestamp=1000.0)
+    snapshot_store.save("price", [2], timestamp=2000.0)
+
+    assert snapshot_store.load("price", now=2000.0, max_age_seconds=60.0) == Snapshot(value=[2], timestamp=2000.0)
+
+
+def test_load_persisted(tmp_path: Path) -> None:
+    SqliteSnapshotStore(tmp_path / "snapshots.db").save("price", [1], timestamp=1000.0)
+
+    snapshot = SqliteSnapshotStore(tmp_path / "snapshots.db").load("price", now=1000.0, max_age_seconds=60.0)
+
+    assert snapshot == Snapshot(value=[1], timestamp=1000.0)
+
+
+def test_load_missing(snapshot_store: SqliteSnapshotStore) -> None:
+    assert snapshot_store.load("price", now=1000.0, max_age_seconds=60.0) is None
+
+
+def test_load_stale(snapshot_store: SqliteSnapshotStore) -> None:
+    snapshot_store.save("price", [1], timestamp=1000.0)
+
+    assert snapshot_store.load("price", now=1061.0, max_age_seconds=60.0) is None
+
+
+def test_load_unreadable(snapshot_store: SqliteSnapshotStore) -> None:
+    snapshot_store.save("price", [1], timestamp=1000.0)
+    with snapshot_store._connect() as connection, connection:
+        connection.execute("UPDATE snapshots SET payload = ?", (b"invalid",))
+
+    assert snapshot_store.load("price", now=1000.0, max_age_seconds=60.0) is None
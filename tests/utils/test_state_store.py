@@ -0,0 +1,108 @@
+from unittest.mock import ANY, Mock
+
+import pytest
+from utils.state_store import SnapshotStateFactory, StateStore, fetch_states
+
+_ENTITY = "sensor.any"
+
+
+@pytest.fixture
+def state_store(mock_appdaemon_state: Mock, mock_appdaemon_state_listener: Mock) -> StateStore:
+    mock_appdaemon_state.get_state.return_value = {"state": "on", "attributes": {"forecast": [1, 2]}}
+    return StateStore(mock_appdaemon_state, mock_appdaemon_state_listener)
+
+
+def _change_state(mock_appdaemon_state_listener: Mock, new: object) -> None:
+    on_state_change = mock_appdaemon_state_listener.listen_state.call_args.args[0]
+    on_state_change(_ENTITY, "all", None, new)
+
+
+def test_get_state_fetches_and_subscribes_once(
+    state_store: StateStore, mock_appdaemon_state: Mock, mock_appdaemon_state_listener: Mock
+) -> None:
+    assert state_store.get_state(_ENTITY) == "on"
+    assert state_store.get_state(_ENTITY, "forecast") == [1, 2]
+    assert state_store.get_state(_ENTITY, "unknown") is None
+
+    mock_appdaemon_state.get_state.assert_called_once_with(_ENTITY, "all")
+    mock_appdaemon_state_listener.listen_state.assert_called_once_with(ANY, _ENTITY, attribute="all")
+
+
+def test_get_state_unavailable_entity(state_store: StateStore, mock_appdaemon_state: Mock) -> None:
+    mock_appdaemon_state.get_state.return_value = None
+
+    assert state_store.get_state(_ENTITY) is None
+    assert state_store.get_state(_ENTITY, "forecast") is None
+
+
+def test_state_change_updates_store(state_store: StateStore, mock_appdaemon_state_listener: Mock) -> None:
+    state_store.get_state(_ENTITY)
+
+    _change_state(mock_appdaemon_state_listener, {"state": "off", "attributes": {}})
+
+    assert state_store.get_state(_ENTITY) == "off"
+    assert state_store.get_state(_ENTITY, "forecast") is None
+    assert state_store.version == 1
+
+
+def test_preload_stores_and_subscribes_new_entities(
+    state_store: StateStore, mock_appdaemon_state: Mock, mock_appdaemon_state_listener: Mock
+) -> None:
+    state_store.get_state(_ENTITY)
+
+    state_store.preload({_ENTITY: {"state": "stale"}, "sensor.other": {"state": "off", "attributes": {}}})
+
+    assert state_store.get_state(_ENTITY) == "on"
+    assert state_store.get_state("sensor.other") == "off"
+    mock_appdaemon_state.get_state.assert_called_once_with(_ENTITY, "all")
+    assert mock_appdaemon_state_listener.listen_state.call_count == 2
+
+
+def test_fetch_states_reads_namespace_once() -> None:
+    namespace_state = Mock()
+    namespace_state.get_state.return_value = {
+        "sensor.a": {"state": "on", "attributes": {}},
+        "sensor.b": {"state": "off", "attributes": {}},
+        "sensor.unrelated": {"state": "on", "attributes": {}},
+    }
+
+    states = fetch_states(namespace_state, ["sensor.a", "sensor.b", "sensor.missing"])
+
+    assert states == {
+        "sensor.a": {"state": "on", "attributes": {}},
+        "sensor.b": {"state": "off", "attributes": {}},
+        "sensor.missing": None,
+    }
+    namespace_state.get_state.assert_called_once_with()
+
+
+def test_fetch_states_unavailable_namespace() -> None:
+    namespace_state = Mock()
+    namespace_state.get_state.return_value = None
+
+    assert fetch_states(namespace_state, ["sensor.a"]) == {"sensor.a": None}
+
+
+def test_snapshot_state_factory(state_store: StateStore, mock_appdaemon_state_listener: Mock) -> None:
+    state_factory = Mock()
+    state_factory.create.side_effect = lambda: state_store.get_state(_ENTITY)
+    snapshot_state_factory = SnapshotStateFactory(state_store, state_factory)
+
+    assert snapshot_state_factory.create() == "on"
+    assert snapshot_state_factory.create() == "on"
+    assert state_factory.create.call_count == 1
+
+    _change_state(mock_appdaemon_state_listener, {"state": "off", "attributes": {}})
+
+    assert snapshot_state_factory.create() == "off"
+    assert state_factory.create.call_count == 2
+
+
+def test_snapshot_state_factory_does_not_keep_missing_state(state_store: StateStore) -> None:
+    state_factory = Mock()
+    state_factory.create.return_value = None
+    snapshot_state_factory = SnapshotStateFactory(state_store, state_factory)
+
+    assert snapshot_state_factory.create() is None
+    assert snapshot_state_factory.create() is None
+    assert state_factory.create.call_count == 2
@@ -0,0 +1,95 @@
+import cProfile
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+from utils.tick_profiler import TickProfiler
+
+_NOW = datetime.fromisoformat("2025-10-10T15:30:00+02:00")
+
+
+def _hot_function() -> int:
+    return sum(range(1000))
+
+
+@pytest.fixture
+def tick_profiler(mock_appdaemon_logger: Mock, tmp_path: Path) -> TickProfiler:
+    return TickProfiler(mock_appdaemon_logger, tmp_path / "profiles")
+
+
+def test_tick_isnt_profiled_by_default(tick_profiler: TickProfiler, tmp_path: Path) -> None:
+    tick = Mock()
+
+    tick_profiler.profile(tick)
+
+    tick.assert_called_once_with()
+    assert not (tmp_path / "profiles").exists()
+
+
+def test_profiles_requested_ticks(tick_profiler: TickProfiler, mock_appdaemon_logger: Mock, tmp_path: Path) -> None:
+    tick_profiler.start("solar", 2, 5, _NOW)
+
+    tick_profiler.profile(_hot_function)
+    assert tick_profiler.remaining_ticks == 1
+    assert not (tmp_path / "profiles").exists()
+
+    tick_profiler.profile(_hot_function)
+
+    path = tmp_path / "profiles" / "solar_20251010T153000.prof"
+    assert path.exists()
+    assert tick_profiler.remaining_ticks == 0
+    report = mock_appdaemon_logger.log.call_args.args[2]
+    assert "_hot_function" in report
+
+    tick = Mock()
+    tick_profiler.profile(tick)
+    tick.assert_called_once_with()
+
+
+def test_failed_tick_is_counted(tick_profiler: TickProfiler, tmp_path: Path) -> None:
+    tick_profiler.start("hvac", 1, 5, _NOW)
+
+    with pytest.raises(ValueError, match="failed"):
+        tick_profiler.profile(Mock(side_effect=ValueError("failed")))
+
+    assert (tmp_path / "profiles" / "hvac_20251010T153000.prof").exists()
+
+
+def test_invalid_ticks(tick_profiler: TickProfiler) -> None:
+    with pytest.raises(ValueError, match="ticks must be positive"):
+        tick_profiler.start("solar", 0, 5, _NOW)
+
+
+def test_overlapping_profilers_dont_skip_ticks(mock_appdaemon_logger: Mock, tmp_path: Path) -> None:
+    solar_profiler = TickProfiler(mock_appdaemon_logger, tmp_path)
+    hvac_profiler = TickProfiler(mock_appdaemon_logger, tmp_path)
+    solar_profiler.start("solar", 1, 5, _NOW)
+    hvac_profiler.start("hvac", 1, 5, _NOW)
+    hvac_tick = Mock()
+
+    solar_profiler.profile(lambda: hvac_profiler.profile(hvac_tick))
+
+    hvac_tick.assert_called_once_with()
+    assert (solar_profiler.remaining_ticks, hvac_profiler.remaining_ticks) == (0, 1)
+    assert (tmp_path / "solar_20251010T153000.prof").exists()
+
+    hvac_profiler.profile(hvac_tick)
+
+    assert hvac_profiler.remaining_ticks == 0
+    assert (tmp_path / "hvac_20251010T153000.prof").exists()
+
+
+def test_tick_runs_unprofiled_when_another_profiler_is_active(tick_profiler: TickProfiler) -> None:
+    tick_profiler.start("solar", 1, 5, _NOW)
+    tick = Mock()
+    other_profile = cProfile.Profile()
+
+    other_profile.enable()
+    try:
+        tick_profiler.profile(tick)
+    finally:
+        other_profile.disable()
+
+    tick.assert_called_once_with()
+    assert tick_profiler.remaining_ticks == 1
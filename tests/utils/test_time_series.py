@@ -0,0 +1,76 @@
+import random
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from utils.time_series import TimeSeries
+
+_START = datetime(2025, 10, 5, tzinfo=UTC)
+
+
+@dataclass(frozen=True)
+class Item:
+    timestamp: datetime
+    value: int
+
+
+def _timestamp(hour: int) -> datetime:
+    return _START + timedelta(hours=hour)
+
+
+@pytest.fixture
+def time_series() -> TimeSeries[Item]:
+    items = [Item(_timestamp(hour), hour) for hour in [3, 1, 2, 0]]
+    return TimeSeries(items, key=lambda item: item.timestamp)
+
+
+def test_sorted(time_series: TimeSeries[Item]) -> None:
+    assert [item.value for item in time_series] == [0, 1, 2, 3]
+    assert len(time_series) == 4
+
+
+def test_find(time_series: TimeSeries[Item]) -> None:
+    assert time_series.find(_timestamp(2)) == Item(_timestamp(2), 2)
+    assert time_series.find(_timestamp(2) + timedelta(minutes=1)) is None
+
+
+def test_find_duplicate_timestamp_returns_first() -> None:
+    time_series = TimeSeries([Item(_START, 1), Item(_START, 2)], key=lambda item: item.timestamp)
+
+    assert time_series.find(_START) == Item(_START, 1)
+
+
+@pytest.mark.parametrize(
+    ("start_hour", "end_hour", "expected"),
+    [
+        (0, 4, [0, 1, 2, 3]),
+        (1, 3, [1, 2]),
+        (-5, 1, [0]),
+        (3, 10, [3]),
+        (2, 2, []),
+        (5, 10, []),
+    ],
+)
+def test_range(time_series: TimeSeries[Item], start_hour: int, end_hour: int, expected: list[int]) -> None:
+    assert [item.value for item in time_series.range(_timestamp(start_hour), _timestamp(end_hour))] == expected
+
+
+def test_empty() -> None:
+    time_series = TimeSeries[Item]([], key=lambda item: item.timestamp)
+
+    assert time_series.range(_timestamp(0), _timestamp(10)) == []
+    assert time_series.find(_timestamp(0)) is None
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_same_results_as_linear_scan(seed: int) -> None:
+    rng = random.Random(seed)
+    items = [Item(_START + timedelta(minutes=15 * index), rng.randint(0, 100)) for index in range(rng.randint(0, 200))]
+    time_series = TimeSeries(items, key=lambda item: item.timestamp)
+
+    for _ in range(50):
+        start = _START + timedelta(minutes=rng.randint(-60, 3200))
+        end = start + timedelta(minutes=rng.randint(0, 600))
+
+        assert time_series.range(start, end) == [item for item in items if start <= item.timestamp < end]
+        assert time_series.find(start) == next((item for item in items if item.timestamp == start), None)